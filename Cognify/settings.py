@@ -43,9 +43,15 @@ INSTALLED_APPS = [
     'orbit',
     'participant',
     'topic',
+
+    'diagnostics',
+    'maintenance',
+    'archive',
+    'caching',
 ]
 
 MIDDLEWARE = [
+    'diagnostics.middleware.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +59,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'caching.middleware.IdentityMapMiddleware',
+    'diagnostics.middleware.SlowQueryMiddleware',
+    'diagnostics.middleware.NPlusOneMiddleware',
 ]
 
 ROOT_URLCONF = 'Cognify.urls'
@@ -131,7 +140,59 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Cache (caching app)
+# Each worker keeps a small LRU (L1) in front of the file cache shared by all workers (L2);
+# see caching/backends.py. Page, object, rate limiter and session caches all use the default alias.
+CACHES = {
+    'default': {
+        'BACKEND': 'caching.backends.TieredCache',
+        'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 500},
+    },
+    'shared': {
+        'BACKEND': 'caching.backends.FileCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+TEST_RUNNER = 'caching.testing.TestRunner'  # tests get their own file cache directory
+
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 
+
+# N+1 query detection (diagnostics app)
+# Requests issuing the same query shape NPLUSONE_THRESHOLD times are logged.
+NPLUSONE_ENABLED = DEBUG
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_RAISE = False
+
+# Slow query log (diagnostics app)
+# Queries slower than SLOW_QUERY_THRESHOLD_MS are stored with their plan; see `manage.py slow_query_report`.
+SLOW_QUERY_THRESHOLD_MS = 100 if DEBUG else None
+SLOW_QUERY_LOG_MAX_ENTRIES = 500
+SLOW_QUERY_LOG_ASYNC = True
+
+# On-demand request profiling (diagnostics app)
+# Set at least one trigger to enable the middleware; captures are listed at /diagnostics/profiles/.
+PROFILER_TOKEN = None  # requests with a matching X-Profile-Token header are cProfiled
+PROFILER_SAMPLE_RATE = 0.0  # fraction of requests to cProfile
+PROFILER_LATENCY_THRESHOLD_MS = None  # stack-sample requests slower than this
+PROFILER_SAMPLE_INTERVAL_MS = 5
+PROFILER_DIR = BASE_DIR / 'profiles'
+PROFILER_MAX_FILES = 100
+
+# Dashboard analytics (dashboard app)
+# Daily rollups catch up on dashboard load once they are ROLLUP_MAX_AGE seconds old; see `manage.py rebuild_rollups`.
+DASHBOARD_DAYS = 30
+DASHBOARD_WIDGET_WORKERS = 4  # widgets run concurrently on this many threads (1 = sequential)
+ROLLUP_MAX_AGE = 60
+ROLLUP_LAG_SECONDS = 5  # participant rollups trail the clock so in-flight inserts are not skipped
+
+# Request-scoped identity map (caching app)
+# Opt-in: each row of Participant, Orbit and Topic is loaded into one object per request; see caching/identity.py.
+IDENTITY_MAP_ENABLED = False
+
+# Read-through object cache (caching app)
+# Rows fetched with Model.objects.cached_get()/get_many() are cached this many seconds; see caching/objects.py.
+OBJECT_CACHE_TIMEOUT = 300
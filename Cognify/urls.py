@@ -25,4 +25,6 @@ urlpatterns = [
     path('orbits/', include('orbit.urls')),
     path('participants/', include('participant.urls')),
     path('topics/', include('topic.urls')),
+    path('archive/', include('archive.urls')),
+    path('diagnostics/', include('diagnostics.urls')),
 ]
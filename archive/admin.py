@@ -0,0 +1,40 @@
+from django.contrib import admin
+from .models import ArchivedTopic, ArchivedQuestion, ArchivedAnswer
+
+
+@admin.register(ArchivedTopic)
+class ArchivedTopicAdmin(admin.ModelAdmin):
+    list_display = ['title', 'orbit', 'about', 'question_count', 'created_at', 'archived_at']
+    list_filter = ['orbit', 'archived_at']
+    search_fields = ['title', 'slug']
+    raw_id_fields = ['about']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedQuestion)
+class ArchivedQuestionAdmin(admin.ModelAdmin):
+    list_display = ['question_text', 'topic', 'answer_count', 'created_at']
+    raw_id_fields = ['topic']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedAnswer)
+class ArchivedAnswerAdmin(admin.ModelAdmin):
+    list_display = ['answer_text', 'question', 'participant', 'is_correct', 'created_at']
+    raw_id_fields = ['question', 'participant']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,63 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from archive.models import ArchivedTopic
+from archive.operations import archive_cold_topics, cold_topics, restore_topics
+
+
+class Command(BaseCommand):
+    help = 'Move inactive topics and their questions and answers out of the live tables, or restore them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Topic trees moved per transaction')
+        parser.add_argument('--older-than', type=int, metavar='DAYS',
+                            help='Only archive topics not updated for this many days')
+        parser.add_argument('--limit', type=int, help='Archive at most this many topics')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived')
+        parser.add_argument('--restore', nargs='+', metavar='SLUG', help='Restore archived topics by slug')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['restore']:
+            return self.restore(options['restore'])
+
+        updated_before = None
+        if options['older_than'] is not None:
+            updated_before = timezone.now() - datetime.timedelta(days=options['older_than'])
+
+        if options['dry_run']:
+            queryset = cold_topics()
+            if updated_before is not None:
+                queryset = queryset.filter(updated_at__lt=updated_before)
+            count = queryset.count()
+            if options['limit'] is not None:
+                count = min(count, options['limit'])
+            self.stdout.write(f"{count} topics would be archived")
+            return
+
+        started = time.perf_counter()
+        totals = archive_cold_topics(
+            batch_size=options['batch_size'], updated_before=updated_before, limit=options['limit'],
+            progress=self.report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {totals['topics']} topics, {totals['questions']} questions and "
+            f"{totals['answers']} answers in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def restore(self, slugs):
+        archived_ids = list(ArchivedTopic.objects.filter(slug__in=slugs).values_list('pk', flat=True))
+        restored, skipped = restore_topics(archived_ids)
+        for topic in skipped:
+            self.stdout.write(self.style.WARNING(f"{topic.slug}: clashes with a live topic, left in the archive"))
+        missing = set(slugs) - {topic.slug for topic in restored + skipped}
+        for slug in sorted(missing):
+            self.stdout.write(self.style.WARNING(f"{slug}: not in the archive"))
+        self.stdout.write(self.style.SUCCESS(f"Restored {len(restored)} topics"))
+
+    def report(self, totals):
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {totals['topics']} topics archived so far")
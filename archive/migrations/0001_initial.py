@@ -0,0 +1,98 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orbit', '0002_orbit_statistics_totals'),
+        ('participant', '0002_list_view_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTopic',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('description', models.TextField()),
+                ('slug', models.SlugField(max_length=105)),
+                ('is_active', models.BooleanField()),
+                ('question_count', models.PositiveIntegerField(default=0)),
+                ('studying_participants_count', models.PositiveIntegerField(default=0)),
+                ('bosses_count', models.PositiveIntegerField(default=0)),
+                ('studying_participant_ids', models.JSONField(default=list)),
+                ('boss_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+                ('about', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_topics_about', to='participant.participant')),
+                ('orbit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_topics', to='orbit.orbit')),
+            ],
+            options={
+                'verbose_name': 'Archived Topic',
+                'verbose_name_plural': 'Archived Topics',
+                'ordering': ['-archived_at', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedQuestion',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('question_text', models.TextField()),
+                ('is_active', models.BooleanField()),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='archive.archivedtopic')),
+            ],
+            options={
+                'verbose_name': 'Archived Question',
+                'verbose_name_plural': 'Archived Questions',
+                'ordering': ['order', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAnswer',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('answer_text', models.TextField()),
+                ('is_correct', models.BooleanField()),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('participant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_answers', to='participant.participant')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='archive.archivedquestion')),
+            ],
+            options={
+                'verbose_name': 'Archived Answer',
+                'verbose_name_plural': 'Archived Answers',
+                'ordering': ['order', 'created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedtopic',
+            index=models.Index(fields=['orbit', '-created_at'], name='archive_arc_orbit_i_25aae6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtopic',
+            index=models.Index(fields=['-archived_at', '-created_at'], name='archive_arc_archive_138ff9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtopic',
+            index=models.Index(fields=['slug'], name='archive_arc_slug_bd8469_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedquestion',
+            index=models.Index(fields=['topic', 'order', 'created_at'], name='archive_arc_topic_i_3fa7bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedanswer',
+            index=models.Index(fields=['question', 'order', 'created_at'], name='archive_arc_questio_8a217f_idx'),
+        ),
+    ]
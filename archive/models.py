@@ -0,0 +1,91 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from orbit.models import Orbit
+from participant.models import Participant
+
+
+class ArchivedTopic(models.Model):
+    """
+    A topic moved out of the live ``topic_topic`` table. Rows keep their
+    original primary keys, timestamps and counters so a restore puts them
+    back unchanged; the m2m memberships travel along as participant ids.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    about = models.ForeignKey(Participant, related_name='archived_topics_about', on_delete=models.CASCADE)
+    orbit = models.ForeignKey(Orbit, related_name='archived_topics', on_delete=models.CASCADE)
+    title = models.CharField(max_length=100)
+    description = models.TextField()
+    slug = models.SlugField(max_length=105)
+    is_active = models.BooleanField()
+    question_count = models.PositiveIntegerField(default=0)
+    studying_participants_count = models.PositiveIntegerField(default=0)
+    bosses_count = models.PositiveIntegerField(default=0)
+    studying_participant_ids = models.JSONField(default=list)
+    boss_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Archived At"))
+
+    class Meta:
+        verbose_name = _("Archived Topic")
+        verbose_name_plural = _("Archived Topics")
+        ordering = ['-archived_at', '-created_at']
+        indexes = [
+            models.Index(fields=['orbit', '-created_at']),
+            models.Index(fields=['-archived_at', '-created_at']),
+            models.Index(fields=['slug']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+    def get_absolute_url(self):
+        from django.urls import reverse
+        return reverse('archive:topic_detail', kwargs={'pk': self.pk})
+
+
+class ArchivedQuestion(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    topic = models.ForeignKey(ArchivedTopic, related_name='questions', on_delete=models.CASCADE)
+    question_text = models.TextField()
+    is_active = models.BooleanField()
+    order = models.PositiveIntegerField(default=0)
+    answer_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Archived Question")
+        verbose_name_plural = _("Archived Questions")
+        ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['topic', 'order', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Q: {self.question_text[:50]}"
+
+
+class ArchivedAnswer(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    question = models.ForeignKey(ArchivedQuestion, related_name='answers', on_delete=models.CASCADE)
+    participant = models.ForeignKey(
+        Participant, related_name='archived_answers', on_delete=models.SET_NULL, null=True, blank=True
+    )
+    answer_text = models.TextField()
+    is_correct = models.BooleanField()
+    order = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Archived Answer")
+        verbose_name_plural = _("Archived Answers")
+        ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['question', 'order', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"A: {self.answer_text[:50]}"
@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from caching.events import publish
+from orbit.models import OrbitStatistics
+from participant.models import Participant
+from topic import counters
+from topic.models import Topic, Question, Answer
+
+from .models import ArchivedTopic, ArchivedQuestion, ArchivedAnswer
+
+# Inactive topics and every topic of an archived orbit
+COLD_TOPICS = Q(is_active=False) | Q(orbit__status='archived')
+
+STUDYING = Topic.studying_participants.through
+BOSSES = Topic.bosses.through
+
+
+def cold_topics():
+    return Topic.objects.filter(COLD_TOPICS)
+
+
+def _memberships(through, topic_ids):
+    members = defaultdict(list)
+    for topic_id, participant_id in through.objects.filter(topic_id__in=topic_ids).values_list(
+        'topic_id', 'participant_id'
+    ):
+        members[topic_id].append(str(participant_id))
+    return members
+
+
+def archive_topics(topic_ids):
+    """
+    Move the given topics with their questions, answers and m2m rows into the
+    archive tables in one transaction. Live rows are removed with set-based
+    deletes: the whole tree leaves together, so there are no counters or
+    other per-row side effects to maintain.
+    """
+    with transaction.atomic():
+        topics = list(Topic.objects.filter(pk__in=topic_ids).values())
+        topic_ids = [topic['id'] for topic in topics]
+        if not topic_ids:
+            return {'topics': 0, 'questions': 0, 'answers': 0}
+        studying = _memberships(STUDYING, topic_ids)
+        bosses = _memberships(BOSSES, topic_ids)
+        questions = Question.objects.filter(topic_id__in=topic_ids)
+        answers = Answer.objects.filter(question__topic_id__in=topic_ids)
+
+        ArchivedTopic.objects.bulk_create([
+            ArchivedTopic(**topic, studying_participant_ids=studying[topic['id']], boss_ids=bosses[topic['id']])
+            for topic in topics
+        ])
+        archived_questions = ArchivedQuestion.objects.bulk_create(
+            [ArchivedQuestion(**question) for question in questions.values()], batch_size=500,
+        )
+        archived_answers = ArchivedAnswer.objects.bulk_create(
+            [ArchivedAnswer(**answer) for answer in answers.values()], batch_size=500,
+        )
+
+        for queryset in (
+            STUDYING.objects.filter(topic_id__in=topic_ids),
+            BOSSES.objects.filter(topic_id__in=topic_ids),
+            answers,
+            questions,
+            Topic.objects.filter(pk__in=topic_ids),
+        ):
+            queryset._raw_delete(queryset.db)
+        publish(Topic, topic_ids)
+        publish(Question, [question.pk for question in archived_questions])
+        publish(Answer, [answer.pk for answer in archived_answers])
+        OrbitStatistics.objects.filter(orbit_id__in={topic['orbit_id'] for topic in topics}).delete()
+    return {'topics': len(topics), 'questions': len(archived_questions), 'answers': len(archived_answers)}
+
+
+def archive_cold_topics(batch_size=200, updated_before=None, limit=None, progress=None):
+    """Archive cold topics ``batch_size`` trees per transaction; returns the totals moved"""
+    totals = {'topics': 0, 'questions': 0, 'answers': 0}
+    queryset = cold_topics().order_by('pk')
+    if updated_before is not None:
+        queryset = queryset.filter(updated_at__lt=updated_before)
+    while limit is None or totals['topics'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - totals['topics'])
+        topic_ids = list(queryset.values_list('pk', flat=True)[:size])
+        if not topic_ids:
+            break
+        moved = archive_topics(topic_ids)
+        for key, count in moved.items():
+            totals[key] += count
+        if progress:
+            progress(totals)
+    return totals
+
+
+def restore_conflicts(archived):
+    """Live topics that would clash with restoring ``archived`` (same slug, or same subject and title)"""
+    return Topic.objects.filter(Q(slug=archived.slug) | Q(about_id=archived.about_id, title=archived.title))
+
+
+def _restore_rows(model, rows):
+    """
+    Bulk insert ``rows`` as live ``model`` instances. ``bulk_create`` stamps
+    ``auto_now``/``auto_now_add`` fields with the current time, so the
+    original timestamps are written back with ``bulk_update`` afterwards.
+    """
+    objects = [model(**row) for row in rows]
+    timestamps = [(obj.created_at, obj.updated_at) for obj in objects]
+    model.objects.bulk_create(objects, batch_size=500)
+    for obj, (created_at, updated_at) in zip(objects, timestamps):
+        obj.created_at, obj.updated_at = created_at, updated_at
+    model.objects.bulk_update(objects, ['created_at', 'updated_at'], batch_size=500)
+    publish(model, [obj.pk for obj in objects])
+    return objects
+
+
+def restore_topics(archived_ids):
+    """
+    Move archived topics back into the live tables. Topics that clash with a
+    live topic are left in the archive and returned in ``skipped``.
+    """
+    restored, skipped = [], []
+    with transaction.atomic():
+        archived_topics = list(ArchivedTopic.objects.filter(pk__in=archived_ids))
+        for archived in archived_topics:
+            (skipped if restore_conflicts(archived).exists() else restored).append(archived)
+        topic_ids = [archived.pk for archived in restored]
+        if not topic_ids:
+            return restored, skipped
+
+        existing = set(Participant.objects.filter(
+            pk__in={pid for archived in restored for pid in archived.studying_participant_ids + archived.boss_ids}
+        ).values_list('pk', flat=True))
+        memberships = {STUDYING: [], BOSSES: []}
+        topic_rows = []
+        for archived in restored:
+            for through, participant_ids in (
+                (STUDYING, archived.studying_participant_ids), (BOSSES, archived.boss_ids)
+            ):
+                memberships[through] += [
+                    through(topic_id=archived.pk, participant_id=pid)
+                    for pid in map(Participant._meta.pk.to_python, participant_ids) if pid in existing
+                ]
+            row = {field.attname: getattr(archived, field.attname) for field in Topic._meta.concrete_fields}
+            topic_rows.append(row)
+
+        _restore_rows(Topic, topic_rows)
+        for through, rows in memberships.items():
+            through.objects.bulk_create(rows, batch_size=500)
+        question_fields = [field.attname for field in Question._meta.concrete_fields]
+        answer_fields = [field.attname for field in Answer._meta.concrete_fields]
+        _restore_rows(Question, ArchivedQuestion.objects.filter(topic_id__in=topic_ids).values(*question_fields))
+        _restore_rows(Answer, ArchivedAnswer.objects.filter(question__topic_id__in=topic_ids).values(*answer_fields))
+
+        # Participants deleted while the topic was archived have dropped out of the memberships
+        counters.studying_participants_count.recount(topic_ids)
+        counters.bosses_count.recount(topic_ids)
+        ArchivedTopic.objects.filter(pk__in=topic_ids).delete()
+        OrbitStatistics.objects.filter(orbit_id__in={archived.orbit_id for archived in restored}).delete()
+    return restored, skipped
@@ -0,0 +1,27 @@
+from django.db.models import Q
+from django.dispatch import receiver
+
+from participant.models import Participant
+from participant.signals import post_merge
+
+from .models import ArchivedTopic
+
+MEMBERSHIP_FIELDS = ['studying_participant_ids', 'boss_ids']
+
+
+@receiver(post_merge, sender=Participant)
+def merge_archived_memberships(sender, survivor, duplicate_ids, **kwargs):
+    # Archived memberships are stored as id lists, which the foreign key updates do not reach
+    duplicates = {str(pk) for pk in duplicate_ids}
+    survivor_id = str(survivor.pk)
+    mentions = Q()
+    for pk in duplicates:
+        for field in MEMBERSHIP_FIELDS:
+            mentions |= Q(**{f'{field}__icontains': pk})
+    changed = []
+    for topic in ArchivedTopic.objects.filter(mentions).only(*MEMBERSHIP_FIELDS):
+        for field in MEMBERSHIP_FIELDS:
+            ids = [survivor_id if pk in duplicates else pk for pk in getattr(topic, field)]
+            setattr(topic, field, list(dict.fromkeys(ids)))
+        changed.append(topic)
+    ArchivedTopic.objects.bulk_update(changed, MEMBERSHIP_FIELDS)
@@ -0,0 +1,93 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from diagnostics.testing import login_master
+from master.models import Master
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from .models import ArchivedTopic, ArchivedAnswer
+from .operations import archive_cold_topics, restore_topics
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.ada, self.bob = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Archivist')
+            for name in ('Ada', 'Bob')
+        ]
+        self.orbit = Orbit.objects.create(name='Archive orbit')
+        self.live = Topic.objects.create(
+            about=self.ada, orbit=self.orbit, title='Still active', description='Stays in the live tables.',
+        )
+        self.cold = Topic.objects.create(
+            about=self.ada, orbit=self.orbit, title='Gone quiet', description='Moves to the archive.',
+            is_active=False,
+        )
+        self.cold.studying_participants.add(self.ada, self.bob)
+        self.cold.bosses.add(self.bob)
+        question = Question.objects.create(topic=self.cold, question_text='Will this survive the trip?')
+        Answer.objects.create(question=question, participant=self.bob, answer_text='Yes it will', is_correct=True)
+        Answer.objects.create(question=question, participant=self.ada, answer_text='No it will not')
+        old = timezone.now() - datetime.timedelta(days=400)
+        Topic.objects.filter(pk=self.cold.pk).update(created_at=old, updated_at=old)
+        self.cold.refresh_from_db()
+
+    def snapshot(self, topic):
+        topic = Topic.objects.get(pk=topic.pk)
+        return {
+            'topic': (topic.slug, topic.created_at, topic.updated_at, topic.question_count,
+                      topic.studying_participants_count, topic.bosses_count),
+            'studying': set(topic.studying_participants.values_list('pk', flat=True)),
+            'bosses': set(topic.bosses.values_list('pk', flat=True)),
+            'questions': list(Question.objects.filter(topic=topic).values().order_by('pk')),
+            'answers': list(Answer.objects.filter(question__topic=topic).values().order_by('pk')),
+        }
+
+    def test_round_trip_preserves_rows(self):
+        before = self.snapshot(self.cold)
+        self.assertEqual(archive_cold_topics(), {'topics': 1, 'questions': 1, 'answers': 2})
+        self.assertEqual(list(Topic.objects.values_list('pk', flat=True)), [self.live.pk])
+        self.assertFalse(Answer.objects.exists())
+
+        archived = ArchivedTopic.objects.get()
+        self.assertEqual((archived.pk, archived.question_count), (self.cold.pk, 1))
+        self.assertEqual(archive_cold_topics(), {'topics': 0, 'questions': 0, 'answers': 0})
+
+        restored, skipped = restore_topics([archived.pk])
+        self.assertEqual((len(restored), skipped), (1, []))
+        self.assertEqual(self.snapshot(self.cold), before)
+        self.assertFalse(ArchivedTopic.objects.exists())
+
+    def test_older_than_and_deleted_participants(self):
+        self.assertEqual(archive_cold_topics(updated_before=self.cold.updated_at)['topics'], 0)
+        archive_cold_topics(updated_before=timezone.now())
+        self.bob.delete()
+        self.assertIsNone(ArchivedAnswer.objects.get(answer_text='Yes it will').participant)
+
+        restore_topics([self.cold.pk])
+        topic = Topic.objects.get(pk=self.cold.pk)
+        self.assertEqual((topic.studying_participants_count, topic.bosses_count), (1, 0))
+        self.assertEqual(list(topic.studying_participants.all()), [self.ada])
+
+    def test_restore_skips_clashing_topics(self):
+        archive_cold_topics()
+        Topic.objects.create(about=self.ada, orbit=self.orbit, title='Gone quiet', description='Took its place.')
+        restored, skipped = restore_topics([self.cold.pk])
+        self.assertEqual((restored, [topic.pk for topic in skipped]), ([], [self.cold.pk]))
+        self.assertTrue(ArchivedTopic.objects.filter(pk=self.cold.pk).exists())
+
+    def test_browse_and_restore_views(self):
+        archive_cold_topics()
+        login_master(self.client, Master.objects.create(username='archivist', password='archivist-pass'))
+        response = self.client.get('/archive/', {'orbit': self.orbit.slug})
+        self.assertEqual([topic.pk for topic in response.context['topics']], [self.cold.pk])
+        response = self.client.get(f'/archive/{self.cold.pk}/')
+        self.assertContains(response, 'Yes it will')
+
+        response = self.client.post(f'/archive/{self.cold.pk}/restore/')
+        self.assertRedirects(response, f'/topics/{self.cold.slug}/', fetch_redirect_response=False)
+        self.assertTrue(Topic.objects.filter(pk=self.cold.pk).exists())
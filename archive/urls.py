@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'archive'
+
+urlpatterns = [
+    path('', views.archived_topic_list, name='topic_list'),
+    path('<int:pk>/', views.archived_topic_detail, name='topic_detail'),
+    path('<int:pk>/restore/', views.archived_topic_restore, name='topic_restore'),
+]
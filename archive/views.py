@@ -0,0 +1,56 @@
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.http import require_POST
+
+from master.views import master_required
+from orbit.models import Orbit
+
+from .models import ArchivedTopic
+from .operations import restore_topics
+
+ARCHIVED_TOPICS_PER_PAGE = 25
+
+
+@master_required
+def archived_topic_list(request):
+    topics = ArchivedTopic.objects.select_related('about', 'orbit').order_by('-archived_at', '-created_at')
+
+    orbit_filter = request.GET.get('orbit')
+    if orbit_filter:
+        topics = topics.filter(orbit__slug=orbit_filter)
+
+    search_query = request.GET.get('search')
+    if search_query:
+        topics = topics.filter(title__icontains=search_query)
+
+    context = {
+        'topics': Paginator(topics, ARCHIVED_TOPICS_PER_PAGE).get_page(request.GET.get('page')),
+        'orbits': Orbit.objects.filter(archived_topics__isnull=False).distinct().order_by('name'),
+        'current_orbit': orbit_filter,
+        'search_query': search_query,
+    }
+    return render(request, 'archive/archived_topic_list.html', context)
+
+
+@master_required
+def archived_topic_detail(request, pk):
+    topic = get_object_or_404(ArchivedTopic.objects.select_related('about', 'orbit'), pk=pk)
+    questions = topic.questions.prefetch_related('answers__participant').order_by('order', 'created_at')
+    context = {
+        'topic': topic,
+        'questions': questions,
+    }
+    return render(request, 'archive/archived_topic_detail.html', context)
+
+
+@master_required
+@require_POST
+def archived_topic_restore(request, pk):
+    topic = get_object_or_404(ArchivedTopic, pk=pk)
+    restored, skipped = restore_topics([topic.pk])
+    if skipped:
+        messages.error(request, f'Topic "{topic.title}" clashes with a live topic and was not restored.')
+        return redirect('archive:topic_detail', pk=topic.pk)
+    messages.success(request, f'Topic "{topic.title}" restored successfully!')
+    return redirect('topics:topic_detail', slug=topic.slug)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CachingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'caching'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .identity import install_descriptors
+
+        install_descriptors()
@@ -0,0 +1,191 @@
+"""
+Two-tier cache backend: a small in-process LRU (L1) in front of a cache
+shared by every worker (L2, any configured Django cache).
+
+Every value is written to L2 together with a stamp, and the stamp is also
+kept under a key of its own. An L1 entry remembers the stamp it was read
+with and is only served while L2 still holds that stamp, so a write or
+delete from any worker invalidates the other workers' L1 copies. Checking
+a stamp is one small L2 read; an L1 hit saves reading, decompressing and
+unpickling the value itself, which for cached pages is most of the cost.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'caching.backends.TieredCache',
+            'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 500},
+        },
+        'shared': {'BACKEND': 'caching.backends.FileCache', 'LOCATION': ...},
+    }
+
+Writes go to L2 in one ``set_many()`` per batch. ``FileCache`` is Django's
+file-based cache without its per-write directory scan: the stock backend
+lists every cache file on each ``set()`` to decide whether to cull, which
+at a few thousand entries makes a batch of hundreds of writes take seconds.
+"""
+import pickle
+import threading
+import time
+import itertools
+import uuid
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+STAMP_SUFFIX = ':stamp'
+
+_MISSING = object()
+
+
+class FileCache(FileBasedCache):
+    """
+    ``FileBasedCache`` that checks its size once every ``CULL_CHECK_EVERY``
+    writes (OPTIONS, default 100) instead of on every one. Each worker may
+    overshoot ``MAX_ENTRIES`` by that many entries before culling.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_check_every = params.get('OPTIONS', {}).get('CULL_CHECK_EVERY', 100)
+        self._writes = itertools.count(1)
+
+    def _cull(self):
+        if next(self._writes) % self._cull_check_every == 0:
+            super()._cull()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', location)
+        self._max_entries = options.get('L1_MAX_ENTRIES', 500)
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def stats(self):
+        """Per-process hit and miss counts of each tier"""
+        with self._lock:
+            return {name: self._stats[name] for name in ('l1_hits', 'l1_misses', 'l2_hits', 'l2_misses')}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    # L1
+
+    def _count(self, *names):
+        with self._lock:
+            self._stats.update(names)
+
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            stamp, pickled, expires = entry
+            if expires is not None and expires <= time.time():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return stamp, pickled
+
+    def _l1_set(self, key, stamp, value, timeout):
+        expires = self.get_backend_timeout(timeout)
+        if expires is not None and expires <= time.time():
+            self._l1_delete(key)
+            return
+        # Pickled like LocMemCache, so callers never share a mutable cached object
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[key] = (stamp, pickled, expires)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._lock:
+            self._l1.pop(key, None)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        cached = {key: self._l1_get(self.make_and_validate_key(key, version=version)) for key in keys}
+        stamps = self.l2.get_many(
+            [key + STAMP_SUFFIX for key, entry in cached.items() if entry is not None], version=version
+        )
+        found, missing = {}, []
+        for key, entry in cached.items():
+            if entry is not None and stamps.get(key + STAMP_SUFFIX) == entry[0]:
+                found[key] = pickle.loads(entry[1])
+            else:
+                missing.append(key)
+        self._count(*['l1_hits'] * len(found), *['l1_misses'] * len(missing))
+
+        if missing:
+            loaded = self.l2.get_many(missing, version=version)
+            self._count(*['l2_hits'] * len(loaded), *['l2_misses'] * (len(missing) - len(loaded)))
+            for key, (stamp, value) in loaded.items():
+                # L2 keeps its own expiry; L1 copies are short-lived and revalidated on every read anyway
+                self._l1_set(self.make_key(key, version=version), stamp, value, DEFAULT_TIMEOUT)
+                found[key] = value
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        stamps = {key: uuid.uuid4().hex for key in data}
+        entries = {}
+        for key, value in data.items():
+            entries[key] = (stamps[key], value)
+            entries[key + STAMP_SUFFIX] = stamps[key]
+        failed = set(self.l2.set_many(entries, timeout, version=version))
+        for key, value in data.items():
+            self._l1_set(self.make_and_validate_key(key, version=version), stamps[key], value, timeout)
+        return [key for key in data if key in failed or key + STAMP_SUFFIX in failed]
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        stamp = uuid.uuid4().hex
+        if not self.l2.add(key, (stamp, value), timeout, version=version):
+            return False
+        self.l2.set(key + STAMP_SUFFIX, stamp, timeout, version=version)
+        self._l1_set(self.make_and_validate_key(key, version=version), stamp, value, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        self.l2.touch(key + STAMP_SUFFIX, timeout, version=version)
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        deleted = self.l2.get(key, _MISSING, version=version) is not _MISSING
+        self.l2.delete_many([key, key + STAMP_SUFFIX], version=version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1_delete(self.make_and_validate_key(key, version=version))
+        self.l2.delete_many([*keys, *(key + STAMP_SUFFIX for key in keys)], version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
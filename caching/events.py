@@ -0,0 +1,170 @@
+"""
+Transaction-coalesced change events.
+
+Writers ``publish()`` the rows they changed. Inside a transaction the
+events are collected per connection, deduplicated by ``(model, pk)`` and
+dispatched when the transaction commits: a form save that fires a dozen
+signals, or a bulk operation touching thousands of rows, reaches each
+subscriber once per changed object instead of once per signal, usually in
+a single call (one per savepoint level that published). Outside a
+transaction events are dispatched right away; a rollback discards them.
+
+Subscribers receive ``{model: pks}`` restricted to the models they asked
+for, where ``pks`` is a frozenset or None when every row of the model may
+have changed. Models are always the concrete ones, so proxies share their
+events. Until the transaction commits ``pending()`` reports what it has
+changed so far, for readers that must not trust shared caches for them.
+"""
+import logging
+from functools import partial
+
+from django.db import connections, router, transaction
+
+logger = logging.getLogger(__name__)
+
+_subscribers = []
+
+
+def _savepoints(connection):
+    # ``atomic(savepoint=False)`` blocks are recorded as None; they can't be rolled back on their own
+    return set(filter(None, connection.savepoint_ids))
+
+
+class ChangeBatch:
+    """The changes published at one savepoint level of a transaction, by concrete model"""
+
+    def __init__(self, connection):
+        self.savepoints = _savepoints(connection)
+        self.callback = partial(_flush, self)
+        self.changes = {}
+        self.done = False
+
+    def add(self, model, pks):
+        if pks is None:
+            self.changes[model] = None
+        elif model not in self.changes:
+            self.changes[model] = set(pks)
+        elif self.changes[model] is not None:
+            self.changes[model].update(pks)
+
+    def merge(self, other):
+        for model, pks in other.changes.items():
+            self.add(model, pks)
+        other.done = True
+
+    def covers(self, model, pk):
+        return model in self.changes and (self.changes[model] is None or pk in self.changes[model])
+
+
+def subscribe(handler, models=None):
+    """Call ``handler(changes)`` once per commit that changed one of ``models`` (any model when None)"""
+    concrete = None if models is None else frozenset(model._meta.concrete_model for model in models)
+    _subscribers.append((handler, concrete))
+
+
+def unsubscribe(handler):
+    _subscribers[:] = [(subscribed, models) for subscribed, models in _subscribers if subscribed != handler]
+
+
+def subscriber(*models):
+    """Decorator form of ``subscribe()``"""
+    def decorator(handler):
+        subscribe(handler, models or None)
+        return handler
+    return decorator
+
+
+def dispatch(changes):
+    """Hand ``{model: pks}`` to every interested subscriber; one failing subscriber doesn't stop the others"""
+    changes = {model: None if pks is None else frozenset(pks) for model, pks in changes.items()}
+    for handler, models in _subscribers:
+        selected = {model: pks for model, pks in changes.items() if models is None or model in models}
+        if not selected:
+            continue
+        try:
+            handler(selected)
+        except Exception:
+            logger.exception("Change event subscriber %r failed", handler)
+
+
+def _live_batches(connection):
+    batches = [batch for batch in getattr(connection, 'change_batches', []) if not batch.done]
+    if getattr(connection, 'change_queue', None) is not connection.run_on_commit:
+        # Django replaces the commit hook list on rollback, so a batch whose hooks are gone with it
+        # (because the transaction or the savepoint it belongs to was rolled back) is dead
+        queued = {id(func) for _sids, func, _robust in connection.run_on_commit}
+        batches = [batch for batch in batches if id(batch.callback) in queued]
+        connection.change_queue = connection.run_on_commit
+    connection.change_batches = batches
+    return batches
+
+
+def _flush(batch):
+    if not batch.done:
+        batch.done = True
+        dispatch(batch.changes)
+
+
+def publish(model, pks=None, using=None):
+    """
+    Record that rows ``pks`` of ``model`` changed, or all of its rows when
+    ``pks`` is None. Signals of saves, deletes, bulk deletes and memberships
+    publish on their own; code that changes rows with ``QuerySet.update()``,
+    ``bulk_update()`` or raw SQL must call this.
+    """
+    model = model._meta.concrete_model
+    if pks is not None:
+        pks = list(pks)
+        if not pks:
+            return
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        dispatch({model: pks})
+        return
+
+    batches = _live_batches(connection)
+    savepoints = _savepoints(connection)
+    batch = next((batch for batch in batches if batch.savepoints == savepoints), None)
+    if batch is None:
+        batch = ChangeBatch(connection)
+        batches.append(batch)
+    for other in batches:
+        # Live batches of savepoints this level is not inside were released into it and share its fate
+        if not other.savepoints <= savepoints:
+            batch.merge(other)
+    batches[:] = [other for other in batches if not other.done]
+
+    # What remains is this level's batch and those of enclosing levels, which are delivered whenever
+    # this level commits; an event already in one of them is not added again.
+    hooked, fresh = {batch}, []
+    for pk in [None] if pks is None else pks:
+        covering = None if pk is None else next((other for other in batches if other.covers(model, pk)), None)
+        if covering is None:
+            fresh.append(pk)
+        else:
+            hooked.add(covering)
+    if fresh:
+        batch.add(model, None if pks is None else fresh)
+    # Hooked again for every event: a no-op once the batch is out, but it makes any commit hook run
+    # after the event deliver it, including ones run by ``TestCase.captureOnCommitCallbacks()``
+    for other in hooked:
+        transaction.on_commit(other.callback, using=using)
+
+
+def pending(model, using=None):
+    """
+    Primary keys of ``model`` changed by the current transaction and not
+    yet dispatched: a set, possibly empty, or None when any row may have.
+    """
+    model = model._meta.concrete_model
+    connection = connections[using or router.db_for_read(model)]
+    if not connection.in_atomic_block:
+        return set()
+    found = set()
+    for batch in _live_batches(connection):
+        if model in batch.changes:
+            if batch.changes[model] is None:
+                return None
+            found |= batch.changes[model]
+    return found
@@ -0,0 +1,138 @@
+"""
+Request-scoped identity map.
+
+Inside ``identity_map()`` every row of an ``IdentityMapped`` model is loaded
+into at most one Python object: a query that returns a row already in the
+map hands back the instance loaded first, and foreign keys pointing at a
+mapped row resolve from the map without a query. So ``topic.about`` costs
+nothing once the participant list is on the page, and ``topic.orbit`` is
+the very object shown in the orbit dropdown.
+
+Writes invalidate conservatively: any UPDATE or DELETE run on a mapped
+model's table while the map is active drops every instance of that table,
+whatever issued it (``save()``, ``QuerySet.update()``, bulk deletes, the
+deletion collector). The instance just saved is then put back, so the
+object a view is working on stays canonical. Outside a map nothing changes.
+"""
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+WRITE_SQL = re.compile(r'^\s*(?:UPDATE|DELETE\s+FROM)\s+"?(\w+)"?', re.IGNORECASE)
+
+_active = ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+    """Loaded instances by ``(model, pk)``, with the number of loads and lookups it saved"""
+
+    def __init__(self):
+        self._instances = {}
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._instances)
+
+    def get(self, model, pk):
+        return self._instances.get((model, pk))
+
+    def add(self, instance):
+        self._instances[type(instance), instance.pk] = instance
+
+    def discard(self, model, pk):
+        self._instances.pop((model, pk), None)
+
+    def evict_table(self, db_table):
+        """Drop every instance stored in ``db_table``, proxies included"""
+        for key in [key for key in self._instances if key[0]._meta.db_table == db_table]:
+            del self._instances[key]
+
+    def clear(self):
+        self._instances.clear()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as an execute wrapper: writes to a mapped table invalidate it
+        match = WRITE_SQL.match(sql)
+        if match and self._instances:
+            self.evict_table(match.group(1))
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def identity_map(using=DEFAULT_DB_ALIAS):
+    """Activate a fresh identity map for the block and yield it"""
+    mapping = IdentityMap()
+    token = _active.set(mapping)
+    try:
+        with connections[using].execute_wrapper(mapping):
+            yield mapping
+    finally:
+        _active.reset(token)
+
+
+def current_identity_map():
+    """The active ``IdentityMap``, or None outside ``identity_map()``"""
+    return _active.get()
+
+
+class IdentityMapped:
+    """Model mixin: instances are deduplicated by the active identity map"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        mapping = _active.get()
+        if mapping is None:
+            return super().from_db(db, field_names, values)
+        pk = cls._meta.pk.to_python(values[field_names.index(cls._meta.pk.attname)])
+        instance = mapping.get(cls, pk)
+        if instance is not None and instance._state.db == db:
+            mapping.hits += 1
+            return instance
+        instance = super().from_db(db, field_names, values)
+        # Partly loaded rows would fetch each deferred field on access, so they are not shared
+        if not instance.get_deferred_fields():
+            mapping.add(instance)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        mapping = _active.get()
+        if mapping is None:
+            return super().refresh_from_db(using, fields, **kwargs)
+        # Otherwise the reload would be answered with this very instance
+        mapping.discard(type(self), self.pk)
+        super().refresh_from_db(using, fields, **kwargs)
+        if not self.get_deferred_fields():
+            mapping.add(self)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        mapping = _active.get()
+        if mapping is not None and not self.get_deferred_fields():
+            mapping.add(self)
+
+
+class IdentityMapDescriptor(ForwardManyToOneDescriptor):
+    """``ForeignKey`` accessor that looks in the active identity map before querying"""
+
+    def get_object(self, instance):
+        mapping = _active.get()
+        if mapping is not None:
+            related = mapping.get(self.field.related_model, getattr(instance, self.field.attname))
+            if related is not None:
+                mapping.hits += 1
+                return related
+        return super().get_object(instance)
+
+
+def install_descriptors():
+    """Swap in ``IdentityMapDescriptor`` on every foreign key to an ``IdentityMapped`` model's primary key"""
+    for model in apps.get_models():
+        for field in model._meta.local_fields:
+            if not field.many_to_one or not issubclass(field.related_model, IdentityMapped):
+                continue
+            if field.target_field.primary_key and type(model.__dict__.get(field.name)) is ForwardManyToOneDescriptor:
+                setattr(model, field.name, IdentityMapDescriptor(field))
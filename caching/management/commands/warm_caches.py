@@ -0,0 +1,72 @@
+from collections import Counter
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from caching.warmup import hot_urls, master_session, warm
+from diagnostics.loadtest import HTTPTransport, WSGITransport
+
+
+class Command(BaseCommand):
+    help = 'Fill the page and object caches by requesting the hottest pages, within a concurrency limit and time budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--popularity',
+                            help='Popularity list derived from the access log: one path per line, optionally '
+                                 'preceded by its request count; defaults to recently updated topics and orbits')
+        parser.add_argument('--limit', type=int, default=200, help='Number of URLs to warm')
+        parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+        parser.add_argument('--budget', type=float, default=60.0, help='Seconds after which no request is started')
+        parser.add_argument('--target', default='wsgi',
+                            help='"wsgi" to render in-process, or the base URL of a running server')
+        parser.add_argument('--master', help='Username of the master to request pages as (default: the first one)')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['limit'] < 1:
+            raise CommandError('--concurrency and --limit must be at least 1')
+        target = options['target']
+        if target != 'wsgi' and not target.startswith(('http://', 'https://')):
+            raise CommandError('--target must be "wsgi" or an http(s) URL')
+
+        if options['popularity']:
+            try:
+                with open(options['popularity']) as popularity:
+                    urls = hot_urls(options['limit'], popularity)
+            except OSError as error:
+                raise CommandError(f"Cannot read the popularity list: {error}")
+        else:
+            urls = hot_urls(options['limit'])
+        try:
+            session_key = master_session(options['master'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        try:
+            self.warm_urls(urls, session_key, target, options)
+        finally:
+            # The session only existed for these requests
+            import_module(settings.SESSION_ENGINE).SessionStore(session_key).delete()
+
+    def warm_urls(self, urls, session_key, target, options):
+        def make_transport(i):
+            transport = WSGITransport('127.0.0.1') if target == 'wsgi' else HTTPTransport('127.0.0.1', target)
+            transport.cookies[settings.SESSION_COOKIE_NAME] = session_key
+            return transport
+
+        self.stdout.write(f"Warming {len(urls)} URLs, {options['concurrency']} at a time, "
+                          f"{options['budget']:g}s budget")
+        # Warm-up requests are not worth the request diagnostics' overhead
+        with override_settings(NPLUSONE_ENABLED=False, SLOW_QUERY_THRESHOLD_MS=None):
+            results = warm(urls, make_transport, options['concurrency'], options['budget'])
+        for url, outcome, ms in results:
+            if outcome != 'ok' or options['verbosity'] > 1:
+                self.stdout.write(f"  {ms:8.1f} ms  {outcome:<14} {url}")
+
+        outcomes = Counter(outcome for _url, outcome, _ms in results)
+        summary = f"Warmed {outcomes['ok']} of {len(urls)} URLs"
+        if len(results) < len(urls):
+            summary += f"; {len(urls) - len(results)} skipped when the budget ran out"
+        failed = len(results) - outcomes['ok']
+        self.stdout.write(self.style.SUCCESS(summary) if not failed else self.style.WARNING(f"{summary}; {failed} failed"))
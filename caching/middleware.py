@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .identity import identity_map
+
+
+class IdentityMapMiddleware:
+    """
+    Give each request its own identity map (see ``caching.identity``).
+
+    Opt-in with ``IDENTITY_MAP_ENABLED = True``; the map is dropped when
+    the response is returned.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'IDENTITY_MAP_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map():
+            return self.get_response(request)
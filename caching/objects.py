@@ -0,0 +1,196 @@
+"""
+Read-through cache of single rows, looked up by primary key or by a unique
+field such as a slug.
+
+Each cached model carries a generation token, and each row a version token
+next to its data. A row is served only while the version stored with it is
+still the row's current version; writers replace the version (or, for
+changes they cannot pin to rows, the generation), so an entry filled from
+a read that raced a write is never served. Versions are replaced when the
+change events of a transaction are dispatched on commit; until then the
+transaction itself reads the rows it changed from the database and leaves
+the cache alone, while other connections still see the old rows anyway.
+
+Lookups by another unique field go through an alias key holding the primary
+key and the row version it was stored with, so an alias dies with the
+version of its row. A change to more than ``MAX_ROW_BUMPS`` rows replaces
+the generation rather than writing one version per row.
+
+Rows are kept as their concrete field values and rebuilt with ``from_db``,
+so annotations and related objects are never cached along with them.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .events import pending, subscriber
+
+KEY_PREFIX = 'objects'
+
+MAX_ROW_BUMPS = 100
+
+
+def _token():
+    return uuid.uuid4().hex
+
+
+def _timeout():
+    return getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+
+
+def is_cached(model):
+    return isinstance(model._default_manager, CachedManagerMixin)
+
+
+def _key(model, *parts):
+    # Proxies share the rows, and so the keys, of their concrete model
+    return ':'.join([KEY_PREFIX, model._meta.concrete_model._meta.label_lower, *map(str, parts)])
+
+
+def _generation(model):
+    key = _key(model, 'generation')
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _token(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(model, pks):
+    if pks is None or len(pks) > MAX_ROW_BUMPS:
+        cache.set(_key(model, 'generation'), _token(), None)
+        return
+    generation = _generation(model)
+    cache.set_many({_key(model, generation, pk, 'version'): _token() for pk in pks}, _timeout())
+
+
+@subscriber()
+def drop_changed_rows(changes):
+    for model, pks in changes.items():
+        if is_cached(model):
+            _bump(model, pks)
+
+
+class CachedManagerMixin:
+    """
+    Manager mixin adding ``cached_get()`` and ``get_many()``. Besides the
+    primary key, rows can be looked up by the unique fields named in
+    ``cached_lookups``; those lookups go through an alias key holding the
+    primary key and row version, checked against the row on every hit.
+    """
+
+    cached_lookups = ()
+
+    def _fields(self):
+        return [field.attname for field in self.model._meta.concrete_fields]
+
+    def _build(self, values):
+        return self.model.from_db(self.db, self._fields(), values)
+
+    def _versions(self, generation, pks):
+        """Current version of each row in ``pks``, creating missing ones before the database is read"""
+        keys = {pk: _key(self.model, generation, pk, 'version') for pk in pks}
+        found = cache.get_many(keys.values())
+        versions = {}
+        for pk, key in keys.items():
+            if key not in found:
+                cache.add(key, _token(), _timeout())
+                found[key] = cache.get(key)
+            versions[pk] = found[key]
+        return versions
+
+    def _store(self, generation, versions, instances):
+        cache.set_many({
+            _key(self.model, generation, instance.pk): (
+                versions[instance.pk], tuple(getattr(instance, name) for name in self._fields())
+            )
+            for instance in instances
+        }, _timeout())
+
+    def get_many(self, pks):
+        """Return ``{pk: instance}`` for the rows of ``pks`` that exist, reading only cache misses from the database"""
+        to_python = self.model._meta.pk.to_python
+        pks = {to_python(pk) for pk in pks}
+        changed = pending(self.model, self.db)
+        if changed is None:
+            return self.get_queryset().in_bulk(pks)
+        # Rows changed by the current transaction are read from the database and never cached
+        cacheable = pks - changed
+        generation = _generation(self.model)
+        data_keys = {pk: _key(self.model, generation, pk) for pk in cacheable}
+        version_keys = {pk: _key(self.model, generation, pk, 'version') for pk in cacheable}
+        found = cache.get_many([*data_keys.values(), *version_keys.values()])
+
+        instances, missing = {}, list(pks & changed)
+        for pk in cacheable:
+            entry, version = found.get(data_keys[pk]), found.get(version_keys[pk])
+            if entry is not None and version is not None and entry[0] == version:
+                instances[pk] = self._build(entry[1])
+            else:
+                missing.append(pk)
+        if missing:
+            storable = [pk for pk in missing if pk in cacheable]
+            versions = self._versions(generation, storable)
+            loaded = self.get_queryset().in_bulk(missing)
+            self._store(generation, versions, [loaded[pk] for pk in storable if pk in loaded])
+            instances.update(loaded)
+        return instances
+
+    def cached_get(self, **lookup):
+        """
+        Like ``get()`` for a single primary key or ``cached_lookups`` field,
+        served from the cache when possible. A lookup by another field only
+        learns the primary key on its first miss: the row is cached by the
+        next call, once its version can be read before the database is.
+        """
+        if len(lookup) != 1:
+            raise TypeError("cached_get() takes exactly one lookup")
+        (field, value), = lookup.items()
+        if field in ('pk', self.model._meta.pk.name):
+            instance = self.get_many([value]).get(self.model._meta.pk.to_python(value))
+            if instance is None:
+                raise self.model.DoesNotExist(f"{self.model._meta.object_name} matching query does not exist.")
+            return instance
+        if field not in self.cached_lookups:
+            raise ValueError(f"{field!r} is not a cached lookup of {self.model._meta.label}")
+
+        generation = _generation(self.model)
+        alias = _key(self.model, generation, field, value)
+        entry = cache.get(alias)
+        if entry is not None:
+            version, pk = entry
+            if cache.get(_key(self.model, generation, pk, 'version')) == version:
+                instance = self.get_many([pk]).get(pk)
+                if instance is not None and getattr(instance, field) == value:
+                    return instance
+        instance = self.get(**lookup)
+        changed = pending(self.model, self.db)
+        if changed is not None and instance.pk not in changed:
+            version = self._versions(generation, [instance.pk])[instance.pk]
+            cache.set(alias, (version, instance.pk), _timeout())
+        return instance
+
+
+def get_cached_or_404(model, **lookup):
+    """``get_object_or_404`` through ``cached_get``"""
+    try:
+        return model._default_manager.cached_get(**lookup)
+    except model.DoesNotExist:
+        raise Http404(f"No {model._meta.object_name} matches the given query.")
+
+
+def prefetch_cached(instances, *field_names):
+    """Fill the foreign keys ``field_names`` of ``instances`` from the object cache, one ``get_many`` per field"""
+    if not instances:
+        return
+    for name in field_names:
+        field = instances[0]._meta.get_field(name)
+        related = field.related_model._default_manager.get_many(
+            {getattr(instance, field.attname) for instance in instances} - {None}
+        )
+        for instance in instances:
+            value = getattr(instance, field.attname)
+            if value in related:
+                field.set_cached_value(instance, related[value])
@@ -0,0 +1,54 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from maintenance.signals import pre_bulk_delete, post_bulk_delete
+from orbit.models import Orbit
+from participant.models import Participant
+from participant.signals import post_merge
+from topic.models import Topic, Question, Answer
+
+from .events import publish
+
+# Models whose saves and deletes are published as change events
+TRACKED_MODELS = (Topic, Question, Answer, Orbit, Participant)
+
+
+def is_tracked(model):
+    return model._meta.concrete_model in TRACKED_MODELS
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def publish_changed_row(sender, instance, using, **kwargs):
+    if is_tracked(sender):
+        publish(sender, [instance.pk], using)
+
+
+@receiver(m2m_changed, sender=Topic.studying_participants.through)
+@receiver(m2m_changed, sender=Topic.bosses.through)
+def publish_membership(sender, instance, action, model, pk_set, using, **kwargs):
+    # Memberships belong to both sides; a clear doesn't say which rows it removed
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        publish(type(instance), [instance.pk], using)
+        if pk_set:
+            publish(model, pk_set, using)
+
+
+@receiver(pre_bulk_delete)
+def remember_bulk_deleted_rows(sender, queryset, state, **kwargs):
+    if is_tracked(sender):
+        state['published_pks'] = list(queryset.values_list('pk', flat=True))
+
+
+@receiver(post_bulk_delete)
+def publish_bulk_deleted_rows(sender, queryset, state, **kwargs):
+    if state.get('published_pks'):
+        publish(sender, state['published_pks'], queryset.db)
+
+
+@receiver(post_merge)
+def publish_merged_references(sender, **kwargs):
+    # References were moved with set-based updates, so every row pointing at a participant may have changed
+    for rel in sender._meta.related_objects:
+        if not rel.many_to_many:
+            publish(rel.related_model)
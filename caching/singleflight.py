@@ -0,0 +1,169 @@
+"""
+Stampede protection for expensive cached values.
+
+``get_or_compute()`` stores a value together with its expiry and the time it
+took to compute, and keeps it in the cache for a grace period past that
+expiry. Only one caller recomputes a key at a time: threads of a process
+coalesce on one in-process flight, and processes on a lock key in the cache.
+While a refresh is in flight everyone else is served the stale value, or,
+when there is none yet, waits briefly for the refreshing caller's result.
+
+Entries are also refreshed before they expire, with a probability that
+grows as the expiry approaches and with the cost of the computation
+("XFetch"), so a popular key is usually recomputed by one early request
+instead of by the crowd that arrives right after it expires.
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+
+LOCK_SUFFIX = ':lock'
+POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class Uncached(Exception):
+    """Raised by a computation to hand back ``value`` without caching it"""
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = _MISSING
+
+
+def _refresh_due(entry, beta):
+    _value, expires, delta = entry
+    # -log(u) for u in (0, 1] is exponentially distributed: usually small, occasionally large
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires
+
+
+def _compute(key, compute, timeout, grace):
+    started = time.monotonic()
+    try:
+        value = compute()
+    except Uncached as uncached:
+        return uncached.value
+    delta = time.monotonic() - started
+    cache.set(key, (value, time.time() + timeout, delta), timeout + grace)
+    return value
+
+
+def _lead(key, compute, timeout, entry, grace, lock_timeout, wait):
+    lock, token = key + LOCK_SUFFIX, uuid.uuid4().hex
+    if cache.add(lock, token, lock_timeout):
+        try:
+            return _compute(key, compute, timeout, grace)
+        finally:
+            if cache.get(lock) == token:
+                cache.delete(lock)
+    # Another process is refreshing the key
+    if entry is not None:
+        return entry[0]
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return _compute(key, compute, timeout, grace)
+
+
+def get_or_compute(key, compute, timeout, *, grace=None, lock_timeout=30, wait=5.0, beta=1.0):
+    """
+    Return the cached value of ``key``, calling ``compute()`` to fill it.
+    Values are fresh for ``timeout`` seconds and may be served stale for
+    ``grace`` more (by default another ``timeout``) while one caller
+    refreshes them. Callers with nothing to serve wait up to ``wait``
+    seconds for that refresh before computing the value themselves.
+    ``beta`` scales early refreshes: 0 disables them, above 1 favours them.
+    """
+    grace = timeout if grace is None else grace
+    entry = cache.get(key)
+    if entry is not None and not _refresh_due(entry, beta):
+        return entry[0]
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        if entry is not None:
+            return entry[0]
+        if flight.done.wait(wait) and flight.value is not _MISSING:
+            return flight.value
+        return _compute(key, compute, timeout, grace)
+
+    try:
+        flight.value = _lead(key, compute, timeout, entry, grace, lock_timeout, wait)
+        return flight.value
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def single_flight(timeout, key=None, **options):
+    """
+    Decorator caching a function's result through ``get_or_compute``.
+    ``key(*args, **kwargs)`` builds the cache key; by default it is the
+    function's qualified name and a hash of the arguments' ``repr()``.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def make_key(*args, **kwargs):
+            if key is not None:
+                return key(*args, **kwargs)
+            arguments = repr((args, sorted(kwargs.items()))).encode()
+            return f'single_flight:{name}:{hashlib.md5(arguments).hexdigest()}'
+
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            return get_or_compute(make_key(*args, **kwargs), lambda: func(*args, **kwargs), timeout, **options)
+        return wrapped
+    return decorator
+
+
+def cache_view(timeout, key_prefix='', **options):
+    """
+    Page cache with stampede protection. Successful GET and HEAD responses
+    are cached by full path under ``key_prefix``, a string or a callable
+    returning one (to carry a version token, say). Unlike ``cache_page``
+    the cache does not vary on cookies, so apply it below the view's access
+    checks and only to pages without per-user content.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            def render():
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    raise Uncached(response)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                return response
+
+            prefix = key_prefix() if callable(key_prefix) else key_prefix
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            return get_or_compute(f'views.{prefix}:{path}', render, timeout, **options)
+        return wrapped
+    return decorator
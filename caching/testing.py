@@ -0,0 +1,27 @@
+import copy
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+FILE_BASED = {'django.core.cache.backends.filebased.FileBasedCache', 'caching.backends.FileCache'}
+
+
+class TestRunner(DiscoverRunner):
+    """Run the suite with file-based caches in a temporary directory, so tests never see the site's cache"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.TemporaryDirectory(prefix='cognify-test-cache-')
+        caches = copy.deepcopy(settings.CACHES)
+        for alias, config in caches.items():
+            if config['BACKEND'] in FILE_BASED:
+                config['LOCATION'] = f"{self._cache_dir.name}/{alias}"
+        self._caches = override_settings(CACHES=caches)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        self._cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,433 @@
+import threading
+import time
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from diagnostics.testing import login_master
+from maintenance.deletion import bulk_delete
+from master.models import Master
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from .backends import TieredCache
+from .events import pending, publish, subscribe, unsubscribe
+from .identity import current_identity_map, identity_map
+from .objects import MAX_ROW_BUMPS
+from .singleflight import LOCK_SUFFIX, Uncached, get_or_compute, single_flight
+from .warmup import hot_urls, read_popularity, warm
+
+
+class IdentityMapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Participant.objects.create(nickname='ada', firstname='Ada', lastname='Mapped')
+        cls.orbit = Orbit.objects.create(name='Mapped orbit')
+        for i in range(3):
+            topic = Topic.objects.create(
+                about=cls.ada, orbit=cls.orbit, title=f"Mapped topic {i}", description='Loaded once per request.',
+            )
+        question = Question.objects.create(topic=topic, question_text='Who is this about?')
+        Answer.objects.create(question=question, participant=cls.ada, answer_text='Ada')
+
+    def test_rows_load_into_one_instance(self):
+        with identity_map() as mapping:
+            topics = list(Topic.objects.select_related('about'))
+            self.assertEqual(len({id(topic.about) for topic in topics}), 1)
+            self.assertIs(Participant.objects.get(pk=self.ada.pk), topics[0].about)
+            self.assertIs(Topic.objects.get(pk=topics[0].pk), topics[0])
+            self.assertEqual(mapping.hits, 4)
+        self.assertIsNone(current_identity_map())
+        self.assertIsNot(Participant.objects.get(pk=self.ada.pk), topics[0].about)
+
+    def test_foreign_keys_resolve_from_the_map(self):
+        with identity_map():
+            orbits = list(Orbit.objects.all())
+            participants = list(Participant.objects.all())
+            with self.assertNumQueries(2):
+                topics = list(Topic.objects.all())
+                [str(answer) for answer in Answer.objects.all()]
+            with self.assertNumQueries(0):
+                self.assertEqual([str(topic).split(' - ')[1] for topic in topics], ['About: ada'] * 3)
+                self.assertIs(topics[0].orbit, orbits[0])
+                self.assertIs(topics[0].about, participants[0])
+
+    def test_writes_invalidate(self):
+        with identity_map() as mapping:
+            ada = Participant.objects.get(pk=self.ada.pk)
+            Participant.objects.filter(pk=ada.pk).update(bio='Changed behind its back')
+            self.assertEqual(Participant.objects.get(pk=ada.pk).bio, 'Changed behind its back')
+
+            topic = Topic.objects.first()
+            topic.title = 'Saved topic title'
+            topic.save()
+            self.assertIs(Topic.objects.get(pk=topic.pk), topic)
+
+            Topic.objects.filter(pk=topic.pk).update(title='Renamed in SQL')
+            topic.refresh_from_db()
+            self.assertEqual(topic.title, 'Renamed in SQL')
+            self.assertIs(Topic.objects.get(pk=topic.pk), topic)
+
+            Topic.objects.all().delete()
+            self.assertEqual(len([key for key in mapping._instances if key[0] is Topic]), 0)
+
+    def test_deferred_rows_are_not_shared(self):
+        with identity_map():
+            partial = Participant.objects.only('nickname').get(pk=self.ada.pk)
+            self.assertIsNot(Participant.objects.get(pk=self.ada.pk), partial)
+
+    def test_middleware_scopes_map_to_the_request(self):
+        login_master(self.client, Master.objects.create(username='mapped', password='mapped-pass'))
+        url = Topic.objects.first().get_absolute_url()
+        queries = {}
+        for enabled in (False, True):
+            with override_settings(IDENTITY_MAP_ENABLED=enabled), CaptureQueriesContext(connection) as context:
+                self.client.handler.load_middleware()
+                self.assertEqual(self.client.get(url).status_code, 200)
+            queries[enabled] = len(context)
+        self.assertLess(queries[True], queries[False])
+        self.assertIsNone(current_identity_map())
+
+
+class ObjectCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Rows changed by the running transaction bypass the cache until it commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ada = Participant.objects.create(nickname='ada', firstname='Ada', lastname='Cached')
+            self.orbit = Orbit.objects.create(name='Cached orbit')
+            self.topic = Topic.objects.create(
+                about=self.ada, orbit=self.orbit, title='Cached topic', description='Served from the cache.',
+            )
+
+    def test_cached_get_reads_the_database_once(self):
+        with self.assertNumQueries(1):
+            Topic.objects.cached_get(slug=self.topic.slug)
+        with self.assertNumQueries(2):
+            Topic.objects.cached_get(slug=self.topic.slug)  # the alias hit fills the row
+            Orbit.objects.cached_get(pk=self.orbit.pk)
+        with self.assertNumQueries(0):
+            topic = Topic.objects.cached_get(slug=self.topic.slug)
+            self.assertEqual(Orbit.objects.cached_get(pk=self.orbit.pk).name, 'Cached orbit')
+            self.assertEqual(Orbit.objects.cached_get(pk=str(self.orbit.pk)).name, 'Cached orbit')
+        self.assertEqual((topic.pk, topic.title, topic.about_id), (self.topic.pk, 'Cached topic', self.ada.pk))
+        self.assertFalse(topic._state.adding)
+
+    def test_writes_invalidate_rows(self):
+        Topic.objects.cached_get(pk=self.topic.pk)
+        self.topic.title = 'Renamed topic'
+        self.topic.save()
+        self.assertEqual(Topic.objects.cached_get(pk=self.topic.pk).title, 'Renamed topic')
+
+        Question.objects.create(topic=self.topic, question_text='Is the counter fresh?')
+        self.assertEqual(Topic.objects.cached_get(pk=self.topic.pk).question_count, 1)
+
+        Topic.objects.cached_get(slug=self.topic.slug)
+        old_slug = self.topic.slug
+        self.topic.slug = 'moved-topic'
+        self.topic.save()
+        with self.assertRaises(Topic.DoesNotExist):
+            Topic.objects.cached_get(slug=old_slug)
+
+        bulk_delete(Topic.objects.filter(pk=self.topic.pk))
+        with self.assertRaises(Topic.DoesNotExist):
+            Topic.objects.cached_get(pk=self.topic.pk)
+
+    def test_commit_replaces_versions(self):
+        Topic.objects.cached_get(pk=self.topic.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Topic.objects.filter(pk=self.topic.pk).update(title='Renamed in SQL')
+            publish(Topic, [self.topic.pk])
+            self.assertEqual(pending(Topic), {self.topic.pk})
+        self.assertEqual(pending(Topic), set())
+        with self.assertNumQueries(1):
+            self.assertEqual(Topic.objects.cached_get(pk=self.topic.pk).title, 'Renamed in SQL')
+
+    def test_aliases_follow_row_versions(self):
+        Topic.objects.cached_get(slug=self.topic.slug)
+        Topic.objects.cached_get(slug=self.topic.slug)
+        with self.captureOnCommitCallbacks(execute=True):
+            publish(Topic, [self.topic.pk])
+        with self.assertNumQueries(1):
+            Topic.objects.cached_get(slug=self.topic.slug)  # the stale alias is not followed
+
+    def test_large_changes_replace_the_generation(self):
+        Topic.objects.cached_get(pk=self.topic.pk)
+        changed = [self.topic.pk, *(uuid.uuid4() for _ in range(MAX_ROW_BUMPS))]
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many, \
+                self.captureOnCommitCallbacks(execute=True):
+            publish(Topic, changed)
+        self.assertEqual([key for call in set_many.call_args_list for key in call.args[0]],
+                         ['objects:topic.topic:generation'])
+        with self.assertNumQueries(1):
+            Topic.objects.cached_get(pk=self.topic.pk)
+
+    def test_get_many_only_loads_misses(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bob = Participant.objects.create(nickname='bob', firstname='Bob', lastname='Cached')
+        Participant.objects.cached_get(pk=self.ada.pk)
+        missing = uuid.uuid4()
+        with self.assertNumQueries(1):
+            participants = Participant.objects.get_many([self.ada.pk, bob.pk, missing])
+        self.assertEqual(set(participants), {self.ada.pk, bob.pk})
+        with self.assertNumQueries(0):
+            Participant.objects.get_many([self.ada.pk, bob.pk])
+
+    def test_detail_view_reads_parent_rows_from_the_cache(self):
+        login_master(self.client, Master.objects.create(username='cached', password='cached-pass'))
+        for _ in range(2):
+            self.client.get(self.topic.get_absolute_url())
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.topic.get_absolute_url())
+        self.assertContains(response, 'Cached orbit')
+        lookups = ('"topic_topic"."slug" =', '"topic_topic"."id" IN', '"orbit_orbit"."id" IN',
+                   '"participant_participant"."id" IN')
+        self.assertEqual([query['sql'] for query in context if any(lookup in query['sql'] for lookup in lookups)], [])
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        # Two workers: separate in-process L1s over the same shared L2
+        self.first, self.second = (TieredCache('shared', {'OPTIONS': {'L1_MAX_ENTRIES': 2}}) for _ in range(2))
+        self.first.clear()
+
+    def test_reads_fill_l1(self):
+        self.first.set('page', {'html': 'v1'})
+        self.assertEqual(self.second.get('page'), {'html': 'v1'})
+        self.assertEqual(self.second.get('page'), {'html': 'v1'})
+        self.assertIsNone(self.second.get('absent'))
+        self.assertEqual(self.second.stats(), {'l1_hits': 1, 'l1_misses': 2, 'l2_hits': 1, 'l2_misses': 1})
+
+    def test_writes_invalidate_other_workers(self):
+        self.first.set('page', 'v1')
+        self.assertEqual(self.second.get('page'), 'v1')
+        self.first.set('page', 'v2')
+        self.assertEqual(self.second.get('page'), 'v2')
+        self.first.delete('page')
+        self.assertIsNone(self.second.get('page'))
+        self.assertFalse(self.second.add('counter', 1) and self.first.add('counter', 2))
+        self.assertEqual(self.first.get('counter'), 1)
+
+    def test_l1_is_bounded_and_copies_values(self):
+        self.first.set_many({'a': [1], 'b': [2], 'c': [3]})
+        self.assertEqual(len(self.first._l1), 2)
+        self.first.get('a').append(4)
+        self.assertEqual(self.first.get_many(['a', 'b', 'c']), {'a': [1], 'b': [2], 'c': [3]})
+
+    def test_batches_reach_l2_in_one_call(self):
+        self.first.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.second.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        with mock.patch.object(self.first.l2, 'delete_many', wraps=self.first.l2.delete_many) as delete_many:
+            self.first.delete_many(['a', 'b'])
+        delete_many.assert_called_once()
+        self.assertEqual(self.second.get_many(['a', 'b']), {})
+
+    def test_large_batch_on_a_full_cache_scans_it_rarely(self):
+        # A realistic shared cache: the stock file cache lists it on every write
+        l2 = self.first.l2
+        l2.set_many({f'filler:{n}': n for n in range(4000)})
+        with mock.patch.object(l2, 'set_many', wraps=l2.set_many) as set_many, \
+                mock.patch.object(l2, '_list_cache_files', wraps=l2._list_cache_files) as listings:
+            self.first.set_many({f'row:{n}': n for n in range(900)})
+        set_many.assert_called_once()
+        self.assertLessEqual(listings.call_count, 1800 // 100)
+        self.assertEqual(self.second.get('row:899'), 899)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def compute(self, value='fresh'):
+        self.calls.append(value)
+        return value
+
+    def test_fresh_values_are_not_recomputed(self):
+        for _ in range(3):
+            self.assertEqual(get_or_compute('page', self.compute, 60, beta=0), 'fresh')
+        self.assertEqual(self.calls, ['fresh'])
+
+    def test_concurrent_misses_compute_once(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return self.compute()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(get_or_compute('page', slow, 60)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(get_or_compute('page', slow, 60)))
+                     for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+        self.assertEqual(results, ['fresh'] * 5)
+        self.assertEqual(self.calls, ['fresh'])
+
+    def test_stale_value_served_while_another_worker_refreshes(self):
+        cache.set('page', ('stale', time.time() - 30, 0.0), 60)
+        cache.add('page' + LOCK_SUFFIX, 'other worker', 30)
+        self.assertEqual(get_or_compute('page', self.compute, 60), 'stale')
+        self.assertEqual(self.calls, [])
+
+    def test_expired_value_refreshed_by_the_lock_holder(self):
+        cache.set('page', ('stale', time.time() - 30, 0.0), 60)
+        self.assertEqual(get_or_compute('page', self.compute, 60), 'fresh')
+        self.assertEqual(get_or_compute('page', self.compute, 60), 'fresh')
+        self.assertEqual(self.calls, ['fresh'])
+        self.assertIsNone(cache.get('page' + LOCK_SUFFIX))
+
+    def test_early_refresh_before_expiry(self):
+        cache.set('page', ('old', time.time() + 5, 1.0), 60)
+        with mock.patch('caching.singleflight.random.random', return_value=0.5):
+            self.assertEqual(get_or_compute('page', self.compute, 60), 'old')
+        with mock.patch('caching.singleflight.random.random', return_value=0.999999):
+            self.assertEqual(get_or_compute('page', self.compute, 60), 'fresh')
+
+    def test_waiters_time_out_when_nothing_is_cached(self):
+        cache.add('page' + LOCK_SUFFIX, 'other worker', 30)
+        self.assertEqual(get_or_compute('page', self.compute, 60, wait=0), 'fresh')
+
+    def test_uncached_results_and_decorator(self):
+        def failing():
+            raise Uncached('not found')
+        self.assertEqual(get_or_compute('page', failing, 60), 'not found')
+        self.assertIsNone(cache.get('page'))
+
+        @single_flight(60)
+        def square(number):
+            self.calls.append(number)
+            return number * number
+        self.assertEqual([square(3), square(3), square(4)], [9, 9, 16])
+        self.assertEqual(self.calls, [3, 4])
+
+
+class WarmupTests(TestCase):
+    def test_popularity_list_orders_by_count(self):
+        lines = ['# from the access log', '  12 /topics/', '/orbits/', '', ' 40 /participants/', 'GET', '12 /topics/']
+        self.assertEqual(read_popularity(lines), ['/participants/', '/topics/', '/topics/', '/orbits/'])
+        self.assertEqual(hot_urls(2, lines), ['/participants/', '/topics/'])
+
+    def test_recent_objects_follow_list_pages(self):
+        ada = Participant.objects.create(nickname='ada', firstname='Ada', lastname='Warm')
+        orbits = [Orbit.objects.create(name=f'Warm orbit {i}') for i in range(2)]
+        topic = Topic.objects.create(about=ada, orbit=orbits[0], title='Warm topic', description='Recently updated.')
+        self.assertEqual(hot_urls(8), [
+            '/topics/', '/orbits/', '/participants/', '/dashboard/',
+            topic.get_absolute_url(), ada.get_absolute_url(), orbits[1].get_absolute_url(),
+            orbits[0].get_absolute_url(),
+        ])
+
+    def test_warm_respects_concurrency_and_budget(self):
+        in_flight, peak = [], []
+
+        class Transport:
+            def request(self, method, url):
+                in_flight.append(url)
+                peak.append(len(in_flight))
+                time.sleep(0.05)
+                in_flight.remove(url)
+                return mock.Mock(status=200, headers={}, body=b'')
+
+        results = warm([f'/page/{i}/' for i in range(6)], lambda i: Transport(), concurrency=2)
+        self.assertEqual(sorted(url for url, _outcome, _ms in results), [f'/page/{i}/' for i in range(6)])
+        self.assertEqual({outcome for _url, outcome, _ms in results}, {'ok'})
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(warm(['/page/'], lambda i: Transport(), budget=0), [])
+
+
+class WarmCachesCommandTests(TransactionTestCase):
+    @override_settings(ALLOWED_HOSTS=['localhost', 'testserver'])
+    def test_command_fills_the_page_cache(self):
+        cache.clear()
+        Master.objects.create(username='warmer', password='warmer-pass')
+        Topic.objects.create(
+            about=Participant.objects.create(nickname='ada', firstname='Ada', lastname='Warm'),
+            orbit=Orbit.objects.create(name='Warm orbit'), title='Warm topic', description='Rendered ahead of time.',
+        )
+        out = StringIO()
+        call_command('warm_caches', concurrency=2, stdout=out)
+        self.assertIn('Warmed 7 of 7 URLs', out.getvalue())
+        self.assertFalse(Session.objects.exists())
+
+        login_master(self.client, Master.objects.get())
+        with CaptureQueriesContext(connection) as context:
+            self.assertContains(self.client.get('/topics/'), 'Warm topic')
+        self.assertFalse([query for query in context if '"topic_topic"' in query['sql']])
+
+
+class ChangeEventTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.members = [
+                Participant.objects.create(nickname=f'member{i}', firstname='Eve', lastname=f'Evented{chr(65 + i)}')
+                for i in range(4)
+            ]
+            self.topic = Topic.objects.create(
+                about=self.members[0], orbit=Orbit.objects.create(name='Evented orbit'),
+                title='Evented topic', description='Changes are published once.',
+            )
+        self.received = []
+        subscribe(self.received.append, [Topic, Question, Participant])
+        self.addCleanup(unsubscribe, self.received.append)
+
+    def test_form_save_is_one_event_per_object(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.topic.description = 'Edited together with its members.'
+            self.topic.save()
+            self.topic.studying_participants.set(self.members)
+            self.topic.bosses.set(self.members[:2])
+            self.topic.bosses.set(self.members[2:])
+            self.assertEqual(self.received, [])
+        self.assertEqual(self.received, [{
+            Topic: frozenset([self.topic.pk]), Participant: frozenset(member.pk for member in self.members),
+        }])
+
+    def test_bulk_changes_are_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            question = Question.objects.create(topic=self.topic, question_text='How many events are sent?')
+            for i in range(30):
+                Answer.objects.create(question=question, participant=self.members[i % 4], answer_text=f'{i}')
+            bulk_delete(Answer.objects.filter(question=question))
+        self.assertEqual(self.received, [{Topic: frozenset([self.topic.pk]), Question: frozenset([question.pk])}])
+
+    def test_rolled_back_savepoints_are_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    publish(Topic, [self.topic.pk])
+                    publish(Participant)
+                    raise ValueError
+            except ValueError:
+                pass
+            self.assertEqual(pending(Participant), set())
+            with transaction.atomic():
+                publish(Question, [1, 2])
+            publish(Question, [2, 3])
+        self.assertEqual(self.received, [{Question: frozenset([1, 2, 3])}])
+
+    def test_failing_subscriber_does_not_stop_others(self):
+        def failing(changes):
+            raise RuntimeError('index unavailable')
+        self.received.clear()
+        unsubscribe(self.received.append)
+        subscribe(failing)
+        subscribe(self.received.append)
+        self.addCleanup(unsubscribe, failing)
+        with self.assertLogs('caching.events', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            publish(Orbit)
+        self.assertEqual(self.received, [{Orbit: None}])
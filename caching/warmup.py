@@ -0,0 +1,114 @@
+"""
+Cache warm-up after a deploy or a flush: request the hottest pages once, so
+the page and object caches are filled before users arrive.
+
+Pages are requested as a master, through the same transports the load test
+uses. In-process requests fill the shared cache tier every worker reads;
+warming a running server's URL also fills that server's in-process tier.
+"""
+import threading
+import time
+from importlib import import_module
+from itertools import zip_longest
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import reverse
+
+from diagnostics.loadtest import classify
+from master.models import Master
+from orbit.models import Orbit
+from topic.models import Topic
+
+LIST_VIEWS = ['topics:topic_list', 'orbits:orbit_list', 'participants:participant_list', 'dashboard:dashboard']
+
+
+def read_popularity(lines):
+    """
+    Paths from an access-log-derived popularity list, most requested first.
+    Each line is a path, optionally preceded by its request count (the
+    ``sort | uniq -c`` format); blank lines and ``#`` comments are skipped.
+    """
+    counted = []
+    for position, line in enumerate(lines):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        count, _, path = line.rpartition(' ')
+        if not path.startswith('/'):
+            continue
+        counted.append((-int(count) if count.strip().isdigit() else 0, position, path))
+    return [path for _count, _position, path in sorted(counted)]
+
+
+def recent_urls():
+    """List pages, then recently updated topics and orbits with the participants those topics are about"""
+    yield from (reverse(name) for name in LIST_VIEWS)
+    topics = Topic.objects.select_related('about').order_by('-updated_at').iterator()
+    orbits = Orbit.objects.order_by('-updated_at').iterator()
+    for topic, orbit in zip_longest(topics, orbits):
+        if topic is not None:
+            yield from (topic.get_absolute_url(), topic.about.get_absolute_url())
+        if orbit is not None:
+            yield orbit.get_absolute_url()
+
+
+def hot_urls(limit, popularity=None):
+    """The first ``limit`` distinct URLs of ``popularity`` (lines of a popularity list), or of ``recent_urls()``"""
+    urls = []
+    for url in read_popularity(popularity) if popularity is not None else recent_urls():
+        if url not in urls:
+            urls.append(url)
+            if len(urls) == limit:
+                break
+    return urls
+
+
+def master_session(username=None):
+    """Session key of a new session logged in as ``username``, or as the first active master"""
+    masters = Master.objects.filter(is_active=True).order_by('pk')
+    master = masters.filter(username=username).first() if username else masters.first()
+    if master is None:
+        raise ValueError(f"No active master {username!r}" if username else 'No active master to warm pages as')
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session['master_id'] = master.id
+    session['master_username'] = master.username
+    session.create()
+    return session.session_key
+
+
+def warm(urls, make_transport, concurrency=4, budget=60.0):
+    """
+    GET ``urls`` in order with at most ``concurrency`` requests in flight.
+    No request starts once ``budget`` seconds have passed. Returns
+    ``[(url, outcome, milliseconds)]`` for the URLs that were requested.
+    """
+    deadline = time.monotonic() + budget
+    pending = iter(urls)
+    results = []
+    lock = threading.Lock()
+
+    def worker(i):
+        transport = make_transport(i)
+        try:
+            while time.monotonic() < deadline:
+                with lock:
+                    url = next(pending, None)
+                if url is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    outcome = classify(transport.request('GET', url))
+                except Exception as error:
+                    outcome = f"exception: {error}"
+                with lock:
+                    results.append((url, outcome, (time.perf_counter() - started) * 1000))
+        finally:
+            close_old_connections()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily dashboard rollups from scratch, or catch them up from their watermarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--catch-up', action='store_true',
+                            help='Only fold in rows created since the last run instead of rebuilding')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['catch_up']:
+            advanced = rollups.catch_up()
+            self.stdout.write(self.style.SUCCESS(
+                f"Caught up {advanced} source(s) in {time.perf_counter() - started:.1f}s"
+            ))
+            return
+
+        groups = rollups.rebuild()
+        for name, count in groups.items():
+            self.stdout.write(f"  {name}: {count} rows")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups in {time.perf_counter() - started:.1f}s"))
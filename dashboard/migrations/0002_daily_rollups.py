@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0002_orbit_statistics_totals'),
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyParticipantActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('joined', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Participant Activity',
+                'verbose_name_plural': 'Daily Participant Activity',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyOrbitActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('topics', models.PositiveIntegerField(default=0)),
+                ('questions', models.PositiveIntegerField(default=0)),
+                ('answers', models.PositiveIntegerField(default=0)),
+                ('correct_answers', models.PositiveIntegerField(default=0)),
+                ('orbit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='orbit.orbit')),
+            ],
+            options={
+                'verbose_name': 'Daily Orbit Activity',
+                'verbose_name_plural': 'Daily Orbit Activity',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyorbitactivity',
+            constraint=models.UniqueConstraint(fields=('day', 'orbit'), name='unique_daily_orbit_activity'),
+        ),
+    ]
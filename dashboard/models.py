@@ -13,3 +13,48 @@ class AntiSpyQuote(models.Model):
         verbose_name = 'Anti Spy Quote'
         verbose_name_plural = 'Anti Spy Quotes'
         ordering = ['-created_at']
+
+
+class DailyOrbitActivity(models.Model):
+    """Topics, questions and answers created per day and orbit (see dashboard.rollups)"""
+    day = models.DateField()
+    orbit = models.ForeignKey('orbit.Orbit', on_delete=models.CASCADE, related_name='daily_activity')
+    topics = models.PositiveIntegerField(default=0)
+    questions = models.PositiveIntegerField(default=0)
+    answers = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.orbit_id}: {self.topics}/{self.questions}/{self.answers}"
+
+    class Meta:
+        verbose_name = 'Daily Orbit Activity'
+        verbose_name_plural = 'Daily Orbit Activity'
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'orbit'], name='unique_daily_orbit_activity'),
+        ]
+
+
+class DailyParticipantActivity(models.Model):
+    """Participants who joined per day"""
+    day = models.DateField(unique=True)
+    joined = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.joined} joined"
+
+    class Meta:
+        verbose_name = 'Daily Participant Activity'
+        verbose_name_plural = 'Daily Participant Activity'
+        ordering = ['day']
+
+
+class RollupWatermark(models.Model):
+    """How far a rollup source has been folded in: a primary key or an ISO timestamp"""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position or 'start'}"
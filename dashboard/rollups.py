@@ -0,0 +1,301 @@
+import datetime
+import logging
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from .models import DailyOrbitActivity, DailyParticipantActivity, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+class OrbitSource:
+    """
+    Rows of ``model`` counted per creation day and orbit into one column of
+    ``DailyOrbitActivity``. Primary keys only grow, so the watermark is the
+    highest primary key folded in so far.
+    """
+
+    def __init__(self, name, model, orbit_path, column):
+        self.name = name
+        self.model = model
+        self.orbit_path = orbit_path
+        self.column = column
+
+    def parse(self, position):
+        return int(position) if position else None
+
+    def format(self, value):
+        return str(value)
+
+    def high(self):
+        return self.model.objects.aggregate(high=Max('pk'))['high']
+
+    @property
+    def topic_path(self):
+        return self.orbit_path.rpartition('__')[0] or 'pk'
+
+    def aggregate(self, low, high, topic_ids=None, orbit_id=None, days=None):
+        """Return ``{(day, orbit_id): {column: count}}`` for rows in ``(low, high]``"""
+        queryset = self.model.objects.filter(pk__lte=high)
+        if low is not None:
+            queryset = queryset.filter(pk__gt=low)
+        if topic_ids is not None:
+            queryset = queryset.filter(**{f'{self.topic_path}__in': topic_ids})
+        if orbit_id is not None:
+            queryset = queryset.filter(**{self.orbit_path: orbit_id})
+        if days is not None:
+            # Ranges rather than ``__date``, which wraps the column and keeps indexes out
+            spans = Q()
+            for day in days:
+                spans |= Q(created_at__gte=day_start(day), created_at__lt=day_start(day + datetime.timedelta(days=1)))
+            queryset = queryset.filter(spans)
+        counts = {self.column: Count('pk')}
+        if self.model is Answer:
+            counts['correct_answers'] = Count('pk', filter=Q(is_correct=True))
+        rows = (
+            queryset.order_by()
+            .values(rollup_day=TruncDate('created_at'), rollup_orbit=F(self.orbit_path))
+            .annotate(**counts)
+        )
+        return {
+            (row.pop('rollup_day'), row.pop('rollup_orbit')): row
+            for row in rows
+        }
+
+    def apply(self, rows):
+        if not rows:
+            return
+        existing = {
+            (activity.day, activity.orbit_id): activity
+            for activity in DailyOrbitActivity.objects.filter(
+                day__in={day for day, _ in rows}, orbit_id__in={orbit for _, orbit in rows}
+            )
+        }
+        created, updated = [], []
+        for (day, orbit_id), counts in rows.items():
+            activity = existing.get((day, orbit_id))
+            if activity is None:
+                activity = DailyOrbitActivity(day=day, orbit_id=orbit_id)
+                created.append(activity)
+            else:
+                updated.append(activity)
+            for column, count in counts.items():
+                setattr(activity, column, getattr(activity, column) + count)
+        fields = sorted({column for counts in rows.values() for column in counts})
+        DailyOrbitActivity.objects.bulk_update(updated, fields, batch_size=500)
+        DailyOrbitActivity.objects.bulk_create(created, batch_size=500)
+
+    def clear(self):
+        DailyOrbitActivity.objects.all().delete()
+
+
+class ParticipantSource:
+    """
+    Participants counted per day joined. UUID keys have no order, so the
+    watermark is a ``date_joined`` timestamp that trails the clock by
+    ``ROLLUP_LAG_SECONDS`` to let in-flight inserts commit first.
+    """
+
+    name = 'participants'
+
+    def parse(self, position):
+        return parse_datetime(position) if position else None
+
+    def format(self, value):
+        return value.isoformat()
+
+    def high(self):
+        return timezone.now() - datetime.timedelta(seconds=getattr(settings, 'ROLLUP_LAG_SECONDS', 5))
+
+    def aggregate(self, low, high):
+        queryset = Participant.objects.filter(date_joined__lte=high)
+        if low is not None:
+            queryset = queryset.filter(date_joined__gt=low)
+        rows = queryset.order_by().values(rollup_day=TruncDate('date_joined')).annotate(joined=Count('pk'))
+        return {row['rollup_day']: row['joined'] for row in rows}
+
+    def apply(self, rows):
+        if not rows:
+            return
+        existing = DailyParticipantActivity.objects.in_bulk(list(rows), field_name='day')
+        created = []
+        for day, joined in rows.items():
+            if day in existing:
+                existing[day].joined += joined
+            else:
+                created.append(DailyParticipantActivity(day=day, joined=joined))
+        DailyParticipantActivity.objects.bulk_update(existing.values(), ['joined'], batch_size=500)
+        DailyParticipantActivity.objects.bulk_create(created, batch_size=500)
+
+    def clear(self):
+        DailyParticipantActivity.objects.all().delete()
+
+
+ANSWERS = OrbitSource('answers', Answer, 'question__topic__orbit', 'answers')
+
+SOURCES = [
+    OrbitSource('topics', Topic, 'orbit', 'topics'),
+    OrbitSource('questions', Question, 'topic__orbit', 'questions'),
+    ANSWERS,
+    ParticipantSource(),
+]
+
+
+def catch_up(backfill=True):
+    """
+    Fold rows created since each source's watermark into the rollup tables.
+    The watermark is claimed with a compare-and-set update in the same
+    transaction as the increments, so concurrent callers never count a row
+    twice. Without ``backfill``, sources that were never folded in are
+    skipped instead of aggregated over their whole history. Returns the
+    number of sources that advanced.
+    """
+    advanced = 0
+    for source in SOURCES:
+        watermark, _ = RollupWatermark.objects.get_or_create(name=source.name)
+        low = source.parse(watermark.position)
+        if low is None and not backfill:
+            continue
+        high = source.high()
+        if high is None or (low is not None and high <= low):
+            continue
+        with transaction.atomic():
+            claimed = RollupWatermark.objects.filter(pk=watermark.pk, position=watermark.position).update(
+                position=source.format(high), updated_at=timezone.now(),
+            )
+            if not claimed:
+                continue
+            source.apply(source.aggregate(low, high))
+        advanced += 1
+    return advanced
+
+
+def reassign_topics(topic_ids, orbit_id):
+    """
+    Move the rollup counts of ``topic_ids`` and their questions and answers
+    from their current orbits to ``orbit_id``. Must run in the transaction
+    that re-points the topics, before the update: only rows at or below a
+    watermark were folded in, later ones are counted under their new orbit
+    by the next ``catch_up``. The watermark rows are written first so that
+    no concurrent ``catch_up`` can advance them in between.
+    """
+    sources = [source for source in SOURCES if isinstance(source, OrbitSource)]
+    RollupWatermark.objects.filter(name__in=[source.name for source in sources]).update(position=F('position'))
+    positions = dict(RollupWatermark.objects.values_list('name', 'position'))
+    for source in sources:
+        high = source.parse(positions.get(source.name))
+        if high is None:
+            continue
+        moved = {}
+        for (day, old_orbit_id), counts in source.aggregate(None, high, topic_ids=topic_ids).items():
+            if old_orbit_id == orbit_id:
+                continue
+            for key, sign in (((day, old_orbit_id), -1), ((day, orbit_id), 1)):
+                row = moved.setdefault(key, dict.fromkeys(counts, 0))
+                for column, count in counts.items():
+                    row[column] += sign * count
+        source.apply(moved)
+
+
+def refold_correct_answers(buckets):
+    """
+    Recount ``correct_answers`` of the ``(day, orbit_id)`` buckets from the
+    answers folded in so far. The column counts a state rather than
+    creations, so it is re-folded whenever answers change correctness or
+    are deleted; answers above the watermark are left to the next
+    ``catch_up``. Each orbit is recounted with one query that reaches its
+    answers through the topic, question and answer indexes.
+    """
+    days_by_orbit = defaultdict(set)
+    for day, orbit_id in buckets or ():
+        if orbit_id is not None:
+            days_by_orbit[orbit_id].add(day)
+    if not days_by_orbit:
+        return
+    with transaction.atomic():
+        # Written first, as in reassign_topics, so no catch_up adds to these rows in between
+        RollupWatermark.objects.filter(name=ANSWERS.name).update(position=F('position'))
+        position = RollupWatermark.objects.filter(name=ANSWERS.name).values_list('position', flat=True).first()
+        high = ANSWERS.parse(position)
+        if high is None:
+            return
+        activities = []
+        for orbit_id, days in days_by_orbit.items():
+            counts = ANSWERS.aggregate(None, high, orbit_id=orbit_id, days=days)
+            for activity in DailyOrbitActivity.objects.filter(orbit_id=orbit_id, day__in=days):
+                activity.correct_answers = counts.get((activity.day, orbit_id), {}).get('correct_answers', 0)
+                activities.append(activity)
+        DailyOrbitActivity.objects.bulk_update(activities, ['correct_answers'], batch_size=500)
+
+
+def refold_correct_answers_on_commit(holder, buckets, using=None):
+    """
+    Re-fold ``buckets`` once the current transaction commits, outside the
+    write that changed them. Buckets gathered on the same ``holder`` (the
+    object a cascading delete started from) are re-folded together, so a
+    delete reaching many answers recounts once.
+    """
+    holder.__dict__.setdefault('_refolded_buckets', set()).update(buckets)
+    transaction.on_commit(partial(_refold_gathered_buckets, holder), using=using)
+
+
+def _refold_gathered_buckets(holder):
+    refold_correct_answers(holder.__dict__.pop('_refolded_buckets', None))
+
+
+def catch_up_if_stale():
+    """
+    Run ``catch_up`` when it has not run for ``ROLLUP_MAX_AGE`` seconds;
+    failures only log. Rollups that were never built are left to the
+    ``rebuild_rollups`` command rather than backfilled by the caller.
+    """
+    max_age = getattr(settings, 'ROLLUP_MAX_AGE', 60)
+    last_run = RollupWatermark.objects.aggregate(last_run=Max('updated_at'))['last_run']
+    if last_run and (timezone.now() - last_run).total_seconds() < max_age:
+        return 0
+    try:
+        return catch_up(backfill=False)
+    except DatabaseError:
+        logger.exception("Rollup catch-up failed; serving the existing rollups")
+        return 0
+
+
+def rebuild():
+    """
+    Recompute every rollup from scratch. Sources are aggregated before the
+    write transaction starts, so the tables are only locked for the swap;
+    sources sharing a table are merged and written in one pass.
+    """
+    positions, tables = {}, {}
+    for source in SOURCES:
+        high = source.high()
+        positions[source.name] = source.format(high) if high is not None else ''
+        rows = source.aggregate(None, high) if high is not None else {}
+        merged = tables.setdefault(type(source), (source, {}))[1]
+        for key, counts in rows.items():
+            if isinstance(counts, dict):
+                merged.setdefault(key, {}).update(counts)
+            else:
+                merged[key] = counts
+
+    with transaction.atomic():
+        for source, rows in tables.values():
+            source.clear()
+            source.apply(rows)
+        for name, position in positions.items():
+            RollupWatermark.objects.update_or_create(name=name, defaults={'position': position})
+    return {source.__class__.__name__: len(rows) for source, rows in tables.values()}
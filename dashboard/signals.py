@@ -0,0 +1,63 @@
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from maintenance.signals import pre_bulk_delete, post_bulk_delete
+from topic.models import Question, Answer
+
+from . import rollups
+
+
+def _orbit_of(question_id):
+    return Question.objects.filter(pk=question_id).values_list('topic__orbit_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Answer)
+def remember_correctness(sender, instance, raw, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and 'is_correct' not in update_fields):
+        instance._stored_is_correct = None
+        return
+    instance._stored_is_correct = sender.objects.filter(pk=instance.pk).values_list('is_correct', flat=True).first()
+
+
+@receiver(post_save, sender=Answer)
+def refold_changed_correctness(sender, instance, created, raw, using, **kwargs):
+    previous = instance.__dict__.pop('_stored_is_correct', None)
+    if raw:
+        return
+    if instance.is_correct and (created or previous is False):
+        # Answer.save() unmarked the question's other answers with an update, whatever day they were given
+        days = set(sender.objects.filter(question_id=instance.question_id).dates('created_at', 'day'))
+    elif previous and not instance.is_correct:
+        days = {timezone.localdate(instance.created_at)}
+    else:
+        return
+    orbit_id = _orbit_of(instance.question_id)
+    rollups.refold_correct_answers_on_commit(instance, {(day, orbit_id) for day in days}, using)
+
+
+@receiver(pre_delete, sender=Answer)
+def refold_deleted_answer(sender, instance, using, origin=None, **kwargs):
+    # Looked up before the delete, while a cascade has not yet removed the question and topic
+    if instance.is_correct:
+        holder = instance if origin is None else origin
+        orbits = holder.__dict__.setdefault('_answer_orbits', {})
+        if instance.question_id not in orbits:
+            orbits[instance.question_id] = _orbit_of(instance.question_id)
+        bucket = (timezone.localdate(instance.created_at), orbits[instance.question_id])
+        rollups.refold_correct_answers_on_commit(holder, {bucket}, using)
+
+
+@receiver(pre_bulk_delete, sender=Answer)
+def remember_bulk_deleted_buckets(sender, queryset, state, **kwargs):
+    state['refolded_buckets'] = set(
+        queryset.filter(is_correct=True).order_by()
+        .values_list(TruncDate('created_at'), 'question__topic__orbit').distinct()
+    )
+
+
+@receiver(post_bulk_delete, sender=Answer)
+def refold_bulk_deleted_buckets(sender, queryset, state, **kwargs):
+    if state['refolded_buckets']:
+        rollups.refold_correct_answers_on_commit(queryset, state['refolded_buckets'], queryset.db)
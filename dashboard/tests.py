@@ -1,3 +1,138 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from diagnostics.testing import login_master
+from maintenance.deletion import bulk_delete
+from master.models import Master
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from . import rollups
+from .models import DailyOrbitActivity, DailyParticipantActivity
+
+
+def create_activity(orbit, nickname, answers=2):
+    participant = Participant.objects.create(nickname=nickname, firstname=nickname.title(), lastname='Rollup')
+    topic = Topic.objects.create(
+        about=participant, orbit=orbit, title=f"Rollup topic {nickname}", description='Topic counted by rollups.',
+    )
+    question = Question.objects.create(topic=topic, question_text='Was this counted today?')
+    for i in range(answers):
+        Answer.objects.create(question=question, answer_text=f"Answer {i} here", is_correct=i == 0)
+
+
+def totals():
+    orbit_totals = DailyOrbitActivity.objects.aggregate(
+        topics=Sum('topics'), questions=Sum('questions'), answers=Sum('answers'), correct=Sum('correct_answers'),
+    )
+    return orbit_totals, DailyParticipantActivity.objects.aggregate(joined=Sum('joined'))['joined']
+
+
+@override_settings(ROLLUP_LAG_SECONDS=0)
+class RollupTests(TestCase):
+    def setUp(self):
+        self.orbit = Orbit.objects.create(name='Rollup orbit')
+
+    def test_catch_up_only_counts_new_rows(self):
+        create_activity(self.orbit, 'first')
+        self.assertEqual(rollups.catch_up(), 4)
+        self.assertEqual(rollups.catch_up(), 1)  # only the clock-based participant source moves
+
+        create_activity(self.orbit, 'second', answers=3)
+        rollups.catch_up()
+        self.assertEqual(totals(), ({'topics': 2, 'questions': 2, 'answers': 5, 'correct': 2}, 2))
+
+        activity = DailyOrbitActivity.objects.get()
+        self.assertEqual((activity.day, activity.orbit), (timezone.localdate(), self.orbit))
+
+    def test_rebuild_matches_incremental(self):
+        create_activity(self.orbit, 'first')
+        rollups.catch_up()
+        create_activity(self.orbit, 'second')
+        rollups.catch_up()
+        incremental = totals()
+
+        rollups.rebuild()
+        self.assertEqual(totals(), incremental)
+        rollups.catch_up()
+        self.assertEqual(totals(), incremental)
+
+    def test_correct_answers_follow_changes_and_deletes(self):
+        create_activity(self.orbit, 'first', answers=3)
+        Answer.objects.filter(is_correct=True).update(created_at=F('created_at') - datetime.timedelta(days=1))
+        rollups.catch_up()
+        today = timezone.localdate()
+        yesterday = today - datetime.timedelta(days=1)
+        correct = lambda: dict(DailyOrbitActivity.objects.values_list('day', 'correct_answers'))  # noqa: E731
+        self.assertEqual(correct(), {yesterday: 1, today: 0})
+
+        # Marking another answer correct unmarks yesterday's
+        answer = Answer.objects.filter(is_correct=False).first()
+        answer.is_correct = True
+        with self.captureOnCommitCallbacks(execute=True):
+            answer.save()
+        self.assertEqual(correct(), {yesterday: 0, today: 1})
+        # Edits that leave correctness alone don't re-fold
+        answer.answer_text = 'Still the correct one'
+        with mock.patch.object(rollups, 'refold_correct_answers_on_commit') as refold:
+            answer.save()
+        refold.assert_not_called()
+        with self.captureOnCommitCallbacks(execute=True):
+            answer.delete()
+        self.assertEqual(correct(), {yesterday: 0, today: 0})
+
+        question = Question.objects.get()
+        Answer.objects.create(question=question, answer_text='Counted, then cascaded', is_correct=True)
+        rollups.catch_up()
+        self.assertEqual(correct(), {yesterday: 0, today: 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            question.delete()
+        self.assertEqual(correct(), {yesterday: 0, today: 0})
+
+        create_activity(self.orbit, 'second')
+        rollups.catch_up()
+        self.assertEqual(correct(), {yesterday: 0, today: 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_delete(Answer.objects.all())
+        self.assertEqual(correct(), {yesterday: 0, today: 0})
+        self.assertEqual(totals()[0]['answers'], 6)
+
+    @override_settings(DASHBOARD_WIDGET_WORKERS=1, ROLLUP_MAX_AGE=0)
+    def test_first_backfill_is_left_to_the_command(self):
+        create_activity(self.orbit, 'early')
+        login_master(self.client, Master.objects.create(username='rollup', password='rollup-pass'))
+        self.assertEqual(self.client.get('/dashboard/').context['daily_activity'], [])
+        self.assertFalse(DailyOrbitActivity.objects.exists())
+
+        call_command('rebuild_rollups', stdout=StringIO())
+        create_activity(self.orbit, 'later')
+        self.assertEqual(self.client.get('/dashboard/').context['daily_activity'][0]['answers'], 4)
+
+    @override_settings(DASHBOARD_WIDGET_WORKERS=1)
+    def test_dashboard_reads_rollups(self):
+        create_activity(self.orbit, 'viewer')
+        rollups.rebuild()
+        login_master(self.client, Master.objects.create(username='rollup', password='rollup-pass'))
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['daily_activity'][0]['correct_rate'], 50.0)
+        self.assertEqual(response.context['top_orbits'][0]['orbit__name'], 'Rollup orbit')
+        self.assertEqual(response.context['signups'][0]['joined'], 1)
+
+
+@override_settings(ROLLUP_LAG_SECONDS=0, DASHBOARD_WIDGET_WORKERS=4)
+class ConcurrentWidgetTests(TransactionTestCase):
+    def test_widgets_run_on_worker_threads(self):
+        create_activity(Orbit.objects.create(name='Threaded orbit'), 'threaded')
+        rollups.rebuild()
+        login_master(self.client, Master.objects.create(username='threads', password='threads-pass'))
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['top_orbits'][0]['answers'], 2)
+        self.assertEqual(len(response.context['signups']), 1)
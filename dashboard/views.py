@@ -1,14 +1,25 @@
+from functools import partial
+
 from django.shortcuts import render
 from master.views import master_required
-from .models import AntiSpyQuote
+from . import rollups, widgets
 
 
 @master_required
 def dashboard(request):
-    quotes = AntiSpyQuote.objects.filter(is_active=True).order_by('-created_at')
+    rollups.catch_up_if_stale()
+    start, end = widgets.window()
+    data = widgets.fetch({
+        'quotes': widgets.quotes,
+        'daily_activity': partial(widgets.daily_activity, start, end),
+        'top_orbits': partial(widgets.top_orbits, start, end),
+        'signups': partial(widgets.participant_signups, start, end),
+    })
 
     context = {
-        'quotes': quotes,
+        **data,
+        'window_start': start,
+        'window_end': end,
         'master_username': request.session.get('master_username', 'User')
     }
     return render(request, 'dashboard/dashboard.html', context)
@@ -0,0 +1,73 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import AntiSpyQuote, DailyOrbitActivity, DailyParticipantActivity
+
+TOTALS = {column: Sum(column) for column in ('topics', 'questions', 'answers', 'correct_answers')}
+
+
+def correct_rate(row):
+    return round(100 * row['correct_answers'] / row['answers'], 1) if row['answers'] else None
+
+
+def window():
+    """The last ``DASHBOARD_DAYS`` days up to the most recent day with activity"""
+    latest = DailyOrbitActivity.objects.aggregate(latest=Max('day'))['latest'] or timezone.localdate()
+    return latest - datetime.timedelta(days=getattr(settings, 'DASHBOARD_DAYS', 30) - 1), latest
+
+
+def daily_activity(start, end):
+    rows = list(
+        DailyOrbitActivity.objects.filter(day__range=(start, end))
+        .values('day').annotate(**TOTALS).order_by('day')
+    )
+    peak = max((row['answers'] for row in rows), default=0)
+    for row in rows:
+        row['correct_rate'] = correct_rate(row)
+        row['peak'] = peak
+    return rows
+
+
+def top_orbits(start, end, limit=10):
+    rows = list(
+        DailyOrbitActivity.objects.filter(day__range=(start, end))
+        .values('orbit__name', 'orbit__slug').annotate(**TOTALS).order_by('-answers', '-topics')[:limit]
+    )
+    for row in rows:
+        row['correct_rate'] = correct_rate(row)
+    return rows
+
+
+def participant_signups(start, end):
+    return list(DailyParticipantActivity.objects.filter(day__range=(start, end)).values('day', 'joined'))
+
+
+def quotes():
+    return list(AntiSpyQuote.objects.filter(is_active=True).order_by('-created_at'))
+
+
+def _run_in_thread(widget):
+    try:
+        return widget()
+    finally:
+        # Worker threads open their own connections; close them before the thread is reused
+        connections.close_all()
+
+
+def fetch(widgets):
+    """
+    Evaluate ``{name: callable}`` and return ``{name: result}``. Widgets are
+    independent read-only queries, so with ``DASHBOARD_WIDGET_WORKERS`` > 1
+    they run concurrently on their own database connections.
+    """
+    workers = min(getattr(settings, 'DASHBOARD_WIDGET_WORKERS', 4), len(widgets))
+    if workers <= 1:
+        return {name: widget() for name, widget in widgets.items()}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard-widget') as pool:
+        futures = {name: pool.submit(_run_in_thread, widget) for name, widget in widgets.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['fingerprint', 'view', 'count', 'total_ms', 'max_ms', 'has_full_scan', 'has_temp_btree',
+                    'last_seen']
+    list_filter = ['view']
+    search_fields = ['sql', 'view']
+    readonly_fields = ['fingerprint', 'sql', 'example_sql', 'example_params', 'view', 'count', 'total_ms',
+                       'max_ms', 'plan', 'first_seen', 'last_seen']
+
+    def has_full_scan(self, obj):
+        return obj.has_full_scan
+
+    has_full_scan.boolean = True
+    has_full_scan.short_description = 'Full Scan'
+
+    def has_temp_btree(self, obj):
+        return obj.has_temp_btree
+
+    has_temp_btree.boolean = True
+    has_temp_btree.short_description = 'Temp B-Tree'
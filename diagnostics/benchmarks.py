@@ -0,0 +1,291 @@
+import json
+import multiprocessing
+import resource
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from master.models import Master
+from orbit.models import Orbit
+from orbit.projections import orbit_rows
+from participant.models import Participant
+from participant.projections import participant_rows
+from topic.models import Topic
+from topic.projections import topic_rows
+
+from .testing import login_master
+
+SCALES = {
+    'small': {
+        'orbits': 10, 'participants': 200, 'topics': 300,
+        'questions_per_topic': 5, 'answers_per_question': 4,
+    },
+    'medium': {
+        'orbits': 50, 'participants': 2000, 'topics': 3000,
+        'questions_per_topic': 10, 'answers_per_question': 4,
+    },
+    'large': {
+        'orbits': 200, 'participants': 20000, 'topics': 25000,
+        'questions_per_topic': 10, 'answers_per_question': 4,
+    },
+}
+
+BENCHMARK_USERNAME = 'benchmark'
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def use_database(path, alias=DEFAULT_DB_ALIAS):
+    """Point ``alias`` at another SQLite file for the duration of the block"""
+    connection = connections[alias]
+    connection.close()
+    original = connection.settings_dict['NAME']
+    connection.settings_dict['NAME'] = str(path)
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = original
+
+
+def prepare_database(path, scale, seed, stdout=None):
+    """Migrate and seed the database for ``scale`` unless an identical one is already on disk"""
+    marker = path.with_suffix('.json')
+    params = dict(SCALES[scale], seed=seed)
+    if path.exists() and marker.exists() and json.loads(marker.read_text()) == params:
+        return
+    path.unlink(missing_ok=True)
+    with use_database(path):
+        call_command('migrate', verbosity=0)
+        call_command('generate_scale_data', stdout=stdout, **params)
+        Master.objects.create(username=BENCHMARK_USERNAME, password='benchmark-password')
+    marker.write_text(json.dumps(params))
+
+
+class ScenarioError(Exception):
+    """A benchmarked write did not do what it was meant to"""
+
+
+class Scenario:
+    """
+    A request replayed against the benchmark database. Writes must answer
+    with a redirect to ``redirect``: a form re-rendered with errors is a 200
+    too, and would otherwise be timed as if the write had happened.
+    """
+
+    def __init__(self, name, url, method='get', data=None, use_cache=False, redirect=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.data = data
+        self.use_cache = use_cache
+        self.redirect = redirect
+
+    def request(self, client, iteration):
+        if not self.use_cache:
+            cache.clear()
+        if self.method == 'get':
+            return client.get(self.url)
+        data = self.data(iteration) if callable(self.data) else self.data
+        # Writes are rolled back so every iteration sees the same data
+        with transaction.atomic():
+            response = client.post(self.url, data)
+            transaction.set_rollback(True)
+        if response.status_code != 302 or response.url != self.redirect:
+            raise ScenarioError(
+                f"{self.name}: expected a redirect to {self.redirect}, got {response.status_code} "
+                f"{response.get('Location', '')}".rstrip()
+            )
+        return response
+
+
+def build_scenarios():
+    """Pick representative rows from the seeded database and build the hot-path requests"""
+    topic = Topic.objects.annotate(n=Count('studying_participants')).order_by('-n').first()
+    question = topic.questions.first()
+    answer = question.answers.first()
+    orbit = Orbit.objects.annotate(n=Count('topics')).order_by('-n').first()
+    about, other = Participant.objects.filter(is_active=True)[:2]
+    search = topic.about.lastname[:4]
+
+    topic_list = reverse('topics:topic_list')
+    topic_detail = reverse('topics:topic_detail', kwargs={'slug': topic.slug})
+    question_detail = reverse('topics:question_detail', kwargs={'topic_slug': topic.slug, 'question_id': question.id})
+    question_form = {'question_text': 'How does the benchmark question render?', 'order': 0, 'is_active': 'on'}
+    topic_form = {
+        'about': str(about.pk), 'orbit': str(orbit.pk), 'is_active': 'on',
+        'description': 'Benchmark topic description.', 'studying_participants': [str(other.pk)],
+    }
+    return [
+        Scenario('topic_list', topic_list),
+        Scenario('topic_list?orbit', f"{topic_list}?orbit={orbit.pk}"),
+        Scenario('topic_list?status', f"{topic_list}?status=active"),
+        Scenario('topic_list?search', f"{topic_list}?search={search}"),
+        Scenario('topic_list?orbit&status&search', f"{topic_list}?orbit={orbit.pk}&status=active&search={search}"),
+        Scenario('topic_detail', topic_detail),
+        Scenario('question_detail', question_detail),
+        Scenario('participant_list', reverse('participants:participant_list')),
+        Scenario('orbit_list', reverse('orbits:orbit_list')),
+        Scenario('dashboard', reverse('dashboard:dashboard')),
+        Scenario('topic_create', reverse('topics:topic_create'), 'post',
+                 lambda i: dict(topic_form, title=f"Benchmark topic {i}"), redirect=topic_list),
+        Scenario('topic_update', reverse('topics:topic_update', kwargs={'slug': topic.slug}), 'post', dict(
+            topic_form, about=str(topic.about_id), orbit=str(topic.orbit_id), title=topic.title,
+            studying_participants=[str(pk) for pk in topic.studying_participants.values_list('pk', flat=True)],
+        ), redirect=topic_list),
+        Scenario('question_create', reverse('topics:question_create', kwargs={'topic_slug': topic.slug}), 'post',
+                 question_form, redirect=topic_detail),
+        Scenario('question_update', reverse(
+            'topics:question_update', kwargs={'topic_slug': topic.slug, 'question_id': question.id}), 'post',
+                 dict(question_form, question_text=question.question_text, order=question.order),
+                 redirect=topic_detail),
+        Scenario('answer_create', reverse(
+            'topics:answer_create', kwargs={'topic_slug': topic.slug, 'question_id': question.id}), 'post',
+                 {'answer_text': 'Benchmark answer', 'participant': str(other.pk), 'order': 0},
+                 redirect=question_detail),
+        Scenario('answer_update', reverse('topics:answer_update', kwargs={
+            'topic_slug': topic.slug, 'question_id': question.id, 'answer_id': answer.id}), 'post', {
+            'answer_text': answer.answer_text, 'participant': str(answer.participant_id or ''),
+            'is_correct': 'on' if answer.is_correct else '', 'order': answer.order,
+        }, redirect=question_detail),
+    ]
+
+
+def run_scenario(client, scenario, iterations, warmup):
+    """Return latency percentiles (ms), query count and peak traced memory (KiB) for one scenario"""
+    for i in range(warmup):
+        scenario.request(client, i)
+
+    timings = []
+    status = None
+    for i in range(iterations):
+        started = time.perf_counter()
+        response = scenario.request(client, warmup + i)
+        timings.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+
+    # Query counting and allocation tracing distort timings, so measure them separately
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connections[DEFAULT_DB_ALIAS].execute_wrapper(count_query):
+        scenario.request(client, warmup + iterations)
+    tracemalloc.start()
+    try:
+        scenario.request(client, warmup + iterations + 1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': status,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'queries': len(queries),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_scale(iterations, warmup, only=None):
+    """Yield ``(name, result)`` for every scenario against the currently selected database"""
+    client = Client(HTTP_HOST='localhost')
+    login_master(client, Master.objects.get(username=BENCHMARK_USERNAME))
+    for scenario in build_scenarios():
+        if only and scenario.name.split('?')[0] not in only:
+            continue
+        yield scenario.name, run_scenario(client, scenario, iterations, warmup)
+
+
+def compare(results, baseline, tolerance, min_delta_ms=5.0):
+    """
+    Return human-readable regressions of ``results`` against ``baseline``.
+    Any extra query is a regression; latency and memory must grow by more
+    than ``tolerance`` (and latency by more than ``min_delta_ms``) to count.
+    """
+    regressions = []
+    for scale, views in results.items():
+        for view, current in views.items():
+            previous = baseline.get(scale, {}).get(view)
+            if not previous:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f"{scale}/{view}: queries {previous['queries']} -> {current['queries']}"
+                )
+            if current['p50_ms'] > max(previous['p50_ms'] * (1 + tolerance), previous['p50_ms'] + min_delta_ms):
+                regressions.append(
+                    f"{scale}/{view}: p50_ms {previous['p50_ms']} -> {current['p50_ms']}"
+                )
+            if current['peak_kib'] > previous['peak_kib'] * (1 + tolerance):
+                regressions.append(
+                    f"{scale}/{view}: peak_kib {previous['peak_kib']} -> {current['peak_kib']}"
+                )
+    return regressions
+
+
+# List page -> (what the view materialized before, what it materializes now)
+LIST_VARIANTS = {
+    'orbits': (
+        lambda rows: list(Orbit.objects.with_statistics()[:rows]),
+        lambda rows: orbit_rows(Orbit.objects.with_statistics()[:rows]),
+    ),
+    'participants': (
+        lambda rows: list(Participant.objects.with_activity()[:rows]),
+        lambda rows: participant_rows(Participant.objects.with_activity()[:rows]),
+    ),
+    'topics': (
+        lambda rows: list(Topic.get_optimized_queryset()[:rows]),
+        lambda rows: topic_rows(Topic.objects.all()[:rows]),
+    ),
+}
+
+
+def _measure_list(name, variant, rows, results):
+    """Child process body: load one list and report the growth of its peak RSS"""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    loaded = LIST_VARIANTS[name][variant](rows)
+    seconds = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux
+    results.put({
+        'rows': len(loaded),
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before,
+        'seconds': round(seconds, 3),
+    })
+
+
+def measure_list_memory(name, rows):
+    """
+    Return ``{'before': result, 'after': result}`` for loading ``rows`` rows
+    of a list page as model instances and as projection rows. Each variant
+    runs in a forked child with its own connection: peak RSS never goes
+    down, so allocations of one run would otherwise hide those of the next.
+    """
+    context = multiprocessing.get_context('fork')
+    measured = {}
+    for variant, label in enumerate(('before', 'after')):
+        connections.close_all()
+        results = context.Queue()
+        process = context.Process(target=_measure_list, args=(name, variant, rows, results))
+        process.start()
+        measured[label] = results.get()
+        process.join()
+    return measured
@@ -0,0 +1,119 @@
+import statistics
+import time
+
+from django.db import connection, models
+from django.db.models import Count
+
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from .slowlog import explain
+
+
+class Workload:
+    """A filter/order combination one of the views actually issues"""
+
+    def __init__(self, name, model, filters, ordering):
+        self.name = name
+        self.model = model
+        self.filters = filters
+        self.ordering = ordering
+
+    def queryset(self, limit=None):
+        queryset = self.model.objects.filter(**self.filters).order_by(*self.ordering)
+        return queryset[:limit] if limit else queryset
+
+    def sql(self, limit=None):
+        return self.queryset(limit).query.sql_with_params()
+
+    def candidate(self):
+        """
+        Suggest an index: equality columns first, the most selective leading,
+        then the ordering columns. Boolean filters split a table in two at
+        best and would stop the ordering columns from serving the sort, so
+        they are left out and offered as the condition of a partial index.
+        """
+        flags = {name: value for name, value in self.filters.items() if isinstance(value, bool)}
+        equality = sorted((name for name in self.filters if name not in flags), key=self.distinct_values, reverse=True)
+        columns = equality + [field for field in self.ordering if field.lstrip('-') not in self.filters]
+        composite = models.Index(fields=columns, name=self.index_name('idx'))
+        partial = None
+        if flags:
+            partial = models.Index(fields=columns, condition=models.Q(**flags), name=self.index_name('part'))
+        return composite, partial
+
+    def distinct_values(self, column):
+        return self.model.objects.order_by().values(column).distinct().count()
+
+    def index_name(self, suffix):
+        base = ''.join(ch if ch.isalnum() else '_' for ch in self.name)[:20]
+        return f"adv_{base}_{suffix}"
+
+
+def default_workloads():
+    """Replay the filter matrix of topic_list, participant_list and the nested question/answer lists"""
+    orbit = Orbit.objects.annotate(n=Count('topics')).order_by('-n').values_list('pk', flat=True).first()
+    topic = Topic.objects.annotate(n=Count('questions')).order_by('-n').values_list('pk', flat=True).first()
+    question = Question.objects.annotate(n=Count('answers')).order_by('-n').values_list('pk', flat=True).first()
+    position = Participant.POSITION_CHOICES[0][0]
+
+    workloads = [
+        Workload('topic_list', Topic, {}, ['-created_at']),
+        Workload('topic_list?status', Topic, {'is_active': True}, ['-created_at']),
+        Workload('participant_list', Participant, {}, ['lastname', 'firstname']),
+        Workload('participant_list?position', Participant, {'position': position}, ['lastname', 'firstname']),
+        Workload('participant_list?status', Participant, {'is_active': True}, ['lastname', 'firstname']),
+        Workload('participant_list?position&status', Participant,
+                 {'position': position, 'is_active': True}, ['lastname', 'firstname']),
+    ]
+    if orbit is not None:
+        workloads += [
+            Workload('topic_list?orbit', Topic, {'orbit': orbit}, ['-created_at']),
+            Workload('topic_list?orbit&status', Topic, {'orbit': orbit, 'is_active': True}, ['-created_at']),
+        ]
+    if topic is not None:
+        workloads.append(Workload('topic_detail questions', Question, {'topic': topic}, ['order', 'created_at']))
+    if question is not None:
+        workloads.append(
+            Workload('question_detail answers', Answer, {'question': question}, ['order', 'created_at'])
+        )
+    return workloads
+
+
+def needs_index(plan):
+    """True when the plan sorts through a temp B-tree or scans a whole table without an index"""
+    lines = [line.strip() for line in plan.splitlines()]
+    return any('USE TEMP B-TREE' in line for line in lines) or any(
+        line.startswith('SCAN ') and 'INDEX' not in line for line in lines
+    )
+
+
+def time_query(sql, params, repeat):
+    timings = []
+    with connection.cursor() as cursor:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def trial(workload, index, limit, repeat):
+    """Build ``index``, measure the workload with it and drop it again"""
+    sql, params = workload.sql(limit)
+    with connection.schema_editor() as editor:
+        editor.add_index(workload.model, index)
+    try:
+        return time_query(sql, params, repeat), explain(sql, params)
+    finally:
+        with connection.schema_editor() as editor:
+            editor.remove_index(workload.model, index)
+
+
+def describe(index):
+    fields = ', '.join(repr(field) for field in index.fields)
+    if index.condition is not None:
+        return f"models.Index(fields=[{fields}], condition={index.condition!r}, name={index.name!r})"
+    return f"models.Index(fields=[{fields}])"
@@ -0,0 +1,311 @@
+import io
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+
+from asgiref.sync import async_to_sync
+from django.db import close_old_connections
+
+from master.models import Master
+from topic.models import Topic, Question
+
+from .benchmarks import percentile
+
+DEFAULT_MIX = {
+    'browse': 50,
+    'detail': 35,
+    'question': 8,
+    'answer': 7,
+}
+
+RATE_LIMIT_MARKER = b'Too many login attempts'
+LOCK_MARKER = b'database is locked'
+PASSWORD = 'loadtest-password'
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Transport:
+    """Sends requests for one simulated master and keeps its cookies"""
+
+    def __init__(self, remote_addr):
+        self.remote_addr = remote_addr
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data or {}, doseq=True).encode()
+        headers = {'Cookie': '; '.join(f"{key}={value}" for key, value in self.cookies.items())}
+        if method == 'POST':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies.get('csrftoken', '')
+        response = self.send(method, path, headers, body)
+        for header in response.headers.get('set-cookie', []):
+            for key, morsel in SimpleCookie(header).items():
+                self.cookies[key] = morsel.value
+        return response
+
+    def send(self, method, path, headers, body):
+        raise NotImplementedError
+
+
+class WSGITransport(Transport):
+    """Calls ``Cognify.wsgi.application`` in-process"""
+
+    def send(self, method, path, headers, body):
+        from Cognify.wsgi import application
+
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': self.remote_addr, 'HTTP_HOST': 'localhost',
+            'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body), 'wsgi.errors': io.StringIO(),
+            'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0),
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            key = name.upper().replace('-', '_')
+            environ[key if key == 'CONTENT_TYPE' else f"HTTP_{key}"] = value
+
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split()[0])
+            started['headers'] = response_headers
+
+        chunks = application(environ, start_response)
+        try:
+            content = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        return Response(started['status'], _group_headers(started['headers']), content)
+
+
+class ASGITransport(Transport):
+    """Calls ``Cognify.asgi.application`` in-process, one event loop per worker thread"""
+
+    def send(self, method, path, headers, body):
+        return async_to_sync(self._send)(method, path, headers, body)
+
+    async def _send(self, method, path, headers, body):
+        from Cognify.asgi import application
+
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'client': (self.remote_addr, 50000), 'server': ('localhost', 80),
+            'headers': [(b'host', b'localhost'), (b'content-length', str(len(body)).encode())] + [
+                (name.lower().encode(), value.encode()) for name, value in headers.items()
+            ],
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        result = {'body': b''}
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                result['status'] = message['status']
+                result['headers'] = [(k.decode('latin-1'), v.decode('latin-1')) for k, v in message['headers']]
+            elif message['type'] == 'http.response.body':
+                result['body'] += message.get('body', b'')
+
+        await application(scope, receive, send)
+        return Response(result['status'], _group_headers(result['headers']), result['body'])
+
+
+class HTTPTransport(Transport):
+    """Talks to a running server such as ``runserver`` or gunicorn"""
+
+    class NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    opener = urllib.request.build_opener(NoRedirect)
+
+    def __init__(self, remote_addr, base_url):
+        super().__init__(remote_addr)
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, method, path, headers, body):
+        headers = dict(headers, Referer=self.base_url + path)
+        request = urllib.request.Request(
+            self.base_url + path, data=body if method == 'POST' else None, headers=headers, method=method,
+        )
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                status, raw_headers, content = response.status, response.headers, response.read()
+        except urllib.error.HTTPError as error:
+            status, raw_headers, content = error.code, error.headers, error.read()
+        return Response(status, _group_headers(raw_headers.items()), content)
+
+
+def _group_headers(pairs):
+    grouped = defaultdict(list)
+    for name, value in pairs:
+        grouped[name.lower()].append(value)
+    return grouped
+
+
+def ensure_masters(count):
+    """Create (or reuse) ``count`` master accounts for the simulated users"""
+    usernames = [f"loadtest_{i}" for i in range(count)]
+    existing = set(Master.objects.filter(username__in=usernames).values_list('username', flat=True))
+    for username in usernames:
+        if username not in existing:
+            Master.objects.create(username=username, password=PASSWORD)
+    return usernames
+
+
+def load_targets(limit=500):
+    """Sample topic slugs and (slug, question id) pairs to browse"""
+    slugs = list(Topic.objects.filter(is_active=True).order_by('?').values_list('slug', flat=True)[:limit])
+    questions = list(
+        Question.objects.filter(topic__slug__in=slugs).values_list('topic__slug', 'id')[:limit]
+    )
+    if not slugs or not questions:
+        raise ValueError('The database needs at least one active topic with a question; run generate_scale_data.')
+    return slugs, questions
+
+
+class Stats:
+    """Thread-safe latency and outcome collector"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = Counter()
+
+    def record(self, action, latency_ms, outcome):
+        with self.lock:
+            self.latencies[action].append(latency_ms)
+            self.outcomes[outcome] += 1
+
+    def summary(self, elapsed):
+        samples = [value for values in self.latencies.values() for value in values]
+        total = len(samples)
+        result = {
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0,
+            'outcomes': dict(self.outcomes),
+            'error_rate': round(1 - self.outcomes['ok'] / total, 4) if total else 0.0,
+        }
+        if samples:
+            result.update(
+                p50_ms=round(percentile(samples, 50), 1),
+                p95_ms=round(percentile(samples, 95), 1),
+                p99_ms=round(percentile(samples, 99), 1),
+            )
+        result['actions'] = {
+            action: {'count': len(values), 'p50_ms': round(percentile(values, 50), 1),
+                     'p95_ms': round(percentile(values, 95), 1)}
+            for action, values in sorted(self.latencies.items())
+        }
+        return result
+
+
+def classify(response, expect_redirect=False):
+    if LOCK_MARKER in response.body:
+        return 'lock_error'
+    if RATE_LIMIT_MARKER in response.body:
+        return 'rate_limited'
+    if response.status >= 500:
+        return 'server_error'
+    if response.status >= 400:
+        return 'client_error'
+    location = response.headers.get('location', [''])[0]
+    if response.status in (301, 302) and location.rstrip('/').endswith('/login'):
+        return 'logged_out'
+    if expect_redirect and response.status != 302:
+        return 'rejected_form'
+    return 'ok'
+
+
+class VirtualMaster:
+    """One simulated master: logs in, then performs weighted random actions"""
+
+    def __init__(self, transport, username, targets, mix, rng, stats):
+        self.transport = transport
+        self.username = username
+        self.topic_slugs, self.questions = targets
+        self.actions = list(mix)
+        self.weights = [mix[action] for action in self.actions]
+        self.rng = rng
+        self.stats = stats
+
+    def timed(self, action, method, path, data=None, expect_redirect=False):
+        started = time.perf_counter()
+        try:
+            response = self.transport.request(method, path, data)
+            outcome = classify(response, expect_redirect)
+        except Exception as error:
+            response, outcome = None, 'lock_error' if 'locked' in str(error) else 'exception'
+        self.stats.record(action, (time.perf_counter() - started) * 1000, outcome)
+        return response
+
+    def login(self):
+        self.timed('login', 'GET', '/login/')
+        response = self.timed(
+            'login', 'POST', '/login/', {'username': self.username, 'password': PASSWORD}, expect_redirect=True,
+        )
+        return response is not None and response.status == 302
+
+    def step(self):
+        action = self.rng.choices(self.actions, weights=self.weights)[0]
+        if action == 'browse':
+            path = self.rng.choice(['/topics/', '/participants/', '/orbits/', '/dashboard/'])
+            self.timed(f"browse {path}", 'GET', path)
+        elif action == 'detail':
+            slug, question_id = self.rng.choice(self.questions)
+            if self.rng.random() < 0.7:
+                self.timed('topic_detail', 'GET', f"/topics/{self.rng.choice(self.topic_slugs)}/")
+            else:
+                self.timed('question_detail', 'GET', f"/topics/{slug}/questions/{question_id}/")
+        elif action == 'question':
+            slug = self.rng.choice(self.topic_slugs)
+            self.timed('add_question', 'POST', f"/topics/{slug}/questions/add/", {
+                'question_text': f"Load test question from {self.username}?", 'order': 0, 'is_active': 'on',
+            }, expect_redirect=True)
+        elif action == 'answer':
+            slug, question_id = self.rng.choice(self.questions)
+            self.timed('add_answer', 'POST', f"/topics/{slug}/questions/{question_id}/answers/add/", {
+                'answer_text': f"Load test answer from {self.username}", 'order': 0,
+            }, expect_redirect=True)
+
+    def run(self, deadline):
+        try:
+            if not self.login():
+                return
+            while time.monotonic() < deadline:
+                self.step()
+        finally:
+            close_old_connections()
+
+
+def run_load(make_transport, usernames, targets, mix, duration, seed=0):
+    """Run one simulated master per username for ``duration`` seconds and return the summary"""
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    threads = []
+    started = time.monotonic()
+    for i, username in enumerate(usernames):
+        master = VirtualMaster(make_transport(i), username, targets, mix, random.Random(seed + i), stats)
+        thread = threading.Thread(target=master.run, args=(deadline,), daemon=True)
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.monotonic() - started)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnostics.benchmarks import LIST_VARIANTS, measure_list_memory
+
+
+class Command(BaseCommand):
+    help = 'Compare the peak RSS of loading list pages as model instances and as projection rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows to load per list')
+        parser.add_argument('--lists', default=','.join(LIST_VARIANTS),
+                            help=f"Comma-separated lists to measure ({', '.join(LIST_VARIANTS)})")
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['lists'].split(',') if name.strip()]
+        unknown = set(names) - set(LIST_VARIANTS)
+        if unknown:
+            raise CommandError(f"Unknown list(s): {', '.join(sorted(unknown))}")
+
+        for name in names:
+            measured = measure_list_memory(name, options['rows'])
+            before, after = measured['before'], measured['after']
+            change = 100 * (after['peak_rss_kib'] / before['peak_rss_kib'] - 1) if before['peak_rss_kib'] else 0
+            self.stdout.write(
+                f"{name:<14} {before['rows']:>6} rows  "
+                f"instances {before['peak_rss_kib']:>9} KiB {before['seconds']:>7.3f}s  "
+                f"projections {after['peak_rss_kib']:>9} KiB {after['seconds']:>7.3f}s  ({change:+.0f}%)"
+            )
@@ -0,0 +1,85 @@
+import json
+import platform
+import tempfile
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from diagnostics.benchmarks import SCALES, ScenarioError, compare, prepare_database, run_scale, use_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot views at several data scales and compare against a stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small,medium',
+                            help=f"Comma-separated scales to run ({', '.join(SCALES)})")
+        parser.add_argument('--views', default='',
+                            help='Comma-separated view names to run (default: all)')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--data-dir', default=str(Path(tempfile.gettempdir()) / 'cognify-benchmarks'),
+                            help='Where the seeded per-scale databases are kept between runs')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--baseline', help='Fail if results regress against this JSON file')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative growth of p50 latency and peak memory before failing')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                            help='Ignore p50 slowdowns smaller than this many milliseconds')
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = set(scales) - set(SCALES)
+        if unknown:
+            raise CommandError(f"Unknown scale(s): {', '.join(sorted(unknown))}")
+        only = {view.strip() for view in options['views'].split(',') if view.strip()}
+
+        data_dir = Path(options['data_dir'])
+        data_dir.mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        # The N+1 and slow query loggers would otherwise be timed along with the views
+        with override_settings(NPLUSONE_ENABLED=False, SLOW_QUERY_THRESHOLD_MS=None):
+            for scale in scales:
+                path = data_dir / f"{scale}-{options['seed']}.sqlite3"
+                self.stdout.write(self.style.MIGRATE_HEADING(f"Scale {scale} ({path})"))
+                prepare_database(path, scale, options['seed'], stdout=self.stdout)
+                results[scale] = {}
+                with use_database(path):
+                    try:
+                        for name, result in run_scale(options['iterations'], options['warmup'], only):
+                            results[scale][name] = result
+                            self.stdout.write(
+                                f"  {name:<32} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                                f"p99 {result['p99_ms']:>9.2f}ms  {result['queries']:>5} queries  "
+                                f"{result['peak_kib']:>10.1f} KiB  [{result['status']}]"
+                            )
+                    except ScenarioError as error:
+                        raise CommandError(f"Scale {scale}: {error}")
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'iterations': options['iterations'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            regressions = compare(
+                results, baseline.get('results', {}), options['tolerance'], options['min_delta_ms'],
+            )
+            if regressions:
+                raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
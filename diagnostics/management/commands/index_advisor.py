@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from diagnostics.indexes import default_workloads, describe, needs_index, time_query, trial
+from diagnostics.slowlog import explain
+
+
+class Command(BaseCommand):
+    help = 'Replay the list-view filter/order combinations, read their plans and trial candidate indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=0,
+                            help='Apply a LIMIT to each query (0 = fetch every row, as the list views do)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (median is reported)')
+        parser.add_argument('--all', action='store_true',
+                            help='Trial candidates even for queries whose plan already looks fine')
+        parser.add_argument('--no-trial', action='store_true',
+                            help='Only show plans and suggestions, do not build trial indexes')
+
+    def handle(self, *args, **options):
+        limit = options['limit'] or None
+        for workload in default_workloads():
+            sql, params = workload.sql(limit)
+            plan = explain(sql, params)
+            before = time_query(sql, params, options['repeat'])
+            flagged = needs_index(plan)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{workload.name}: {before:.2f}ms{' (needs index)' if flagged else ''}"
+            ))
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+            if not (flagged or options['all']):
+                continue
+
+            for index in filter(None, workload.candidate()):
+                if options['no_trial']:
+                    self.stdout.write(f"  suggest {describe(index)}")
+                    continue
+                after, trial_plan = trial(workload, index, limit, options['repeat'])
+                verdict = self.style.SUCCESS if after < before * 0.8 and not needs_index(trial_plan) else self.style.WARNING
+                self.stdout.write(verdict(f"  {describe(index)}: {before:.2f}ms -> {after:.2f}ms"))
+                for line in trial_plan.splitlines():
+                    self.stdout.write(f"      {line}")
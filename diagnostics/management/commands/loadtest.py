@@ -0,0 +1,94 @@
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from diagnostics.benchmarks import use_database
+from diagnostics.loadtest import (
+    DEFAULT_MIX, ASGITransport, HTTPTransport, WSGITransport, ensure_masters, load_targets, run_load,
+)
+
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, value.split(',')):
+        action, _, weight = part.partition('=')
+        if action not in DEFAULT_MIX or not weight.isdigit():
+            raise CommandError(f"Invalid mix entry {part!r}; expected e.g. browse=50,detail=35,question=8,answer=7")
+        mix[action] = int(weight)
+    return {action: weight for action, weight in mix.items() if weight}
+
+
+class Command(BaseCommand):
+    help = 'Drive Cognify with concurrent simulated masters and report throughput, latency and error rates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='wsgi',
+                            help='"wsgi" or "asgi" to run in-process, or the base URL of a running server')
+        parser.add_argument('--users', default='1,4,16',
+                            help='Comma-separated concurrency levels; each level is a separate run')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds per concurrency level')
+        parser.add_argument('--mix', default='',
+                            help='Action weights, e.g. browse=50,detail=35,question=8,answer=7')
+        parser.add_argument('--shared-ip', action='store_true',
+                            help='Send every user from one address so the login rate limiter applies to all')
+        parser.add_argument('--database', help='SQLite file to use for in-process runs instead of the default')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        target = options['target']
+        levels = [int(level) for level in options['users'].split(',') if level.strip()]
+        mix = parse_mix(options['mix'])
+
+        if target == 'wsgi':
+            transport_class = WSGITransport
+        elif target == 'asgi':
+            transport_class = ASGITransport
+        elif target.startswith(('http://', 'https://')):
+            transport_class = None
+        else:
+            raise CommandError('--target must be "wsgi", "asgi" or an http(s) URL')
+        if options['database'] and transport_class is None:
+            raise CommandError('--database only applies to in-process targets')
+
+        def make_transport(i):
+            remote_addr = '127.0.0.1' if options['shared_ip'] else f"127.0.{i // 250}.{i % 250 + 1}"
+            if transport_class is None:
+                return HTTPTransport(remote_addr, target)
+            return transport_class(remote_addr)
+
+        results = []
+        with use_database(options['database']) if options['database'] else nullcontext(), \
+                override_settings(NPLUSONE_ENABLED=False, SLOW_QUERY_THRESHOLD_MS=None):
+            usernames = ensure_masters(max(levels))
+            try:
+                targets = load_targets()
+            except ValueError as error:
+                raise CommandError(str(error))
+
+            self.stdout.write(f"Target {target}, mix {mix}, {options['duration']:g}s per level")
+            for users in levels:
+                summary = run_load(make_transport, usernames[:users], targets, mix, options['duration'],
+                                   options['seed'])
+                summary['users'] = users
+                results.append(summary)
+                self.write_summary(summary)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({'target': target, 'mix': mix, 'runs': results},
+                                                          indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def write_summary(self, summary):
+        outcomes = summary['outcomes']
+        errors = ', '.join(f"{key}={value}" for key, value in sorted(outcomes.items()) if key != 'ok') or 'none'
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{summary['users']:>3} users: {summary['requests']} requests, {summary['throughput_rps']} req/s, "
+            f"p50 {summary.get('p50_ms', 0)}ms p95 {summary.get('p95_ms', 0)}ms p99 {summary.get('p99_ms', 0)}ms, "
+            f"error rate {summary['error_rate']:.2%} ({errors})"
+        ))
+        for action, stats in summary['actions'].items():
+            self.stdout.write(f"      {action:<24} {stats['count']:>6}  p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms")
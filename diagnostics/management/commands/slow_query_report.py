@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from diagnostics.models import SlowQuery
+
+ORDERINGS = {
+    'total': '-total_ms',
+    'count': '-count',
+    'max': '-max_ms',
+}
+
+
+class Command(BaseCommand):
+    help = 'Report the slowest logged query shapes and flag full table scans and temp B-tree sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--order', choices=sorted(ORDERINGS), default='total')
+        parser.add_argument('--view', help='Only show queries issued by this view name')
+        parser.add_argument('--flagged', action='store_true',
+                            help='Only show queries with a full scan or temp B-tree in their plan')
+        parser.add_argument('--reset', action='store_true', help='Delete the slow query log after reporting')
+
+    def handle(self, *args, **options):
+        queries = SlowQuery.objects.order_by(ORDERINGS[options['order']])
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+
+        shown = 0
+        for query in queries.iterator():
+            flags = []
+            if query.has_full_scan:
+                flags.append('FULL SCAN')
+            if query.has_temp_btree:
+                flags.append('TEMP B-TREE')
+            if options['flagged'] and not flags:
+                continue
+
+            heading = (
+                f"[{query.fingerprint}] {query.view or '-'}: {query.count}x, total {query.total_ms:.1f}ms, "
+                f"mean {query.mean_ms:.1f}ms, max {query.max_ms:.1f}ms"
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(heading))
+            if flags:
+                self.stdout.write(self.style.WARNING(f"  {' + '.join(flags)}"))
+            self.stdout.write(f"  {query.sql}")
+            for line in query.plan.splitlines():
+                self.stdout.write(f"    {line}")
+
+            shown += 1
+            if shown >= options['limit']:
+                break
+
+        if not shown:
+            self.stdout.write('No slow queries logged.')
+        if options['reset']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} slow query entries'))
@@ -0,0 +1,151 @@
+import cProfile
+import logging
+import random
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+from .nplusone import NPlusOneDetector, NPlusOneError
+from .profiling import ProfileStore, StackSampler
+from .slowlog import SlowQueryCollector, writer
+
+logger = logging.getLogger('diagnostics.nplusone')
+
+# Only one cProfile profiler can be enabled per process on Python 3.12+ (they
+# share sys.monitoring); concurrent triggers skip profiling instead of failing
+_cprofile_lock = threading.Lock()
+
+
+class NPlusOneMiddleware:
+    """
+    Log repeated same-shape queries issued while handling a request.
+
+    Enabled by ``NPLUSONE_ENABLED`` (defaults to ``DEBUG``). With
+    ``NPLUSONE_RAISE = True`` the request fails instead, which is handy while
+    developing a view.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.raise_on_findings = getattr(settings, 'NPLUSONE_RAISE', False)
+
+    def __call__(self, request):
+        with NPlusOneDetector() as detector:
+            response = self.get_response(request)
+
+        findings = detector.findings()
+        if findings:
+            view_name = getattr(request.resolver_match, 'view_name', request.path)
+            for finding in findings:
+                logger.warning("N+1 in %s: %s", view_name, finding)
+            if self.raise_on_findings:
+                raise NPlusOneError(f"{len(findings)} repeated query pattern(s) in {view_name}")
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Record queries slower than ``SLOW_QUERY_THRESHOLD_MS`` in the
+    ``SlowQuery`` table together with the view that issued them. Plans are
+    captured by a background writer once the response is on its way.
+    """
+
+    def __init__(self, get_response):
+        self.threshold_ms = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+        if not self.threshold_ms:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = SlowQueryCollector(self.threshold_ms)
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        if collector.entries:
+            writer.submit(getattr(request.resolver_match, 'view_name', request.path), collector.entries)
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Capture a profile of a request when one of the configured triggers fires:
+
+    * ``PROFILER_TOKEN``: the request carries a matching ``X-Profile-Token``
+      header (cProfile, ``.prof``);
+    * ``PROFILER_SAMPLE_RATE``: a random fraction of requests (cProfile);
+    * ``PROFILER_LATENCY_THRESHOLD_MS``: requests slower than the threshold,
+      captured by a background stack sampler (collapsed stacks).
+
+    With no trigger configured the middleware removes itself. A cProfile
+    trigger that fires while another request is being profiled is skipped.
+    """
+
+    header = 'HTTP_X_PROFILE_TOKEN'
+
+    def __init__(self, get_response):
+        self.token = getattr(settings, 'PROFILER_TOKEN', None)
+        self.sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+        self.threshold_ms = getattr(settings, 'PROFILER_LATENCY_THRESHOLD_MS', None)
+        if not (self.token or self.sample_rate or self.threshold_ms):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.store = ProfileStore()
+        self.sampler = None
+        if self.threshold_ms:
+            interval = getattr(settings, 'PROFILER_SAMPLE_INTERVAL_MS', 5) / 1000
+            # Start sampling halfway to the threshold so slow requests have enough samples
+            self.sampler = StackSampler(interval, self.threshold_ms / 2000)
+
+    def __call__(self, request):
+        trigger = self.cprofile_trigger(request)
+        if trigger and _cprofile_lock.acquire(blocking=False):
+            try:
+                return self.profile(request, trigger)
+            finally:
+                _cprofile_lock.release()
+        if self.sampler is None:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        self.sampler.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            samples = self.sampler.end()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if samples and duration_ms >= self.threshold_ms:
+            self.store.save(request, duration_ms, 'latency', 'collapsed', partial(write_collapsed, samples))
+        return response
+
+    def cprofile_trigger(self, request):
+        if self.token:
+            supplied = request.META.get(self.header)
+            if supplied and constant_time_compare(supplied, self.token):
+                return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def profile(self, request, trigger):
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.store.save(request, duration_ms, trigger, 'prof', profiler.dump_stats)
+        return response
+
+
+def write_collapsed(samples, path):
+    with open(path, 'w') as fh:
+        for stack, count in samples.most_common():
+            fh.write(f"{stack} {count}\n")
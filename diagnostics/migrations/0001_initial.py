@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=12, unique=True, verbose_name='Fingerprint')),
+                ('sql', models.TextField(verbose_name='Normalized SQL')),
+                ('example_sql', models.TextField(verbose_name='Example SQL')),
+                ('example_params', models.JSONField(default=list, verbose_name='Example Parameters')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='Originating View')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Total Time (ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Max Time (ms)')),
+                ('plan', models.TextField(blank=True, verbose_name='Query Plan')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='First Seen')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Last Seen')),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'ordering': ['-total_ms'],
+                'indexes': [models.Index(fields=['total_ms'], name='diagnostics_total_m_8e37ff_idx')],
+            },
+        ),
+    ]
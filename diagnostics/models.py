@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """One normalized query shape that exceeded the slow-query threshold"""
+    fingerprint = models.CharField(max_length=12, unique=True, verbose_name=_("Fingerprint"))
+    sql = models.TextField(verbose_name=_("Normalized SQL"))
+    example_sql = models.TextField(verbose_name=_("Example SQL"))
+    example_params = models.JSONField(default=list, verbose_name=_("Example Parameters"))
+    view = models.CharField(max_length=200, blank=True, verbose_name=_("Originating View"))
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Count"))
+    total_ms = models.FloatField(default=0, verbose_name=_("Total Time (ms)"))
+    max_ms = models.FloatField(default=0, verbose_name=_("Max Time (ms)"))
+    plan = models.TextField(blank=True, verbose_name=_("Query Plan"))
+    first_seen = models.DateTimeField(auto_now_add=True, verbose_name=_("First Seen"))
+    last_seen = models.DateTimeField(auto_now=True, verbose_name=_("Last Seen"))
+
+    class Meta:
+        verbose_name = _("Slow Query")
+        verbose_name_plural = _("Slow Queries")
+        ordering = ['-total_ms']
+        indexes = [
+            models.Index(fields=['total_ms']),
+        ]
+
+    def __str__(self):
+        return f"{self.fingerprint}: {self.sql[:80]}"
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    @property
+    def has_full_scan(self):
+        """True when the plan visits every row of a table (or of an index) instead of searching it"""
+        return any(
+            line.strip().startswith('SCAN ') and 'CONSTANT ROW' not in line
+            for line in self.plan.splitlines()
+        )
+
+    @property
+    def has_temp_btree(self):
+        """True when the plan sorts or groups through a temporary B-tree"""
+        return 'USE TEMP B-TREE' in self.plan
@@ -0,0 +1,121 @@
+import json
+import logging
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .utils import find_origin, fingerprint_sql, normalize_sql
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+
+
+class NPlusOneError(Exception):
+    """Raised when a request issues repeated same-shape queries"""
+
+
+class Finding:
+    """A query shape that was executed more often than the threshold allows"""
+
+    def __init__(self, fingerprint, sql, count, origins):
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.count = count
+        self.origins = origins
+
+    def __str__(self):
+        template_origin, python_origin = self.origin
+        where = template_origin or python_origin or 'unknown origin'
+        if template_origin and python_origin:
+            where = f"{template_origin} ({python_origin})"
+        return f"{self.count}x [{self.fingerprint}] {self.sql[:120]} -- from {where}"
+
+    @property
+    def origin(self):
+        """The most frequent ``(template_origin, python_origin)`` pair"""
+        return self.origins.most_common(1)[0][0]
+
+
+class NPlusOneDetector:
+    """
+    Context manager that fingerprints every query executed inside it and
+    reports the shapes repeated at least ``threshold`` times.
+
+        with NPlusOneDetector() as detector:
+            client.get(url)
+        for finding in detector.findings():
+            print(finding)
+    """
+
+    def __init__(self, threshold=None, using=None):
+        if threshold is None:
+            threshold = getattr(settings, 'NPLUSONE_THRESHOLD', DEFAULT_THRESHOLD)
+        self.threshold = threshold
+        self.using = using or [DEFAULT_DB_ALIAS]
+        self.counts = Counter()
+        self.statements = {}
+        self.origins = {}
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in self.using:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint_sql(sql)
+        self.counts[key] += 1
+        if key not in self.statements:
+            self.statements[key] = normalize_sql(sql)
+            self.origins[key] = Counter()
+        self.origins[key][find_origin(skip=2)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def total_queries(self):
+        return sum(self.counts.values())
+
+    def findings(self):
+        """Return the repeated query shapes, most frequent first"""
+        return [
+            Finding(key, self.statements[key], count, self.origins[key])
+            for key, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+def baseline_path():
+    return getattr(
+        settings, 'NPLUSONE_BASELINE', settings.BASE_DIR / 'diagnostics' / 'nplusone_baseline.json'
+    )
+
+
+def load_baseline():
+    """Return ``{view_name: {fingerprint: sql}}`` of accepted N+1 patterns"""
+    try:
+        with open(baseline_path()) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(baseline):
+    with open(baseline_path(), 'w') as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def new_findings(view_name, findings, baseline=None):
+    """Return the findings for ``view_name`` that are not in the baseline"""
+    if baseline is None:
+        baseline = load_baseline()
+    known = baseline.get(view_name, {})
+    return [finding for finding in findings if finding.fingerprint not in known]
@@ -0,0 +1,122 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+CAPTURE_NAME = re.compile(r'^\d+-[0-9a-f]{8}\.(prof|collapsed)\Z')
+
+
+def collapse_stack(frame):
+    """Render a frame and its callers as a collapsed-stack line (root first)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Background thread that samples the stacks of requests that have been in
+    flight for longer than ``watch_after`` seconds. Requests that finish
+    sooner are never sampled, so the per-request cost is two dict operations.
+    """
+
+    def __init__(self, interval, watch_after):
+        self.interval = interval
+        self.watch_after = watch_after
+        self.active = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        self.active[threading.get_ident()] = [time.monotonic(), None]
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                    self._thread.start()
+
+    def end(self):
+        """Stop tracking the current thread and return its samples (a Counter) or None"""
+        entry = self.active.pop(threading.get_ident(), None)
+        return entry[1] if entry else None
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            frames = None
+            for thread_id, entry in list(self.active.items()):
+                if now - entry[0] < self.watch_after:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    if entry[1] is None:
+                        entry[1] = Counter()
+                    entry[1][collapse_stack(frame)] += 1
+
+
+class ProfileStore:
+    """Bounded ring buffer of captured profiles, one data file plus a JSON sidecar each"""
+
+    def __init__(self, directory=None, max_files=None):
+        self.directory = Path(directory or settings.PROFILER_DIR)
+        self.max_files = max_files or getattr(settings, 'PROFILER_MAX_FILES', 100)
+
+    def save(self, request, duration_ms, trigger, kind, write):
+        """Write a capture with ``write(path)`` and record its metadata"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        capture_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        filename = f"{capture_id}.{kind}"
+        write(self.directory / filename)
+        match = getattr(request, 'resolver_match', None)
+        meta = {
+            'id': capture_id,
+            'file': filename,
+            'kind': kind,
+            'trigger': trigger,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else '',
+            'duration_ms': round(duration_ms, 1),
+            'created_at': time.time(),
+        }
+        (self.directory / f"{capture_id}.json").write_text(json.dumps(meta))
+        self.prune()
+        return meta
+
+    def prune(self):
+        sidecars = sorted(self.directory.glob('*.json'))
+        for sidecar in sidecars[:max(0, len(sidecars) - self.max_files)]:
+            for path in self.directory.glob(f"{sidecar.stem}.*"):
+                path.unlink(missing_ok=True)
+
+    def entries(self):
+        """Return the metadata of every capture, slowest first"""
+        if not self.directory.exists():
+            return []
+        entries = []
+        for sidecar in self.directory.glob('*.json'):
+            try:
+                entries.append(json.loads(sidecar.read_text()))
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda entry: entry['duration_ms'], reverse=True)
+
+    def path_for(self, filename):
+        """Return the path of a capture file, or None for names that are not captures"""
+        if not CAPTURE_NAME.match(filename):
+            return None
+        path = self.directory / filename
+        return path if path.exists() else None
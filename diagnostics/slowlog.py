@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .utils import fingerprint_sql, normalize_sql
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class SlowQueryCollector:
+    """``execute_wrapper`` that remembers the queries of one request slower than ``threshold_ms``"""
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= self.threshold_ms and not many:
+                self.entries.append((sql, [_jsonable(param) for param in params or ()], elapsed_ms))
+
+
+def explain(sql, params, using=DEFAULT_DB_ALIAS):
+    """Return the query plan of ``sql`` as indented text, or '' if it cannot be explained"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return ''
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            depth = {0: -1}
+            lines = []
+            for node_id, parent, _, detail in cursor.fetchall():
+                depth[node_id] = depth.get(parent, -1) + 1
+                lines.append('  ' * depth[node_id] + detail)
+            return '\n'.join(lines)
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+
+def record(view, entries):
+    """Fold slow queries into the ``SlowQuery`` table, explaining shapes seen for the first time"""
+    from .models import SlowQuery
+
+    for sql, params, elapsed_ms in entries:
+        fingerprint = fingerprint_sql(sql)
+        updated = SlowQuery.objects.filter(fingerprint=fingerprint).update(
+            count=F('count') + 1,
+            total_ms=F('total_ms') + elapsed_ms,
+            max_ms=Greatest('max_ms', Value(elapsed_ms)),
+            # update() skips auto_now, and the view that first ran a shape keeps it
+            last_seen=timezone.now(),
+            view=Case(When(view='', then=Value(view)), default=F('view')),
+        )
+        if updated:
+            continue
+        try:
+            plan = explain(sql, params)
+        except Exception as error:
+            plan = f"(EXPLAIN failed: {error})"
+        SlowQuery.objects.create(
+            fingerprint=fingerprint, sql=normalize_sql(sql), example_sql=sql, example_params=params,
+            view=view, count=1, total_ms=elapsed_ms, max_ms=elapsed_ms, plan=plan,
+        )
+    prune()
+
+
+def prune():
+    from .models import SlowQuery
+
+    limit = getattr(settings, 'SLOW_QUERY_LOG_MAX_ENTRIES', 500)
+    cutoff = SlowQuery.objects.order_by('-total_ms').values_list('total_ms', flat=True)[limit:limit + 1]
+    if cutoff:
+        SlowQuery.objects.filter(total_ms__lte=cutoff[0]).delete()
+
+
+class SlowQueryWriter:
+    """
+    Background thread that records slow queries off the request thread, so
+    EXPLAIN and the bookkeeping writes never add to request latency.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=1000)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, view, entries):
+        if not getattr(settings, 'SLOW_QUERY_LOG_ASYNC', True):
+            record(view, entries)
+            return
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait((view, entries))
+        except queue.Full:
+            logger.warning("Slow query log queue is full; dropping %d entries", len(entries))
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='slow-query-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            view, entries = self.queue.get()
+            try:
+                close_old_connections()
+                record(view, entries)
+            except Exception:
+                logger.exception("Failed to record slow queries")
+            finally:
+                self.queue.task_done()
+
+
+writer = SlowQueryWriter()
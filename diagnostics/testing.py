@@ -0,0 +1,74 @@
+import os
+
+from django.core.cache import cache
+from django.urls import URLPattern, reverse
+
+from .nplusone import NPlusOneDetector, load_baseline, new_findings, save_baseline
+
+UPDATE_BASELINE_ENV = 'NPLUSONE_UPDATE_BASELINE'
+
+
+def login_master(client, master):
+    """Put ``master`` into the test client's session the way ``master.views.login`` does"""
+    session = client.session
+    session['master_id'] = master.id
+    session['master_username'] = master.username
+    session.save()
+
+
+def iter_view_urls(urlconf_module, kwargs_by_name):
+    """
+    Yield ``(view_name, url)`` for every pattern in ``urlconf_module``.
+
+    ``kwargs_by_name`` maps URL keyword names (``slug``, ``pk``, ...) to the
+    values used to reverse each route.
+    """
+    namespace = urlconf_module.app_name
+    for pattern in urlconf_module.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        view_name = f"{namespace}:{pattern.name}"
+        kwargs = {name: kwargs_by_name[name] for name in pattern.pattern.converters}
+        yield view_name, reverse(view_name, kwargs=kwargs)
+
+
+class NPlusOneTestMixin:
+    """
+    TestCase mixin that fails on N+1 query patterns not recorded in the
+    baseline. Run the suite with ``NPLUSONE_UPDATE_BASELINE=1`` to accept the
+    current patterns instead.
+    """
+
+    nplusone_threshold = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._nplusone_baseline = load_baseline()
+        cls._nplusone_seen = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.environ.get(UPDATE_BASELINE_ENV):
+            baseline = load_baseline()
+            baseline.update(cls._nplusone_seen)
+            save_baseline(baseline)
+        super().tearDownClass()
+
+    def assertNoNewNPlusOne(self, view_name, url):
+        cache.clear()
+        with NPlusOneDetector(threshold=self.nplusone_threshold) as detector:
+            response = self.client.get(url)
+        self.assertLess(response.status_code, 400, f"{view_name} returned {response.status_code}")
+
+        findings = detector.findings()
+        self._nplusone_seen[view_name] = {finding.fingerprint: finding.sql for finding in findings}
+        if os.environ.get(UPDATE_BASELINE_ENV):
+            return
+
+        unexpected = new_findings(view_name, findings, self._nplusone_baseline)
+        if unexpected:
+            self.fail(
+                f"New N+1 query pattern(s) in {view_name} ({url}):\n"
+                + "\n".join(f"  {finding}" for finding in unexpected)
+            )
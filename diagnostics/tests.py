@@ -0,0 +1,258 @@
+import datetime
+import os
+import pstats
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Q
+from django.template.loader import get_template
+from django.test import TestCase, override_settings
+
+import orbit.urls
+import participant.urls
+import topic.urls
+from master.models import Master
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from . import middleware
+from .benchmarks import ScenarioError, build_scenarios
+from .indexes import Workload, default_workloads, needs_index
+from .models import SlowQuery
+from .nplusone import NPlusOneDetector
+from .profiling import ProfileStore, StackSampler
+from .slowlog import explain, record
+from .testing import NPlusOneTestMixin, iter_view_urls, login_master
+from .utils import normalize_sql
+
+ROWS = 6
+NAMES = ['Alice', 'Bruno', 'Clara', 'Dmitri', 'Elena', 'Farid']
+
+
+class NormalizeSqlTests(TestCase):
+    def test_literals_and_parameters_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE a = %s AND b = 'x'  AND c = 10"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?",
+        )
+
+    def test_in_lists_of_any_length_share_a_shape(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s)"),
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s, %s)"),
+        )
+
+
+@override_settings(NPLUSONE_ENABLED=False, SLOW_QUERY_THRESHOLD_MS=None)
+class ViewNPlusOneTests(NPlusOneTestMixin, TestCase):
+    """Request every view of the topic, orbit and participant apps"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.master = Master.objects.create(username='inspector', password='inspector-pass')
+        participants = [
+            Participant.objects.create(nickname=f"{name.lower()}{i}", firstname=name, lastname='Tester')
+            for i, name in enumerate(NAMES)
+        ]
+        orbits = [Orbit.objects.create(name=f"Orbit {i}") for i in range(ROWS)]
+        for i in range(ROWS):
+            topic = Topic.objects.create(
+                about=participants[i], orbit=orbits[i],
+                title=f"Topic number {i}", description='A topic used by the N+1 checks.',
+            )
+            topic.studying_participants.set(participants[:i] + participants[i + 1:])
+            topic.bosses.set(participants[:1] if i else participants[1:2])
+            for q in range(ROWS):
+                question = Question.objects.create(topic=topic, question_text=f"Question {q} about topic {i}?", order=q)
+                for a, answerer in enumerate(participants):
+                    Answer.objects.create(
+                        question=question, participant=answerer, answer_text=f"Answer {a} to {q}",
+                        order=a, is_correct=a == 0,
+                    )
+        cls.orbit = orbits[0]
+        cls.participant = participants[0]
+        cls.topic = Topic.objects.get(about=participants[0])
+        cls.question = cls.topic.questions.first()
+        cls.answer = cls.question.answers.first()
+
+    def setUp(self):
+        login_master(self.client, self.master)
+
+    def check_app(self, urlconf_module, **kwargs_by_name):
+        for view_name, url in iter_view_urls(urlconf_module, kwargs_by_name):
+            with self.subTest(view=view_name):
+                self.assertNoNewNPlusOne(view_name, url)
+
+    def test_topic_views(self):
+        self.check_app(
+            topic.urls, slug=self.topic.slug, topic_slug=self.topic.slug,
+            question_id=self.question.id, answer_id=self.answer.id,
+        )
+
+    def test_orbit_views(self):
+        self.check_app(orbit.urls, slug=self.orbit.slug)
+
+    def test_participant_views(self):
+        self.check_app(participant.urls, pk=self.participant.pk)
+
+    def test_detector_reports_template_line(self):
+        with NPlusOneDetector(threshold=ROWS) as detector:
+            self.client.get(self.topic.get_absolute_url())
+        findings = detector.findings()
+        self.assertIn('topics/topic_detail.html', {finding.origin[0].rpartition(':')[0] for finding in findings})
+
+        # The per-question answer loop is among the nodes the repeated query was issued from
+        source = get_template('topics/topic_detail.html').template.source
+        line = next(
+            number for number, text in enumerate(source.splitlines(), 1)
+            if '{% for answer in question.answers.all' in text
+        )
+        origins = {template_origin for finding in findings for template_origin, _python_origin in finding.origins}
+        self.assertIn(f'topics/topic_detail.html:{line}', origins)
+
+
+class ProfilerMiddlewareTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        master = Master.objects.create(username='profiler', password='profiler-pass')
+        login_master(self.client, master)
+
+    def test_header_trigger_captures_cprofile(self):
+        with override_settings(PROFILER_TOKEN='secret', PROFILER_DIR=self.directory):
+            self.client.get('/dashboard/', HTTP_X_PROFILE_TOKEN='wrong')
+            self.assertEqual(ProfileStore().entries(), [])
+            self.client.get('/dashboard/', HTTP_X_PROFILE_TOKEN='secret')
+            [capture] = ProfileStore().entries()
+            self.assertEqual((capture['trigger'], capture['view']), ('header', 'dashboard:dashboard'))
+            pstats.Stats(os.path.join(self.directory, capture['file']))
+
+            response = self.client.get('/diagnostics/profiles/')
+            self.assertContains(response, capture['file'])
+
+    def test_trigger_is_skipped_while_another_capture_is_active(self):
+        with override_settings(PROFILER_TOKEN='secret', PROFILER_DIR=self.directory):
+            with middleware._cprofile_lock:
+                response = self.client.get('/dashboard/', HTTP_X_PROFILE_TOKEN='secret')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(ProfileStore().entries(), [])
+            self.client.get('/dashboard/', HTTP_X_PROFILE_TOKEN='secret')
+            self.assertEqual(len(ProfileStore().entries()), 1)
+
+    def test_ring_buffer_is_bounded(self):
+        with override_settings(PROFILER_SAMPLE_RATE=1.0, PROFILER_DIR=self.directory, PROFILER_MAX_FILES=2):
+            for _ in range(4):
+                self.client.get('/dashboard/')
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+    def test_sampler_collects_stacks_of_slow_requests(self):
+        sampler = StackSampler(interval=0.001, watch_after=0)
+        sampler.begin()
+        time.sleep(0.05)
+        samples = sampler.end()
+        self.assertTrue(any('test_sampler_collects_stacks_of_slow_requests' in stack for stack in samples))
+
+
+class SlowQueryLogTests(TestCase):
+    def test_slow_queries_are_logged_once_per_shape_with_plan(self):
+        master = Master.objects.create(username='slowlog', password='slowlog-pass')
+        login_master(self.client, master)
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0.0001, SLOW_QUERY_LOG_ASYNC=False):
+            self.client.get('/participants/?position=developer')
+            self.client.get('/participants/?position=manager')
+
+        query = SlowQuery.objects.get(sql__contains='FROM "participant_participant"', view='participants:participant_list')
+        self.assertEqual(query.count, 2)
+        self.assertIn('USING INDEX', query.plan)
+        self.assertFalse(query.has_temp_btree)
+
+    def test_repeats_touch_last_seen_and_keep_the_first_view(self):
+        sql = 'SELECT "orbit_orbit"."id" FROM "orbit_orbit" WHERE "orbit_orbit"."name" = %s'
+        record('orbits:orbit_list', [(sql, ['Busy'], 5.0)])
+        query = SlowQuery.objects.get()
+        SlowQuery.objects.update(last_seen=query.first_seen - datetime.timedelta(hours=1))
+
+        record('orbits:orbit_detail', [(sql, ['Quiet'], 7.0)])
+        query.refresh_from_db()
+        self.assertEqual((query.count, query.max_ms, query.view), (2, 7.0, 'orbits:orbit_list'))
+        self.assertGreaterEqual(query.last_seen, query.first_seen)
+
+        SlowQuery.objects.update(view='')
+        record('orbits:orbit_detail', [(sql, ['Quiet'], 1.0)])
+        self.assertEqual(SlowQuery.objects.get().view, 'orbits:orbit_detail')
+
+    def test_plan_flags(self):
+        query = SlowQuery(plan='SCAN topic_topic\nUSE TEMP B-TREE FOR ORDER BY')
+        self.assertTrue(query.has_full_scan)
+        self.assertTrue(query.has_temp_btree)
+        query.plan = 'SEARCH topic_topic USING INDEX topic_topic_orbit_id (orbit_id=?)'
+        self.assertFalse(query.has_full_scan)
+        self.assertFalse(query.has_temp_btree)
+
+
+class IndexAdvisorTests(TestCase):
+    def test_list_view_workloads_are_served_by_indexes(self):
+        participant = Participant.objects.create(
+            firstname='Index', lastname='Advisor', nickname='indexadvisor', position='developer'
+        )
+        orbit = Orbit.objects.create(name='Index orbit')
+        topic = Topic.objects.create(
+            title='Index topic', description='Topic for the index advisor', about=participant, orbit=orbit
+        )
+        question = Question.objects.create(topic=topic, question_text='Which index?')
+        Answer.objects.create(question=question, answer_text='The composite one', is_correct=True)
+
+        workloads = default_workloads()
+        self.assertIn('question_detail answers', [workload.name for workload in workloads])
+        for workload in workloads:
+            sql, params = workload.sql()
+            with self.subTest(workload.name):
+                self.assertFalse(needs_index(explain(sql, params)))
+
+    def test_candidate_puts_equality_columns_before_ordering(self):
+        workload = next(w for w in default_workloads() if w.name == 'participant_list?position&status')
+        composite, partial = workload.candidate()
+        self.assertEqual(composite.fields, ['position', 'lastname', 'firstname'])
+        self.assertEqual((partial.fields, partial.condition), (composite.fields, Q(is_active=True)))
+
+    def test_candidate_leads_with_the_most_selective_column(self):
+        orbit = Orbit.objects.create(name='Selective orbit')
+        for name in ('Ann', 'Ben', 'Cid'):
+            Topic.objects.create(
+                about=Participant.objects.create(firstname=name, lastname='Selective', nickname=name.lower()),
+                orbit=orbit, title=f"Topic about {name}", description='Topic for the index advisor',
+            )
+        workload = Workload('topics by orbit and about', Topic, {'orbit': orbit, 'about': 1}, ['-created_at'])
+        composite, partial = workload.candidate()
+        self.assertEqual(composite.fields, ['about', 'orbit', '-created_at'])
+        self.assertIsNone(partial)
+
+
+class BenchmarkScenarioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_scale_data', orbits=2, participants=12, topics=4, questions_per_topic=2,
+            answers_per_question=2, seed=7, stdout=StringIO(),
+        )
+        cls.master = Master.objects.create(username='benchmarker', password='benchmarker-pass')
+
+    def test_writes_redirect_where_they_should(self):
+        login_master(self.client, self.master)
+        writes = [scenario for scenario in build_scenarios() if scenario.method == 'post']
+        self.assertIn('question_update', [scenario.name for scenario in writes])
+        self.assertIn('answer_update', [scenario.name for scenario in writes])
+        for scenario in writes:
+            with self.subTest(scenario.name):
+                self.assertEqual(scenario.request(self.client, 0).status_code, 302)
+
+    def test_write_rerendering_its_form_is_an_error(self):
+        login_master(self.client, self.master)
+        scenario = next(scenario for scenario in build_scenarios() if scenario.name == 'question_update')
+        scenario.data = dict(scenario.data, question_text='Short')
+        with self.assertRaisesMessage(ScenarioError, 'question_update: expected a redirect'):
+            scenario.request(self.client, 0)
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'diagnostics'
+
+urlpatterns = [
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:filename>', views.profile_download, name='profile_download'),
+    path('cache/', views.cache_stats, name='cache_stats'),
+]
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import re
+import sys
+
+from django.conf import settings
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \((?:\?\s*,\s*)*\?\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'(\([^()]*\))(?:\s*,\s*\([^()]*\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+_DIAGNOSTICS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def normalize_sql(sql):
+    """Reduce a SQL statement to its shape: literals and parameters become ``?``"""
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub(r'\1, ...', sql)
+    return sql
+
+
+def fingerprint_sql(sql):
+    """Return a short stable fingerprint for the shape of a SQL statement"""
+    return hashlib.sha1(normalize_sql(sql).encode('utf-8')).hexdigest()[:12]
+
+
+def _is_project_file(filename):
+    if filename.startswith('<'):
+        return False
+    filename = os.path.abspath(filename)
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and not filename.startswith(_DIAGNOSTICS_DIR)
+        and 'site-packages' not in filename
+    )
+
+
+def find_origin(skip=1):
+    """
+    Return ``(template_origin, python_origin)`` for the code that triggered the
+    current call. The template origin is ``"name:line"`` of the innermost
+    template node being rendered, the Python origin is ``"path:line in func"``
+    of the innermost frame that belongs to this project. Either may be None.
+    """
+    template_origin = None
+    python_origin = None
+    frame = sys._getframe(skip)
+    while frame is not None and not (template_origin and python_origin):
+        code = frame.f_code
+        if template_origin is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                name = origin.template_name or origin.name
+                template_origin = f"{name}:{token.lineno}"
+        if python_origin is None and _is_project_file(code.co_filename):
+            path = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            python_origin = f"{path}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return template_origin, python_origin
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import render
+from master.views import master_required
+from .profiling import ProfileStore
+
+
+@master_required
+def profile_list(request):
+    captures = ProfileStore().entries()
+    for capture in captures:
+        capture['created_at'] = datetime.fromtimestamp(capture['created_at'], tz=timezone.utc)
+
+    context = {
+        'captures': captures,
+    }
+    return render(request, 'diagnostics/profile_list.html', context)
+
+
+@master_required
+def profile_download(request, filename):
+    path = ProfileStore().path_for(filename)
+    if path is None:
+        raise Http404("Profile not found")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
+
+@master_required
+def cache_stats(request):
+    """Hit and miss counts of every tiered cache, as seen by the worker serving this request"""
+    stats = {
+        alias: caches[alias].stats()
+        for alias in settings.CACHES
+        if hasattr(caches[alias], 'stats')
+    }
+    return JsonResponse(stats)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import BackfillCheckpoint
+
+
+@admin.register(BackfillCheckpoint)
+class BackfillCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_pk', 'processed', 'updated', 'batches', 'updated_at', 'finished_at']
+    search_fields = ['name']
+    readonly_fields = ['name', 'last_pk', 'processed', 'updated', 'batches', 'started_at', 'updated_at',
+                       'finished_at']
@@ -0,0 +1,132 @@
+import time
+
+from django.db import OperationalError, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from caching.events import publish
+
+from .models import BackfillCheckpoint
+
+registry = {}
+
+
+def register(cls):
+    """Class decorator that makes a backfill available to the ``backfill`` command"""
+    registry[cls.name] = cls()
+    return cls
+
+
+def autodiscover():
+    """Import the ``backfills`` module of every installed app so its backfills register themselves"""
+    autodiscover_modules('backfills')
+
+
+class Backfill:
+    """
+    Populate derived columns on rows that already exist.
+
+    Subclasses set ``name``, ``model`` and ``fields`` and implement
+    ``compute(obj)``, which sets the new values on ``obj`` and returns True
+    when anything changed. ``prepare_batch(objects)`` runs before a batch is
+    computed and is the place to fetch related data for the whole batch in
+    one query instead of one per row.
+    """
+    name = None
+    model = None
+    fields = ()
+    batch_size = 500
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def prepare_batch(self, objects):
+        pass
+
+    def compute(self, obj):
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.name
+
+
+class BackfillRunner:
+    """
+    Walk the rows of a backfill in primary-key order, one short transaction
+    per batch, and record the last processed key after every batch so an
+    interrupted run resumes where it stopped. ``pause`` seconds are slept
+    between batches to leave room for the site's own writes.
+    """
+
+    retries = 5
+
+    def __init__(self, backfill, batch_size=None, pause=0.0, dry_run=False, progress=None):
+        self.backfill = backfill
+        self.batch_size = batch_size or backfill.batch_size
+        self.pause = pause
+        self.dry_run = dry_run
+        self.progress = progress
+
+    def checkpoint(self):
+        if self.dry_run:
+            return (BackfillCheckpoint.objects.filter(name=self.backfill.name).first()
+                    or BackfillCheckpoint(name=self.backfill.name))
+        return BackfillCheckpoint.objects.get_or_create(name=self.backfill.name)[0]
+
+    def run(self, max_batches=None):
+        checkpoint = self.checkpoint()
+        if checkpoint.is_finished:
+            return checkpoint
+
+        pk_field = self.backfill.model._meta.pk
+        last_pk = pk_field.to_python(checkpoint.last_pk) if checkpoint.last_pk else None
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            size, changed, last_pk = self.run_batch(checkpoint, last_pk)
+            if not size:
+                checkpoint.finished_at = timezone.now()
+                if not self.dry_run:
+                    checkpoint.save(update_fields=['finished_at', 'updated_at'])
+                break
+            batches += 1
+            if self.progress:
+                self.progress(checkpoint, size, changed)
+            if self.pause:
+                time.sleep(self.pause)
+        return checkpoint
+
+    def run_batch(self, checkpoint, last_pk):
+        """Process the batch after ``last_pk``; returns ``(rows, rows changed, new last pk)``"""
+        progress = (checkpoint.last_pk, checkpoint.processed, checkpoint.updated, checkpoint.batches)
+        for attempt in range(self.retries + 1):
+            try:
+                with transaction.atomic():
+                    return self._process(checkpoint, last_pk)
+            except OperationalError as error:
+                checkpoint.last_pk, checkpoint.processed, checkpoint.updated, checkpoint.batches = progress
+                # SQLite refuses the write lock while the site holds it; back off and retry the batch
+                if 'locked' not in str(error) or attempt == self.retries:
+                    raise
+                time.sleep(max(self.pause, 0.1) * 2 ** attempt)
+
+    def _process(self, checkpoint, last_pk):
+        queryset = self.backfill.get_queryset().order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        objects = list(queryset[:self.batch_size])
+        if not objects:
+            return 0, 0, last_pk
+
+        self.backfill.prepare_batch(objects)
+        changed = [obj for obj in objects if self.backfill.compute(obj)]
+        last_pk = objects[-1].pk
+        checkpoint.last_pk = str(last_pk)
+        checkpoint.processed += len(objects)
+        checkpoint.updated += len(changed)
+        checkpoint.batches += 1
+        if not self.dry_run:
+            if changed:
+                self.backfill.model._default_manager.bulk_update(changed, self.backfill.fields)
+                publish(self.backfill.model, [obj.pk for obj in changed])
+            checkpoint.save()
+        return len(objects), len(changed), last_pk
@@ -0,0 +1,139 @@
+import time
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models.deletion import ProtectedError, RestrictedError, get_candidate_relations_to_delete
+
+from caching.events import publish
+
+from .signals import pre_bulk_delete, post_bulk_delete
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _set_value(rel):
+    """The value a ``SET_NULL``/``SET_DEFAULT``/``SET(...)`` relation writes into orphaned rows"""
+    if rel.on_delete is models.SET_NULL:
+        return None
+    if rel.on_delete is models.SET_DEFAULT:
+        return rel.field.get_default()
+    value = rel.on_delete.deconstruct()[1][0]
+    return value() if callable(value) else value
+
+
+class BulkDeleter:
+    """
+    Delete rows and everything that cascades from them with chunked
+    ``DELETE ... WHERE parent_id IN (...)`` statements instead of Django's
+    ``Collector``, which loads every related object into memory.
+
+    The cascade plan is read from each relation's ``on_delete``, the same
+    metadata the ORM uses: ``CASCADE`` children are deleted first,
+    ``SET_NULL``/``SET_DEFAULT``/``SET()`` children are updated in place and
+    ``PROTECT``/``RESTRICT`` children stop the delete before anything is
+    written. Children without relations of their own are removed straight
+    from their parent's key chunk, so their primary keys are never loaded.
+
+    Each chunk is its own transaction and children always go before their
+    parents, so an interrupted delete leaves a consistent database and can
+    simply be run again. ``pre_delete``/``post_delete`` are not sent; code
+    that keeps derived data current listens to ``pre_bulk_delete`` and
+    ``post_bulk_delete`` instead.
+    """
+
+    def __init__(self, chunk_size=500, pause=0, progress=None):
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.progress = progress
+        self.deleted = Counter()
+        self.updated = Counter()
+
+    def relations(self, model):
+        return [
+            rel for rel in get_candidate_relations_to_delete(model._meta)
+            if rel.on_delete is not models.DO_NOTHING
+        ]
+
+    def children(self, rel, pks):
+        return rel.related_model._base_manager.filter(**{f'{rel.field.name}__in': pks})
+
+    def plan(self, model, via=None, seen=None):
+        """Yield ``(depth, relation)`` for every relation the delete of ``model`` touches"""
+        seen = seen or {model}
+        for rel in self.relations(model):
+            yield len(seen) - 1, rel
+            child = rel.related_model
+            if rel.on_delete is models.CASCADE and child not in seen:
+                yield from self.plan(child, model, seen | {child})
+
+    def delete(self, queryset):
+        """Delete ``queryset`` and its cascade; returns the rows deleted per model label"""
+        model = queryset.model
+        pks = list(queryset.order_by().values_list('pk', flat=True))
+        self.check(model, pks)
+        self._delete(model, pks, via=None)
+        return self.deleted
+
+    def check(self, model, pks):
+        """Raise ``ProtectedError``/``RestrictedError`` when a protected child would be orphaned"""
+        if not any(rel.on_delete in (models.PROTECT, models.RESTRICT) for _, rel in self.plan(model)):
+            return
+        for chunk in _chunks(pks, self.chunk_size):
+            for rel in self.relations(model):
+                children = self.children(rel, chunk)
+                if rel.on_delete in (models.PROTECT, models.RESTRICT):
+                    blocking = list(children[:1])
+                    if blocking:
+                        error = ProtectedError if rel.on_delete is models.PROTECT else RestrictedError
+                        raise error(
+                            f"Cannot delete some {model._meta.verbose_name_plural} because they are referenced "
+                            f"through protected foreign key {rel.related_model.__name__}.{rel.field.name}",
+                            set(blocking),
+                        )
+                elif rel.on_delete is models.CASCADE:
+                    self.check(rel.related_model, list(children.values_list('pk', flat=True)))
+
+    def _delete(self, model, pks, via):
+        relations = self.relations(model)
+        for chunk in _chunks(pks, self.chunk_size):
+            leaves = []
+            for rel in relations:
+                if rel.on_delete is not models.CASCADE:
+                    continue
+                if self.relations(rel.related_model):
+                    child_pks = list(self.children(rel, chunk).values_list('pk', flat=True))
+                    self._delete(rel.related_model, child_pks, via=model)
+                else:
+                    leaves.append(rel)
+
+            with transaction.atomic():
+                for rel in relations:
+                    if rel.on_delete in (models.CASCADE, models.PROTECT, models.RESTRICT):
+                        continue
+                    updated = self.children(rel, chunk).update(**{rel.field.name: _set_value(rel)})
+                    publish(rel.related_model)
+                    self.updated[rel.related_model._meta.label] += updated
+                for rel in leaves:
+                    self._remove(rel.related_model, self.children(rel, chunk), via=model)
+                self._remove(model, model._base_manager.filter(pk__in=chunk), via=via)
+
+            if self.progress:
+                self.progress(model, self.deleted)
+            if self.pause:
+                time.sleep(self.pause)
+
+    def _remove(self, model, queryset, via):
+        state = {}
+        pre_bulk_delete.send(sender=model, queryset=queryset, via=via, state=state)
+        deleted = queryset._raw_delete(queryset.db)
+        post_bulk_delete.send(sender=model, queryset=queryset, via=via, state=state)
+        if deleted:
+            self.deleted[model._meta.label] += deleted
+
+
+def bulk_delete(queryset, chunk_size=500, pause=0, progress=None):
+    """Shortcut for ``BulkDeleter(...).delete(queryset)``"""
+    return BulkDeleter(chunk_size=chunk_size, pause=pause, progress=progress).delete(queryset)
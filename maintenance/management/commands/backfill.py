@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.backfill import BackfillRunner, autodiscover, registry
+from maintenance.models import BackfillCheckpoint
+
+
+class Command(BaseCommand):
+    help = 'Populate derived columns in resumable, throttled primary-key batches while the site stays up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Backfills to run (default: every registered backfill)')
+        parser.add_argument('--list', action='store_true', help='List registered backfills and their progress')
+        parser.add_argument('--batch-size', type=int, help="Rows per batch (default: the backfill's own)")
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches (resume later)')
+        parser.add_argument('--reset', action='store_true', help='Forget the checkpoint and start from the first row')
+        parser.add_argument('--dry-run', action='store_true', help='Compute the changes without writing them')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        autodiscover()
+        names = options['names'] or sorted(registry)
+        unknown = [name for name in names if name not in registry]
+        if unknown:
+            raise CommandError(f"Unknown backfill(s): {', '.join(unknown)}. Known: {', '.join(sorted(registry))}")
+
+        if options['list']:
+            checkpoints = BackfillCheckpoint.objects.in_bulk(names, field_name='name')
+            for name in names:
+                checkpoint = checkpoints.get(name)
+                self.stdout.write(f"{name}: {checkpoint or 'not started'}")
+            return
+
+        for name in names:
+            if options['reset'] and not options['dry_run']:
+                BackfillCheckpoint.objects.filter(name=name).delete()
+            runner = BackfillRunner(
+                registry[name], batch_size=options['batch_size'], pause=options['pause'],
+                dry_run=options['dry_run'], progress=self.report,
+            )
+            started = time.perf_counter()
+            checkpoint = runner.run(max_batches=options['max_batches'])
+            elapsed = time.perf_counter() - started
+            status = 'finished' if checkpoint.is_finished else f"paused at pk {checkpoint.last_pk}"
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: {status}; {checkpoint.processed} rows processed, "
+                f"{checkpoint.updated} updated ({elapsed:.1f}s this run)"
+            ))
+
+    def report(self, checkpoint, rows, changed):
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {checkpoint.name} batch {checkpoint.batches}: {rows} rows, {changed} changed, "
+                              f"last pk {checkpoint.last_pk}")
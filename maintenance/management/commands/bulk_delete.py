@@ -0,0 +1,57 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.deletion import BulkDeleter
+
+
+class Command(BaseCommand):
+    help = 'Delete rows and their whole cascade with chunked set-based statements instead of loading every object'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Model to delete from, as app_label.ModelName (e.g. orbit.Orbit)')
+        parser.add_argument('--filter', action='append', default=[], metavar='FIELD=VALUE',
+                            help='Lookup selecting the rows to delete; repeat to combine')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Parent keys per DELETE statement')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+        parser.add_argument('--dry-run', action='store_true', help='Show the cascade plan and the row count')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        lookups = {}
+        for lookup in options['filter']:
+            field, sep, value = lookup.partition('=')
+            if not sep:
+                raise CommandError(f"Filters look like FIELD=VALUE, got {lookup!r}")
+            lookups[field] = value
+        if not lookups:
+            raise CommandError('Pass at least one --filter; deleting a whole table needs an explicit lookup')
+        queryset = model._default_manager.filter(**lookups)
+
+        deleter = BulkDeleter(chunk_size=options['chunk_size'], pause=options['pause'], progress=self.report)
+        if options['dry_run']:
+            self.stdout.write(f"{queryset.count()} {model._meta.label} rows match")
+            for depth, rel in deleter.plan(model):
+                self.stdout.write(
+                    f"{'  ' * (depth + 1)}{rel.related_model._meta.label}.{rel.field.name}: {rel.on_delete.__name__}"
+                )
+            return
+
+        started = time.perf_counter()
+        deleted = deleter.delete(queryset)
+        for label, count in sorted(deleted.items()):
+            self.stdout.write(f"  {label}: {count} deleted")
+        for label, count in sorted(deleter.updated.items()):
+            self.stdout.write(f"  {label}: {count} updated")
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {sum(deleted.values())} rows in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def report(self, model, deleted):
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {model._meta.label} chunk done; {sum(deleted.values())} rows deleted so far")
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Backfill')),
+                ('last_pk', models.CharField(blank=True, max_length=64, verbose_name='Last Processed PK')),
+                ('processed', models.PositiveBigIntegerField(default=0, verbose_name='Rows Processed')),
+                ('updated', models.PositiveBigIntegerField(default=0, verbose_name='Rows Updated')),
+                ('batches', models.PositiveIntegerField(default=0, verbose_name='Batches')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Started At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+            ],
+            options={
+                'verbose_name': 'Backfill Checkpoint',
+                'verbose_name_plural': 'Backfill Checkpoints',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class BackfillCheckpoint(models.Model):
+    """Progress of one backfill: the last primary key it has processed"""
+    name = models.CharField(max_length=100, unique=True, verbose_name=_("Backfill"))
+    last_pk = models.CharField(max_length=64, blank=True, verbose_name=_("Last Processed PK"))
+    processed = models.PositiveBigIntegerField(default=0, verbose_name=_("Rows Processed"))
+    updated = models.PositiveBigIntegerField(default=0, verbose_name=_("Rows Updated"))
+    batches = models.PositiveIntegerField(default=0, verbose_name=_("Batches"))
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Started At"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Finished At"))
+
+    class Meta:
+        verbose_name = _("Backfill Checkpoint")
+        verbose_name_plural = _("Backfill Checkpoints")
+        ordering = ['name']
+
+    def __str__(self):
+        state = 'done' if self.finished_at else f"at {self.last_pk or 'start'}"
+        return f"{self.name} ({state})"
+
+    @property
+    def is_finished(self):
+        return self.finished_at is not None
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent by ``maintenance.deletion.BulkDeleter`` around every set-based delete.
+# Arguments: ``sender`` (the model), ``queryset`` (the rows being deleted),
+# ``via`` (the parent model whose deletion cascaded here, None for the rows
+# asked for) and ``state`` (a dict shared by the pre and post signal of one
+# statement, for receivers that must look at the rows before they go).
+pre_bulk_delete = Signal()
+post_bulk_delete = Signal()
@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from archive.models import ArchivedTopic
+from orbit.models import OrbitStatistics
+
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+from .backfill import Backfill, BackfillRunner, registry
+from .deletion import bulk_delete
+from .models import BackfillCheckpoint
+
+
+class AnswerOrderBackfill(Backfill):
+    """Orders answers by the length of their text; only here to exercise the runner"""
+    name = 'test-answer-order'
+    model = Answer
+    fields = ['order']
+
+    def compute(self, answer):
+        order = len(answer.answer_text)
+        if answer.order == order:
+            return False
+        answer.order = order
+        return True
+
+
+class BackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        participant = Participant.objects.create(nickname='filler', firstname='Back', lastname='Filler')
+        topic = Topic.objects.create(
+            about=participant, orbit=Orbit.objects.create(name='Backfill orbit'),
+            title='Backfill topic', description='A topic with answers to backfill.',
+        )
+        question = Question.objects.create(topic=topic, question_text='How long is this answer?')
+        for i in range(5):
+            Answer.objects.create(question=question, answer_text='x' * (i + 1), order=0)
+
+    def test_resumes_from_checkpoint(self):
+        runner = BackfillRunner(AnswerOrderBackfill(), batch_size=2)
+        checkpoint = runner.run(max_batches=1)
+        self.assertFalse(checkpoint.is_finished)
+        self.assertEqual(checkpoint.processed, 2)
+        self.assertEqual(list(Answer.objects.order_by('pk').values_list('order', flat=True)), [1, 2, 0, 0, 0])
+
+        checkpoint = BackfillRunner(AnswerOrderBackfill(), batch_size=2).run()
+        self.assertTrue(checkpoint.is_finished)
+        self.assertEqual((checkpoint.processed, checkpoint.updated, checkpoint.batches), (5, 5, 3))
+        self.assertEqual(list(Answer.objects.order_by('pk').values_list('order', flat=True)), [1, 2, 3, 4, 5])
+
+    def test_dry_run_writes_nothing(self):
+        checkpoint = BackfillRunner(AnswerOrderBackfill(), dry_run=True).run()
+        self.assertEqual(checkpoint.updated, 5)
+        self.assertFalse(Answer.objects.exclude(order=0).exists())
+        self.assertFalse(BackfillCheckpoint.objects.exists())
+
+    def test_command_runs_registered_backfill(self):
+        registry[AnswerOrderBackfill.name] = AnswerOrderBackfill()
+        self.addCleanup(registry.pop, AnswerOrderBackfill.name)
+        out = StringIO()
+        call_command('backfill', AnswerOrderBackfill.name, batch_size=3, pause=0, stdout=out)
+        self.assertIn('finished; 5 rows processed, 5 updated', out.getvalue())
+
+        call_command('backfill', AnswerOrderBackfill.name, list=True, stdout=out)
+        self.assertIn('test-answer-order (done)', out.getvalue())
+
+
+class BulkDeleteTests(TestCase):
+    """Every bulk delete must leave the database exactly as ``Model.delete()`` would"""
+
+    def setUp(self):
+        self.ada, self.bob, self.cyd = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Deleter')
+            for name in ('Ada', 'Bob', 'Cyd')
+        ]
+        self.orbit, other = Orbit.objects.create(name='Doomed orbit'), Orbit.objects.create(name='Surviving orbit')
+        for orbit, about in ((self.orbit, self.ada), (self.orbit, self.bob), (other, self.ada), (other, self.cyd)):
+            topic = Topic.objects.create(
+                about=about, orbit=orbit, title=f"{about.firstname} in {orbit.name}", description='Deletable.',
+            )
+            topic.studying_participants.add(self.ada, self.bob, self.cyd)
+            topic.bosses.add(self.bob)
+            for i in range(3):
+                question = Question.objects.create(topic=topic, question_text=f"Question {i} on {topic.title}")
+                for participant in (self.ada, self.bob, self.cyd):
+                    Answer.objects.create(question=question, participant=participant, answer_text='An answer')
+        ArchivedTopic.objects.create(
+            id=10 ** 6, about=self.bob, orbit=other, title='Archived', description='Cold.', slug='archived',
+            is_active=False, created_at=topic.created_at, updated_at=topic.updated_at,
+        )
+        OrbitStatistics.refresh()
+
+    def state(self):
+        return {
+            'orbits': set(Orbit.objects.values_list('slug', flat=True)),
+            'statistics': set(OrbitStatistics.objects.values_list('orbit__slug', flat=True)),
+            'participants': set(Participant.objects.values_list('nickname', flat=True)),
+            'topics': set(Topic.objects.values_list(
+                'title', 'question_count', 'studying_participants_count', 'bosses_count',
+            )),
+            'questions': set(Question.objects.values_list('question_text', 'answer_count')),
+            'answers': sorted(Answer.objects.values_list('question_id', 'participant_id'), key=str),
+            'studying': Topic.studying_participants.through.objects.count(),
+            'archived': set(ArchivedTopic.objects.values_list('pk', flat=True)),
+        }
+
+    def assertMatchesCollector(self, obj):
+        queryset = type(obj).objects.filter(pk=obj.pk)
+        with transaction.atomic():
+            obj.delete()
+            expected = self.state()
+            transaction.set_rollback(True)
+        deleted = bulk_delete(queryset, chunk_size=2)
+        self.assertEqual(self.state(), expected)
+        return deleted
+
+    def test_orbit(self):
+        deleted = self.assertMatchesCollector(self.orbit)
+        self.assertEqual((deleted['topic.Topic'], deleted['topic.Question'], deleted['topic.Answer']), (2, 6, 18))
+
+    def test_participant(self):
+        self.assertMatchesCollector(self.bob)
+
+    def test_topic_and_question(self):
+        self.assertMatchesCollector(Topic.objects.filter(about=self.cyd).get())
+        self.assertMatchesCollector(Question.objects.first())
+
+    def test_dry_run_shows_cascade_plan(self):
+        out = StringIO()
+        call_command('bulk_delete', 'participant.Participant', '--filter', f'pk={self.bob.pk}', '--dry-run', stdout=out)
+        self.assertIn('1 participant.Participant rows match', out.getvalue())
+        self.assertIn('topic.Answer.participant: SET_NULL', out.getvalue())
+        self.assertIn('    topic.Answer.question: CASCADE', out.getvalue())
+        self.assertTrue(Participant.objects.filter(pk=self.bob.pk).exists())
@@ -41,3 +41,65 @@ class OrbitForm(forms.ModelForm):
         if Orbit.objects.filter(name=name).exclude(pk=self.instance.pk).exists():
             raise forms.ValidationError("An orbit with this name already exists.")
         return name
+
+
+class OrbitMoveForm(forms.Form):
+    SCOPE_CHOICES = [
+        ('all', 'All topics'),
+        ('active', 'Active topics only'),
+        ('inactive', 'Inactive topics only'),
+    ]
+    SOURCE_ACTION_CHOICES = [
+        ('keep', 'Keep this orbit'),
+        ('archive', 'Archive this orbit'),
+        ('delete', 'Delete this orbit'),
+    ]
+
+    target = forms.ModelChoiceField(
+        queryset=Orbit.objects.none(),
+        label='Move to',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    scope = forms.ChoiceField(
+        choices=SCOPE_CHOICES,
+        initial='all',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    search = forms.CharField(
+        required=False,
+        label='Title contains',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Only move matching topics...'}),
+    )
+    source_action = forms.ChoiceField(
+        choices=SOURCE_ACTION_CHOICES,
+        initial='keep',
+        label='Afterwards',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        help_text='Archiving or deleting this orbit requires moving all of its topics.',
+    )
+
+    def __init__(self, *args, source, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = source
+        self.fields['target'].queryset = Orbit.objects.exclude(pk=source.pk).order_by('order', 'name')
+
+    @property
+    def moves_everything(self):
+        return self.cleaned_data['scope'] == 'all' and not self.cleaned_data['search']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('source_action', 'keep') != 'keep' and 'scope' in cleaned_data \
+                and not self.moves_everything:
+            raise forms.ValidationError("Only an orbit whose topics are all moved can be archived or deleted.")
+        return cleaned_data
+
+    def get_topics(self):
+        topics = self.source.topics.all()
+        if self.cleaned_data['scope'] == 'active':
+            topics = topics.filter(is_active=True)
+        elif self.cleaned_data['scope'] == 'inactive':
+            topics = topics.filter(is_active=False)
+        if self.cleaned_data['search']:
+            topics = topics.filter(title__icontains=self.cleaned_data['search'])
+        return topics
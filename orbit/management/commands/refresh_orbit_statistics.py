@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from orbit.models import Orbit, OrbitStatistics
+
+
+class Command(BaseCommand):
+    help = 'Store per-orbit totals in OrbitStatistics so orbit pages stop aggregating them live'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Orbits to refresh (default: all)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete the stored rows instead, going back to live aggregates')
+
+    def handle(self, *args, **options):
+        orbits = Orbit.objects.filter(slug__in=options['slugs']) if options['slugs'] else Orbit.objects.all()
+        if options['clear']:
+            deleted, _ = OrbitStatistics.objects.filter(orbit__in=orbits).delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stored statistics rows"))
+            return
+        count = OrbitStatistics.refresh(orbits)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed statistics for {count} orbits"))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orbitstatistics',
+            name='active_topic_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orbitstatistics',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orbitstatistics',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orbitstatistics',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0002_orbit_statistics_totals'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='orbitstatistics',
+            old_name='participant_count',
+            new_name='studying_participant_count',
+        ),
+    ]
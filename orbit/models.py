@@ -1,13 +1,17 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.text import slugify
+from django.db.models.functions import Coalesce, Greatest
 
+from caching.identity import IdentityMapped
+from caching.objects import CachedManagerMixin
 
-class Orbit(models.Model):
+
+class Orbit(IdentityMapped, models.Model):
     # Primary key - good use of UUID
     id = models.UUIDField(
         primary_key=True,
@@ -175,7 +179,7 @@ class Orbit(models.Model):
 
     def get_absolute_url(self):
         """Return URL for orbit detail view"""
-        return reverse('orbit-detail', kwargs={'slug': self.slug})
+        return reverse('orbits:orbit_detail', kwargs={'slug': self.slug})
 
     @property
     def is_active(self):
@@ -204,7 +208,7 @@ class Orbit(models.Model):
         self.status = 'archived'
         self.save()
 
-    class Manager(models.Manager):
+    class QuerySet(models.QuerySet):
         def active(self):
             """Return active orbits only"""
             return self.filter(status='active')
@@ -228,6 +232,55 @@ class Orbit(models.Model):
                 models.Q(description__icontains=query)
             )
 
+        def with_statistics(self):
+            """
+            Annotate topic, question, answer and studying participant totals
+            and the last activity of each orbit: the latest change to one of
+            its topics, questions or answers. Stored ``OrbitStatistics`` values are
+            used where a row exists; otherwise each value is computed by a
+            correlated aggregate subquery, so the whole page is one query.
+            """
+            from topic.models import Topic, Question, Answer
+
+            def aggregate(queryset, fk, expression):
+                rows = (
+                    queryset.filter(**{fk: models.OuterRef('pk')})
+                    .order_by().values(fk).annotate(value=expression).values('value')
+                )
+                return models.Subquery(rows)
+
+            topics = Topic.objects.all()
+            last_topic_activity = aggregate(topics, 'orbit', models.Max('updated_at'))
+            studying = Topic.studying_participants.through.objects.all()
+            live = {
+                'topic_count': aggregate(topics, 'orbit', models.Count('pk')),
+                'active_topic_count': aggregate(
+                    topics, 'orbit', models.Count('pk', filter=models.Q(is_active=True))
+                ),
+                'studying_participant_count': aggregate(
+                    studying, 'topic__orbit', models.Count('participant', distinct=True)
+                ),
+                'question_count': aggregate(topics, 'orbit', models.Sum('question_count')),
+                'answer_count': aggregate(Question.objects.all(), 'topic__orbit', models.Sum('answer_count')),
+                # Questions and answers only exist under topics; updated_at is never before created_at
+                'last_activity': Greatest(
+                    last_topic_activity,
+                    Coalesce(aggregate(Question.objects.all(), 'topic__orbit', models.Max('updated_at')),
+                             last_topic_activity),
+                    Coalesce(aggregate(Answer.objects.all(), 'question__topic__orbit', models.Max('updated_at')),
+                             last_topic_activity),
+                ),
+            }
+            annotations = {}
+            for name, subquery in live.items():
+                fallback = subquery if name == 'last_activity' else Coalesce(subquery, 0)
+                # COALESCE stops at the first non-null argument, so live values are only computed when needed
+                annotations[name] = Coalesce(models.F(f"statistics__{name}"), fallback)
+            return self.annotate(**annotations)
+
+    class Manager(CachedManagerMixin, models.Manager.from_queryset(QuerySet)):
+        cached_lookups = ('slug',)
+
     # Custom manager
     objects = Manager()
 
@@ -260,15 +313,28 @@ class ArchivedOrbit(Orbit):
 
 # Example of how you might extend this for specific functionality
 class OrbitStatistics(models.Model):
-    """Optional: Model to track orbit statistics"""
+    """
+    Stored per-orbit totals. When a row exists, ``Orbit.objects.with_statistics()``
+    reads it instead of aggregating the orbit's topics live; rows are written
+    by ``refresh()`` (see the ``refresh_orbit_statistics`` command) and
+    dropped by ``topic.signals`` whenever a change moves one of the totals;
+    edits to questions and answers only move ``last_activity`` forward.
+    """
     orbit = models.OneToOneField(
         Orbit,
         on_delete=models.CASCADE,
         related_name='statistics'
     )
-    participant_count = models.PositiveIntegerField(default=0)
+    studying_participant_count = models.PositiveIntegerField(default=0)
     topic_count = models.PositiveIntegerField(default=0)
+    active_topic_count = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
+    answer_count = models.PositiveIntegerField(default=0)
     last_activity = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    FIELDS = ['studying_participant_count', 'topic_count', 'active_topic_count', 'question_count',
+              'answer_count', 'last_activity']
 
     class Meta:
         verbose_name = _("Orbit Statistics")
@@ -276,3 +342,17 @@ class OrbitStatistics(models.Model):
 
     def __str__(self):
         return f"Statistics for {self.orbit.name}"
+
+    @classmethod
+    def refresh(cls, orbits=None):
+        """Recompute the stored statistics of ``orbits`` (default: all) from live aggregates"""
+        orbits = Orbit.objects.all() if orbits is None else orbits
+        with transaction.atomic():
+            # Drop the stored rows first so with_statistics() falls through to the live subqueries
+            cls.objects.filter(orbit__in=orbits).delete()
+            rows = [
+                cls(orbit_id=orbit.pk, **{field: getattr(orbit, field) for field in cls.FIELDS})
+                for orbit in Orbit.objects.filter(pk__in=orbits.values('pk')).with_statistics()
+            ]
+            cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
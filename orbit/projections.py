@@ -0,0 +1,39 @@
+from django.urls import reverse
+
+from .models import Orbit, OrbitStatistics
+
+STATUS_LABELS = dict(Orbit.STATUS_CHOICES)
+
+# Stands in for the slug when the detail URL is reversed once per list
+PLACEHOLDER_SLUG = 'orbit-slug-placeholder'
+
+
+class OrbitRow:
+    """
+    What the orbit list shows of one orbit, with the display values already
+    worked out. ``__slots__`` keep a row to a fraction of a model instance.
+    """
+    __slots__ = (
+        'pk', 'name', 'slug', 'description', 'status', 'status_label', 'display_name', 'order', 'color', 'icon',
+        'created_at', 'url', *OrbitStatistics.FIELDS,
+    )
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def orbit_rows(queryset):
+    """Evaluate a ``with_statistics()`` queryset into a list of ``OrbitRow``"""
+    url = reverse('orbits:orbit_detail', kwargs={'slug': PLACEHOLDER_SLUG})
+    fields = ['pk', 'name', 'slug', 'description', 'status', 'order', 'color', 'icon', 'created_at']
+    rows = []
+    for values in queryset.values(*fields, *OrbitStatistics.FIELDS):
+        label = STATUS_LABELS.get(values['status'], values['status'])
+        rows.append(OrbitRow(
+            status_label=label,
+            display_name=values['name'] if values['status'] == 'active' else f"{values['name']} ({label})",
+            url=url.replace(PLACEHOLDER_SLUG, values['slug']),
+            **values,
+        ))
+    return rows
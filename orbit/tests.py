@@ -1,3 +1,197 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from diagnostics.testing import login_master
+from master.models import Master
+from participant.models import Participant
+from archive.models import ArchivedTopic
+from dashboard import rollups
+from dashboard.models import DailyOrbitActivity
+from maintenance.deletion import bulk_delete
+from participant.merge import merge_participants
+from topic.models import Topic, Question, Answer
+from topic.moves import merge_orbits, move_topics
+
+from .models import Orbit, OrbitStatistics
+from .projections import orbit_rows
+from .views import ORBIT_TOPICS_PER_PAGE
+
+
+class OrbitStatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada, cls.bob = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Orbiter')
+            for name in ('Ada', 'Bob')
+        ]
+        cls.orbit = Orbit.objects.create(name='Busy orbit')
+        cls.empty = Orbit.objects.create(name='Empty orbit')
+        for i in range(ORBIT_TOPICS_PER_PAGE + 1):
+            topic = Topic.objects.create(
+                about=cls.ada, orbit=cls.orbit, title=f"Orbit topic {i}", description='Topic for orbit stats.',
+                is_active=i > 0,
+            )
+            topic.studying_participants.add(cls.ada, cls.bob)
+        question = Question.objects.create(topic=topic, question_text='Is this orbit busy?')
+        Answer.objects.create(question=question, participant=cls.bob, answer_text='Very busy')
+        cls.master = Master.objects.create(username='orbiter', password='orbiter-pass')
+
+    def stats(self, orbit):
+        return {field: getattr(orbit, field) for field in OrbitStatistics.FIELDS if field != 'last_activity'}
+
+    def test_live_statistics_in_one_query(self):
+        with self.assertNumQueries(1):
+            orbits = {orbit.name: orbit for orbit in Orbit.objects.with_statistics()}
+        self.assertEqual(self.stats(orbits['Busy orbit']), {
+            'studying_participant_count': 2, 'topic_count': 21, 'active_topic_count': 20,
+            'question_count': 1, 'answer_count': 1,
+        })
+        self.assertIsNotNone(orbits['Busy orbit'].last_activity)
+        self.assertEqual(set(self.stats(orbits['Empty orbit']).values()), {0})
+        self.assertIsNone(orbits['Empty orbit'].last_activity)
+
+    def test_stored_statistics_are_preferred_and_dropped_on_topic_change(self):
+        self.assertEqual(OrbitStatistics.refresh(), 2)
+        OrbitStatistics.objects.filter(orbit=self.orbit).update(topic_count=99)
+        self.assertEqual(Orbit.objects.with_statistics().get(pk=self.orbit.pk).topic_count, 99)
+
+        Topic.objects.create(about=self.bob, orbit=self.orbit, title='One more topic', description='Drops the row.')
+        self.assertEqual(Orbit.objects.with_statistics().get(pk=self.orbit.pk).topic_count, 22)
+
+    def assertStatisticsFollow(self, change, *orbits):
+        """Refresh the stored statistics, ``change()`` something, and expect the live totals of ``orbits``"""
+        def totals():
+            rows = Orbit.objects.with_statistics().filter(pk__in=[orbit.pk for orbit in orbits]).order_by('pk')
+            return [self.stats(orbit) for orbit in rows]
+
+        OrbitStatistics.refresh()
+        change()
+        stored = totals()
+        OrbitStatistics.objects.all().delete()
+        self.assertEqual(stored, totals())
+
+    def test_stored_statistics_follow_questions_and_answers(self):
+        topic = Topic.objects.get(title='Orbit topic 3')
+        question = Question.objects.create(topic=topic, question_text='Does this count right away?')
+        self.assertStatisticsFollow(
+            lambda: Answer.objects.create(question=question, participant=self.ada, answer_text='It does'), self.orbit
+        )
+        self.assertStatisticsFollow(lambda: question.answers.get().delete(), self.orbit)
+        self.assertStatisticsFollow(
+            lambda: Question.objects.create(topic=topic, question_text='And a second one?'), self.orbit
+        )
+        self.assertStatisticsFollow(question.delete, self.orbit)
+        self.assertStatisticsFollow(lambda: bulk_delete(Question.objects.filter(topic=topic)), self.orbit)
+
+    def test_stored_statistics_follow_memberships(self):
+        carl = Participant.objects.create(nickname='carl', firstname='Carl', lastname='Orbiter')
+        topic = Topic.objects.get(title='Orbit topic 3')
+        self.assertStatisticsFollow(lambda: topic.studying_participants.add(carl), self.orbit)
+        self.assertStatisticsFollow(lambda: carl.studying_topics.clear(), self.orbit)
+        self.assertStatisticsFollow(lambda: topic.studying_participants.remove(self.bob), self.orbit)
+        self.assertStatisticsFollow(lambda: bulk_delete(Participant.objects.filter(pk=self.bob.pk)), self.orbit)
+
+    def test_stored_statistics_follow_participant_merges_and_deletes(self):
+        carl = Participant.objects.create(nickname='carl', firstname='Carl', lastname='Orbiter')
+        Topic.objects.get(title='Orbit topic 3').studying_participants.add(carl)
+        self.assertStatisticsFollow(lambda: merge_participants(self.ada, [self.bob]), self.orbit)
+        self.assertStatisticsFollow(carl.delete, self.orbit)
+
+    def test_stored_statistics_follow_topics_between_orbits(self):
+        topic = Topic.objects.get(title='Orbit topic 3')
+
+        def move_by_saving():
+            topic.orbit = self.empty
+            topic.save()
+        self.assertStatisticsFollow(move_by_saving, self.orbit, self.empty)
+        self.assertStatisticsFollow(lambda: move_topics(Topic.objects.filter(pk=topic.pk), self.orbit),
+                                    self.orbit, self.empty)
+        self.assertStatisticsFollow(lambda: merge_orbits(self.orbit, self.empty), self.orbit, self.empty)
+        self.assertStatisticsFollow(lambda: bulk_delete(Topic.objects.filter(title__endswith='1')), self.empty)
+
+    def test_last_activity_follows_questions_and_answers(self):
+        OrbitStatistics.refresh()
+        answer = Answer.objects.get()
+        answer.answer_text = 'Busier than ever'
+        answer.save()
+        self.assertEqual(Orbit.objects.with_statistics().get(pk=self.orbit.pk).last_activity, answer.updated_at)
+        OrbitStatistics.objects.all().delete()
+        self.assertEqual(Orbit.objects.with_statistics().get(pk=self.orbit.pk).last_activity, answer.updated_at)
+
+    def test_rows_carry_statistics_and_display_values(self):
+        Orbit.objects.filter(pk=self.empty.pk).update(status='draft')
+        with self.assertNumQueries(1):
+            rows = {row.name: row for row in orbit_rows(Orbit.objects.with_statistics())}
+        busy, empty = rows['Busy orbit'], rows['Empty orbit']
+        self.assertEqual((busy.topic_count, busy.studying_participant_count, busy.url),
+                         (21, 2, self.orbit.get_absolute_url()))
+        self.assertEqual((empty.status_label, empty.display_name), ('Draft', 'Empty orbit (Draft)'))
+
+    def test_detail_paginates_topics(self):
+        login_master(self.client, self.master)
+        response = self.client.get(self.orbit.get_absolute_url())
+        self.assertEqual(len(response.context['topics']), ORBIT_TOPICS_PER_PAGE)
+        response = self.client.get(self.orbit.get_absolute_url(), {'page': 2})
+        self.assertEqual([topic.title for topic in response.context['topics']], ['Orbit topic 0'])
+
+
+@override_settings(ROLLUP_LAG_SECONDS=0)
+class OrbitMoveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ada = Participant.objects.create(nickname='mover', firstname='Ada', lastname='Mover')
+        self.source = Orbit.objects.create(name='Crowded orbit')
+        self.target = Orbit.objects.create(name='Roomy orbit')
+        for i in range(4):
+            topic = Topic.objects.create(
+                about=self.ada, orbit=self.source, title=f"Movable topic {i}", description='Topic that moves.',
+                is_active=i % 2 == 0,
+            )
+            question = Question.objects.create(topic=topic, question_text='Where does this belong?')
+            Answer.objects.create(question=question, participant=self.ada, answer_text='Elsewhere')
+        ArchivedTopic.objects.create(
+            id=10 ** 6, about=self.ada, orbit=self.source, title='Cold', description='Cold.', slug='cold',
+            is_active=False, created_at=topic.created_at, updated_at=topic.updated_at,
+        )
+        rollups.catch_up()
+        OrbitStatistics.refresh()
+
+    def rollup(self, orbit):
+        activity = DailyOrbitActivity.objects.filter(orbit=orbit).first()
+        return activity and (activity.topics, activity.questions, activity.answers)
+
+    def test_move_filtered_topics(self):
+        self.assertEqual(move_topics(Topic.objects.filter(is_active=False), self.target), 2)
+        orbits = {orbit.pk: orbit for orbit in Orbit.objects.with_statistics()}
+        self.assertEqual((orbits[self.source.pk].topic_count, orbits[self.target.pk].topic_count), (2, 2))
+        self.assertEqual(OrbitStatistics.objects.get(orbit=self.target).answer_count, 2)
+        self.assertEqual((self.rollup(self.source), self.rollup(self.target)), ((2, 2, 2), (2, 2, 2)))
+
+        rollups.rebuild()
+        self.assertEqual((self.rollup(self.source), self.rollup(self.target)), ((2, 2, 2), (2, 2, 2)))
+
+    def test_merge_and_delete_source(self):
+        self.assertEqual(merge_orbits(self.source, self.target, 'delete'), 4)
+        self.assertFalse(Orbit.objects.filter(pk=self.source.pk).exists())
+        self.assertEqual(Topic.objects.filter(orbit=self.target).count(), 4)
+        self.assertEqual(ArchivedTopic.objects.get().orbit, self.target)
+        self.assertEqual(self.rollup(self.target), (4, 4, 4))
+
+    def test_move_view_drops_cached_topic_list(self):
+        login_master(self.client, Master.objects.create(username='mover', password='mover-pass'))
+        url = f'/topics/?orbit={self.target.pk}'
+        self.assertEqual(len(self.client.get(url).context['topics']), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/orbits/{self.source.slug}/move/', {
+                'target': self.target.pk, 'scope': 'active', 'search': '', 'source_action': 'keep',
+            })
+        self.assertRedirects(response, self.target.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(len(self.client.get(url).context['topics']), 2)
+
+        response = self.client.post(f'/orbits/{self.source.slug}/move/', {
+            'target': self.target.pk, 'scope': 'inactive', 'search': '', 'source_action': 'archive',
+        })
+        self.assertFormError(
+            response.context['form'], None, 'Only an orbit whose topics are all moved can be archived or deleted.'
+        )
@@ -12,4 +12,5 @@ urlpatterns = [
     path('<slug:slug>/activate/', views.orbit_activate, name='orbit_activate'),
     path('<slug:slug>/deactivate/', views.orbit_deactivate, name='orbit_deactivate'),
     path('<slug:slug>/archive/', views.orbit_archive, name='orbit_archive'),
+    path('<slug:slug>/move/', views.orbit_move, name='orbit_move'),
 ]
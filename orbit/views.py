@@ -1,15 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from maintenance.deletion import bulk_delete
 from master.views import master_required
+from topic.moves import merge_orbits, move_topics
 from .models import Orbit
-from .forms import OrbitForm
+from .forms import OrbitForm, OrbitMoveForm
+from .projections import orbit_rows
+
+ORBIT_TOPICS_PER_PAGE = 20
 
 
 @master_required
 def orbit_list(request):
-    orbits = Orbit.objects.all()
+    orbits = Orbit.objects.with_statistics()
 
     # Filter by status if provided
     status_filter = request.GET.get('status')
@@ -22,7 +28,7 @@ def orbit_list(request):
         orbits = orbits.search(search_query)
 
     context = {
-        'orbits': orbits,
+        'orbits': orbit_rows(orbits),
         'status_choices': Orbit.STATUS_CHOICES,
         'current_status': status_filter,
         'search_query': search_query,
@@ -75,7 +81,7 @@ def orbit_delete(request, slug):
 
     if request.method == 'POST':
         orbit_name = orbit.name
-        orbit.delete()
+        bulk_delete(Orbit.objects.filter(pk=orbit.pk))
         messages.success(request, f'Orbit "{orbit_name}" deleted successfully!')
         return redirect('orbits:orbit_list')
 
@@ -87,10 +93,13 @@ def orbit_delete(request, slug):
 
 @master_required
 def orbit_detail(request, slug):
-    orbit = get_object_or_404(Orbit, slug=slug)
+    orbit = get_object_or_404(Orbit.objects.with_statistics(), slug=slug)
+    topics = orbit.topics.select_related('about').order_by('-created_at')
+    page = Paginator(topics, ORBIT_TOPICS_PER_PAGE).get_page(request.GET.get('page'))
 
     context = {
-        'orbit': orbit
+        'orbit': orbit,
+        'topics': page,
     }
     return render(request, 'orbits/orbit_detail.html', context)
 
@@ -117,3 +126,28 @@ def orbit_archive(request, slug):
     orbit.archive()
     messages.success(request, f'Orbit "{orbit.name}" archived successfully!')
     return redirect('orbits:orbit_list')
+
+
+@master_required
+def orbit_move(request, slug):
+    orbit = get_object_or_404(Orbit, slug=slug)
+
+    if request.method == 'POST':
+        form = OrbitMoveForm(request.POST, source=orbit)
+        if form.is_valid():
+            target = form.cleaned_data['target']
+            if form.moves_everything:
+                moved = merge_orbits(orbit, target, form.cleaned_data['source_action'])
+            else:
+                moved = move_topics(form.get_topics(), target)
+            messages.success(request, f'Moved {moved} topics from "{orbit.name}" to "{target.name}".')
+            return redirect('orbits:orbit_detail', slug=target.slug)
+    else:
+        form = OrbitMoveForm(source=orbit)
+
+    context = {
+        'form': form,
+        'orbit': orbit,
+        'title': f'Move Topics from {orbit.name}'
+    }
+    return render(request, 'orbits/orbit_move.html', context)
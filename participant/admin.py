@@ -1,4 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+
+from .merge import merge_participants
 from .models import Participant
 
 
@@ -9,8 +13,38 @@ class ParticipantAdmin(admin.ModelAdmin):
     search_fields = ['nickname', 'firstname', 'lastname', 'email']
     list_editable = ['is_active']
     readonly_fields = ['date_joined', 'last_updated']
+    actions = ['merge_selected']
 
     def get_full_name(self, obj):
         return obj.get_full_name()
 
     get_full_name.short_description = 'Full Name'
+
+    @admin.action(description='Merge selected participants into one')
+    def merge_selected(self, request, queryset):
+        participants = list(queryset.order_by('date_joined'))
+        if len(participants) < 2:
+            self.message_user(request, 'Select at least two participants to merge.', messages.WARNING)
+            return None
+
+        survivor_id = request.POST.get('survivor')
+        if survivor_id:
+            survivor = next((p for p in participants if str(p.pk) == survivor_id), None)
+            if survivor is not None:
+                moved = merge_participants(survivor, participants)
+                self.message_user(
+                    request,
+                    f'Merged {len(participants) - 1} participants into "{survivor.nickname}" '
+                    f'({sum(moved.values())} references moved).',
+                    messages.SUCCESS,
+                )
+                return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Merge participants',
+            'opts': self.model._meta,
+            'participants': participants,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/participant/merge_participants.html', context)
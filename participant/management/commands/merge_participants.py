@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from participant.merge import find_duplicate_candidates, merge_participants
+from participant.models import Participant
+
+
+class Command(BaseCommand):
+    help = 'Merge duplicate participants into one survivor, or list likely duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nicknames', nargs='*', metavar='NICKNAME',
+                            help='The survivor followed by the duplicates to merge into it')
+        parser.add_argument('--find', action='store_true', help='List duplicate candidates instead of merging')
+        parser.add_argument('--limit', type=int, default=50, help='Candidates to list')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would move, then roll back')
+
+    def handle(self, *args, **options):
+        if options['find']:
+            return self.find(options['limit'])
+        if len(options['nicknames']) < 2:
+            raise CommandError('Pass the survivor nickname followed by at least one duplicate, or use --find')
+
+        participants = Participant.objects.in_bulk(options['nicknames'], field_name='nickname')
+        missing = [nickname for nickname in options['nicknames'] if nickname not in participants]
+        if missing:
+            raise CommandError(f"Unknown participant(s): {', '.join(missing)}")
+        survivor, *duplicates = [participants[nickname] for nickname in options['nicknames']]
+
+        with transaction.atomic():
+            moved = merge_participants(survivor, duplicates)
+            for label, count in sorted(moved.items()):
+                if count:
+                    self.stdout.write(f"  {label}: {count} moved")
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING('Dry run, nothing was changed'))
+                return
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {len(duplicates)} participant(s) into {survivor.nickname}"
+        ))
+
+    def find(self, limit):
+        candidates = find_duplicate_candidates()
+        participants = Participant.objects.in_bulk({pk for a, b, _ in candidates[:limit] for pk in (a, b)})
+        for a, b, reasons in candidates[:limit]:
+            self.stdout.write(f"{participants[a]}  <->  {participants[b]}  [{', '.join(reasons)}]")
+        self.stdout.write(self.style.SUCCESS(f"{len(candidates)} candidate pairs"))
@@ -0,0 +1,118 @@
+import re
+from collections import defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Min
+
+from .models import Participant
+from .signals import pre_merge, post_merge
+
+# Survivor fields filled from the first duplicate that has a value
+FILLED_FIELDS = ['email', 'bio']
+
+# Blocks larger than this are too unspecific to compare pairwise
+MAX_BLOCK_SIZE = 50
+
+
+def _merge_m2m(rel, survivor_id, duplicate_ids):
+    """
+    Re-point the duplicates' rows in the through table of ``rel``. Rows for
+    objects the survivor is already linked to, and all but one row per
+    object among the duplicates, are deleted first so the unique
+    ``(object, participant)`` pair holds.
+    """
+    through = rel.through
+    participant, other = rel.field.m2m_reverse_field_name(), rel.field.m2m_field_name()
+    rows = through.objects.filter(**{f'{participant}__in': duplicate_ids})
+    survivor_rows = through.objects.filter(**{participant: survivor_id}).values(other)
+    removed, _ = rows.filter(**{f'{other}__in': survivor_rows}).delete()
+    keep = rows.order_by().values(other).annotate(keep=Min('pk')).values('keep')
+    dropped, _ = rows.exclude(pk__in=keep).delete()
+    return rows.update(**{participant: survivor_id}), removed + dropped
+
+
+def merge_participants(survivor, duplicates):
+    """
+    Move every foreign key and many-to-many reference from ``duplicates`` to
+    ``survivor`` with set-based updates, then delete the duplicates; all in
+    one transaction. Relations are read from the model metadata, so apps
+    only need ``pre_merge``/``post_merge`` receivers for rules the schema
+    cannot express. Returns ``{relation label: rows moved}``.
+    """
+    duplicate_ids = [p.pk for p in duplicates if p.pk != survivor.pk]
+    moved = {}
+    if not duplicate_ids:
+        return moved
+
+    with transaction.atomic():
+        pre_merge.send(sender=Participant, survivor=survivor, duplicate_ids=duplicate_ids)
+        for rel in Participant._meta.related_objects:
+            label = f"{rel.related_model._meta.label}.{rel.field.name}"
+            if rel.many_to_many:
+                moved[label], _ = _merge_m2m(rel, survivor.pk, duplicate_ids)
+            else:
+                moved[label] = rel.related_model._base_manager.filter(
+                    **{f'{rel.field.name}__in': duplicate_ids}
+                ).update(**{rel.field.name: survivor.pk})
+        post_merge.send(sender=Participant, survivor=survivor, duplicate_ids=duplicate_ids)
+
+        fill = {}
+        for duplicate in Participant.objects.filter(pk__in=duplicate_ids).order_by('date_joined'):
+            for field in FILLED_FIELDS:
+                if not getattr(survivor, field) and getattr(duplicate, field) and field not in fill:
+                    fill[field] = getattr(duplicate, field)
+        Participant.objects.filter(pk__in=duplicate_ids).delete()
+        if fill:
+            for field, value in fill.items():
+                setattr(survivor, field, value)
+            survivor.save()
+    return moved
+
+
+def _normalize(value):
+    return re.sub(r'[^a-z]', '', (value or '').lower())
+
+
+def blocking_keys(participant):
+    """
+    Cheap keys that duplicates of one person are likely to share. Only
+    participants sharing a key are compared, instead of every pair.
+    """
+    first, last = _normalize(participant['firstname']), _normalize(participant['lastname'])
+    keys = {
+        # Sorted so that swapped first and last names land in the same block
+        ('name', ' '.join(sorted((first, last)))),
+        ('nickname', _normalize(participant['nickname'])),
+    }
+    if first and last:
+        keys.add(('initial and last name', f"{first[0]} {last}"))
+    if participant['email']:
+        local, _, domain = participant['email'].lower().partition('@')
+        keys.add(('email', f"{local.split('+')[0].replace('.', '')}@{domain}"))
+    return {key for key in keys if key[1].strip()}
+
+
+def find_duplicate_candidates(queryset=None, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Return ``[(participant_a_id, participant_b_id, reasons)]`` for pairs that
+    share at least one blocking key, most reasons first. One pass builds
+    the blocks; pairs are only formed inside blocks of at most
+    ``max_block_size`` participants.
+    """
+    queryset = Participant.objects.all() if queryset is None else queryset
+    blocks = defaultdict(list)
+    rows = queryset.order_by('date_joined').values('pk', 'nickname', 'firstname', 'lastname', 'email')
+    for participant in rows.iterator(chunk_size=2000):
+        for key in blocking_keys(participant):
+            blocks[key].append(participant['pk'])
+
+    reasons = defaultdict(set)
+    for (reason, _), pks in blocks.items():
+        if 1 < len(pks) <= max_block_size:
+            for pair in combinations(pks, 2):
+                reasons[pair].add(reason)
+    return sorted(
+        ((a, b, sorted(why)) for (a, b), why in reasons.items()),
+        key=lambda candidate: -len(candidate[2]),
+    )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='participant',
+            name='participant_positio_609529_idx',
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['position', 'lastname', 'firstname'], name='participant_positio_5314f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['position', 'lastname', 'firstname'], name='participant_active_pos_idx'),
+        ),
+    ]
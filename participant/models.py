@@ -1,10 +1,14 @@
 import uuid
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
+from caching.identity import IdentityMapped
+from caching.objects import CachedManagerMixin
 
-class Participant(models.Model):
+
+class Participant(IdentityMapped, models.Model):
     # Primary key - good use of UUID
     id = models.UUIDField(
         primary_key=True,
@@ -118,7 +122,12 @@ class Participant(models.Model):
         indexes = [
             models.Index(fields=['nickname']),
             models.Index(fields=['lastname', 'firstname']),
-            models.Index(fields=['position']),
+            models.Index(fields=['position', 'lastname', 'firstname']),
+            models.Index(
+                fields=['position', 'lastname', 'firstname'],
+                condition=models.Q(is_active=True),
+                name='participant_active_pos_idx',
+            ),
             models.Index(fields=['is_active']),
             models.Index(fields=['date_joined']),
         ]
@@ -166,15 +175,22 @@ class Participant(models.Model):
 
     @property
     def topic_count(self):
-        """Return the number of topics created by this participant"""
-        if hasattr(self, 'topics'):
-            return self.topics.count()
-        return 0
+        """Return the number of topics about this participant"""
+        if hasattr(self, 'topics_about_count'):
+            return self.topics_about_count
+        return self.topics_about.count()
+
+    @property
+    def correct_answer_rate(self):
+        """Percentage of correct answers, or None without answers (needs ``with_activity``)"""
+        if not self.answers_count:
+            return None
+        return round(100 * self.correct_answers_count / self.answers_count, 1)
 
     def get_absolute_url(self):
         """Return URL for participant detail view"""
         from django.urls import reverse
-        return reverse('participant-detail', kwargs={'pk': self.pk})
+        return reverse('participants:participant_detail', kwargs={'pk': self.pk})
 
     def deactivate(self):
         """Deactivate the participant (soft delete)"""
@@ -186,7 +202,7 @@ class Participant(models.Model):
         self.is_active = True
         self.save()
 
-    class Manager(models.Manager):
+    class QuerySet(models.QuerySet):
         def active(self):
             return self.filter(is_active=True)
 
@@ -202,6 +218,34 @@ class Participant(models.Model):
                 is_active=True
             )
 
+        def with_activity(self):
+            """
+            Annotate topic and answer statistics. Each relation is counted in
+            its own correlated subquery so the joins do not multiply each
+            other and the whole page stays a single query.
+            """
+            from topic.models import Topic, Answer
+
+            def count(queryset, fk, **extra):
+                counted = (
+                    queryset.filter(**{fk: models.OuterRef('pk')})
+                    .order_by().values(fk).annotate(n=models.Count('pk', **extra)).values('n')
+                )
+                return Coalesce(models.Subquery(counted, output_field=models.IntegerField()), 0)
+
+            return self.annotate(
+                topics_about_count=count(Topic.objects.all(), 'about'),
+                topics_studying_count=count(Topic.studying_participants.through.objects.all(), 'participant'),
+                topics_boss_count=count(Topic.bosses.through.objects.all(), 'participant'),
+                answers_count=count(Answer.objects.all(), 'participant'),
+                correct_answers_count=count(
+                    Answer.objects.all(), 'participant', filter=models.Q(is_correct=True)
+                ),
+            )
+
+    class Manager(CachedManagerMixin, models.Manager.from_queryset(QuerySet)):
+        pass
+
     # Custom manager
     objects = Manager()
 
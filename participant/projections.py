@@ -0,0 +1,54 @@
+import uuid
+
+from django.db.models.functions import Substr
+from django.urls import reverse
+
+from .models import Participant
+
+# Enough of the bio for the list's 20-word preview
+BIO_PREVIEW_CHARS = 200
+
+POSITION_LABELS = dict(Participant.POSITION_CHOICES)
+
+# Stands in for the key when the detail URL is reversed once per list
+PLACEHOLDER_PK = uuid.UUID(int=0)
+
+
+class ParticipantRow:
+    """
+    What the participant list shows of one participant, with the display
+    values already worked out. ``__slots__`` keep a row to a fraction of a
+    model instance and nothing is loaded that the list does not render.
+    """
+    __slots__ = (
+        'pk', 'nickname', 'full_name', 'position', 'position_label', 'email', 'bio_preview', 'is_active',
+        'status_label', 'date_joined', 'topics_about_count', 'topics_studying_count', 'topics_boss_count',
+        'answers_count', 'correct_answers_count', 'correct_answer_rate', 'url',
+    )
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def participant_rows(queryset):
+    """Evaluate a ``with_activity()`` queryset into a list of ``ParticipantRow``"""
+    url = reverse('participants:participant_detail', kwargs={'pk': PLACEHOLDER_PK})
+    rows = queryset.values_list(
+        'pk', 'nickname', 'firstname', 'lastname', 'position', 'email', 'is_active', 'date_joined',
+        'topics_about_count', 'topics_studying_count', 'topics_boss_count', 'answers_count',
+        'correct_answers_count', Substr('bio', 1, BIO_PREVIEW_CHARS),
+    )
+    return [
+        ParticipantRow(
+            pk=pk, nickname=nickname, full_name=f"{firstname} {lastname}".strip(), position=position,
+            position_label=POSITION_LABELS.get(position, position), email=email, bio_preview=bio_preview,
+            is_active=is_active, status_label='Active' if is_active else 'Inactive', date_joined=date_joined,
+            topics_about_count=about, topics_studying_count=studying, topics_boss_count=boss,
+            answers_count=answers, correct_answers_count=correct,
+            correct_answer_rate=round(100 * correct / answers, 1) if answers else None,
+            url=url.replace(str(PLACEHOLDER_PK), str(pk)),
+        )
+        for (pk, nickname, firstname, lastname, position, email, is_active, date_joined, about, studying, boss,
+             answers, correct, bio_preview) in rows
+    ]
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent by ``participant.merge.merge_participants`` inside the merge
+# transaction with ``survivor`` and ``duplicate_ids``. ``pre_merge`` runs
+# before any reference is moved (the place to resolve unique conflicts),
+# ``post_merge`` after every reference points at the survivor and before
+# the duplicates are deleted.
+pre_merge = Signal()
+post_merge = Signal()
@@ -1,3 +1,123 @@
 from django.test import TestCase
 
-# Create your tests here.
+from diagnostics.testing import login_master
+from master.models import Master
+from orbit.models import Orbit
+from topic.models import Topic, Question, Answer
+
+from archive.models import ArchivedTopic
+from .merge import find_duplicate_candidates, merge_participants
+from .models import Participant
+from .projections import participant_rows
+
+
+class ParticipantActivityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada, cls.bob = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Active')
+            for name in ('Ada', 'Bob')
+        ]
+        orbit = Orbit.objects.create(name='Activity orbit')
+        for i in range(2):
+            topic = Topic.objects.create(
+                about=cls.ada, orbit=orbit, title=f"Topic about Ada {i}", description='Topic for activity stats.',
+            )
+            topic.studying_participants.add(cls.bob)
+            topic.bosses.add(cls.bob)
+            question = Question.objects.create(topic=topic, question_text='Who answered correctly?')
+            Answer.objects.create(question=question, participant=cls.bob, answer_text='Bob is right', is_correct=True)
+            Answer.objects.create(question=question, participant=cls.bob, answer_text='Bob is wrong')
+            Answer.objects.create(question=question, participant=cls.ada, answer_text='Ada is wrong')
+        cls.master = Master.objects.create(username='activity', password='activity-pass')
+
+    def test_with_activity_counts_every_relation_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = {p.nickname: p for p in Participant.objects.with_activity()}
+        ada, bob = stats['ada'], stats['bob']
+        self.assertEqual((ada.topic_count, ada.topics_studying_count, ada.topics_boss_count), (2, 0, 0))
+        self.assertEqual((bob.topic_count, bob.topics_studying_count, bob.topics_boss_count), (0, 2, 2))
+        self.assertEqual((bob.answers_count, bob.correct_answers_count, bob.correct_answer_rate), (4, 2, 50.0))
+        self.assertEqual(ada.correct_answer_rate, 0.0)
+
+    def test_topic_count_without_annotation(self):
+        self.assertEqual(Participant.objects.get(pk=self.ada.pk).topic_count, 2)
+
+    def test_list_search_and_detail(self):
+        login_master(self.client, self.master)
+        response = self.client.get('/participants/', {'search': 'bob'})
+        self.assertEqual([p.nickname for p in response.context['participants']], ['bob'])
+
+        response = self.client.get(self.bob.get_absolute_url())
+        self.assertContains(response, '50.0%')
+
+    def test_rows_match_instances(self):
+        with self.assertNumQueries(1):
+            rows = {row.nickname: row for row in participant_rows(Participant.objects.with_activity())}
+        bob = Participant.objects.with_activity().get(pk=self.bob.pk)
+        row = rows['bob']
+        self.assertEqual(
+            (row.full_name, row.position_label, row.status_label, row.url, row.correct_answer_rate),
+            (bob.get_full_name(), bob.get_position_display(), 'Active', bob.get_absolute_url(), 50.0),
+        )
+        self.assertEqual(rows['ada'].correct_answer_rate, 0.0)
+
+
+class ParticipantMergeTests(TestCase):
+    def setUp(self):
+        self.keep = Participant.objects.create(nickname='ada.lovelace', firstname='Ada', lastname='Lovelace')
+        self.dupe = Participant.objects.create(
+            nickname='adalovelace2', firstname='Lovelace', lastname='Ada', email='ada@example.com', is_active=False,
+        )
+        self.other = Participant.objects.create(nickname='charles', firstname='Charles', lastname='Babbage')
+        orbit = Orbit.objects.create(name='Merge orbit')
+        self.kept_topic = Topic.objects.create(about=self.keep, orbit=orbit, title='Engines', description='Kept topic.')
+        self.clash = Topic.objects.create(about=self.dupe, orbit=orbit, title='Engines', description='Clashing topic.')
+        self.shared = Topic.objects.create(about=self.other, orbit=orbit, title='Notes', description='Shared topic.')
+        self.shared.studying_participants.add(self.keep, self.dupe)
+        self.shared.bosses.add(self.dupe)
+        question = Question.objects.create(topic=self.shared, question_text='Who wrote the notes?')
+        Answer.objects.create(question=question, participant=self.dupe, answer_text='The duplicate')
+        ArchivedTopic.objects.create(
+            id=10 ** 6, about=self.other, orbit=orbit, title='Old', description='Cold.', slug='old', is_active=False,
+            studying_participant_ids=[str(self.keep.pk), str(self.dupe.pk)], boss_ids=[str(self.dupe.pk)],
+            created_at=self.shared.created_at, updated_at=self.shared.updated_at,
+        )
+
+    def test_merge_moves_every_reference(self):
+        moved = merge_participants(self.keep, [self.keep, self.dupe])
+        self.assertEqual(moved['topic.Topic.about'], 1)
+        self.assertFalse(Participant.objects.filter(pk=self.dupe.pk).exists())
+
+        self.assertEqual(
+            sorted(Topic.objects.filter(about=self.keep).values_list('title', flat=True)), ['Engines', 'Engines (2)']
+        )
+        shared = Topic.objects.get(pk=self.shared.pk)
+        self.assertEqual(list(shared.studying_participants.all()), [self.keep])
+        self.assertEqual(list(shared.bosses.all()), [self.keep])
+        self.assertEqual((shared.studying_participants_count, shared.bosses_count), (1, 1))
+        self.assertEqual(Answer.objects.get().participant, self.keep)
+
+        archived = ArchivedTopic.objects.get()
+        self.assertEqual((archived.studying_participant_ids, archived.boss_ids), ([str(self.keep.pk)],) * 2)
+        self.keep.refresh_from_db()
+        self.assertEqual(self.keep.email, 'ada@example.com')
+
+    def test_candidates_come_from_shared_blocks(self):
+        candidates = find_duplicate_candidates()
+        self.assertEqual(len(candidates), 1)
+        a, b, reasons = candidates[0]
+        self.assertEqual({a, b}, {self.keep.pk, self.dupe.pk})
+        self.assertEqual(reasons, ['name', 'nickname'])
+
+    def test_admin_action_asks_for_survivor(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin-pass'))
+        data = {'action': 'merge_selected', '_selected_action': [self.keep.pk, self.dupe.pk]}
+        response = self.client.post('/admin/participant/participant/', data)
+        self.assertContains(response, 'Pick the participant to keep')
+
+        response = self.client.post('/admin/participant/participant/', {**data, 'survivor': self.dupe.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Participant.objects.filter(nickname__contains='lovelace')), [self.dupe])
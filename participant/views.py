@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from maintenance.deletion import bulk_delete
 from master.views import master_required
 from .models import Participant
+from .projections import participant_rows
 from .forms import ParticipantForm
 
 
 @master_required
 def participant_list(request):
-    participants = Participant.objects.all()
+    participants = Participant.objects.with_activity()
 
     # Filter by position if provided
     position_filter = request.GET.get('position')
@@ -27,7 +29,7 @@ def participant_list(request):
         participants = participants.search(search_query)
 
     context = {
-        'participants': participants,
+        'participants': participant_rows(participants),
         'position_choices': Participant.POSITION_CHOICES,
         'current_position': position_filter,
         'current_status': status_filter,
@@ -77,7 +79,7 @@ def participant_update(request, pk):
 
 @master_required
 def participant_detail(request, pk):
-    participant = get_object_or_404(Participant, pk=pk)
+    participant = get_object_or_404(Participant.objects.with_activity(), pk=pk)
 
     context = {
         'participant': participant
@@ -91,7 +93,7 @@ def participant_delete(request, pk):
 
     if request.method == 'POST':
         participant_name = participant.display_name
-        participant.delete()
+        bulk_delete(Participant.objects.filter(pk=participant.pk))
         messages.success(request, f'Participant "{participant_name}" deleted successfully!')
         return redirect('participants:participant_list')
 
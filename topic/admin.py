@@ -14,28 +14,20 @@ class AnswerInline(admin.TabularInline):
 
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
-    list_display = ['title', 'about', 'orbit', 'is_active', 'studying_participants_count', 'bosses_count', 'created_at']
+    list_display = ['title', 'about', 'orbit', 'is_active', 'question_count', 'studying_participants_count',
+                    'bosses_count', 'created_at']
     list_filter = ['orbit', 'is_active', 'created_at']
     search_fields = ['title', 'description', 'about__nickname', 'about__firstname', 'about__lastname']
     list_editable = ['is_active']
-    readonly_fields = ['slug', 'created_at', 'updated_at']
+    readonly_fields = ['slug', 'question_count', 'studying_participants_count', 'bosses_count', 'created_at',
+                       'updated_at']
     filter_horizontal = ['studying_participants', 'bosses']
     inlines = [QuestionInline]
 
-    def studying_participants_count(self, obj):
-        return obj.studying_participants.count()
-
-    studying_participants_count.short_description = 'Studying Count'
-
-    def bosses_count(self, obj):
-        return obj.bosses.count()
-
-    bosses_count.short_description = 'Bosses Count'
-
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ['short_question_text', 'topic', 'is_active', 'order', 'created_at']
+    list_display = ['short_question_text', 'topic', 'is_active', 'order', 'answer_count', 'created_at']
     list_filter = ['topic', 'is_active', 'created_at']
     search_fields = ['question_text']
     list_editable = ['is_active', 'order']
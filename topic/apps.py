@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TopicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'topic'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+from maintenance.backfill import Backfill, register
+
+from . import counters
+from .models import Topic, Question
+
+
+class CounterBackfill(Backfill):
+    """Fill stored counters from the real counts, one grouped query per counter and batch"""
+    counters = ()
+
+    def prepare_batch(self, objects):
+        pks = [obj.pk for obj in objects]
+        self.real = {counter.field: counter.counts(pks) for counter in self.counters}
+
+    def compute(self, obj):
+        changed = False
+        for field, counts in self.real.items():
+            if getattr(obj, field) != counts[obj.pk]:
+                setattr(obj, field, counts[obj.pk])
+                changed = True
+        return changed
+
+
+@register
+class TopicCounters(CounterBackfill):
+    name = 'topic-counters'
+    model = Topic
+    counters = (counters.question_count, counters.studying_participants_count, counters.bosses_count)
+    fields = [counter.field for counter in counters]
+
+    def get_queryset(self):
+        return Topic.objects.only('pk', *self.fields)
+
+
+@register
+class QuestionCounters(CounterBackfill):
+    name = 'question-counters'
+    model = Question
+    counters = (counters.answer_count,)
+    fields = ['answer_count']
+
+    def get_queryset(self):
+        return Question.objects.only('pk', 'answer_count')
@@ -0,0 +1,44 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+from caching.events import subscriber
+from caching.singleflight import get_or_compute
+from orbit.models import Orbit
+from participant.models import Participant
+
+from .models import Topic
+
+TOPIC_LIST_CACHE_SECONDS = 60 * 15
+TOPIC_LIST_VERSION_KEY = 'topic_list:version'
+
+
+def _topic_list_prefix():
+    version = cache.get_or_set(TOPIC_LIST_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    return f'topic_list.{version}'
+
+
+def cached_topic_listing(request, render):
+    """
+    The topic list's content for ``request``'s filters, from ``render()``
+    when it isn't cached. Only the content is shared between masters; the
+    page around it, with the logged-in master and any flash messages, is
+    rendered for every request.
+    """
+    # The key carries a version token, so every cached variant of the list
+    # (filters, sorts, pages) can be dropped at once by ``invalidate_topic_list``
+    # without clearing the whole cache
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return get_or_compute(f'{_topic_list_prefix()}:{path}', render, TOPIC_LIST_CACHE_SECONDS)
+
+
+def invalidate_topic_list():
+    # The next request mints a new version token; pages under the old one expire on their own
+    cache.delete(TOPIC_LIST_VERSION_KEY)
+
+
+@subscriber(Topic, Orbit, Participant)
+def drop_topic_list(changes):
+    # Rows show orbit names and participant nicknames besides the topics themselves
+    invalidate_topic_list()
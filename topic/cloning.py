@@ -0,0 +1,67 @@
+from django.db import transaction
+
+from .models import Topic, Question, Answer
+
+TITLE_MAX_LENGTH = Topic._meta.get_field('title').max_length
+
+
+def numbered_title(title, taken):
+    """``title``, or ``title (2)``, ``title (3)``... whichever is not in ``taken``"""
+    candidate, n = title, 2
+    while candidate in taken:
+        suffix = f" ({n})"
+        candidate, n = title[:TITLE_MAX_LENGTH - len(suffix)] + suffix, n + 1
+    return candidate
+
+
+def clone_topic(topic, about=None, orbit=None, title=None):
+    """
+    Copy ``topic`` with its memberships, questions and answers, optionally
+    for another participant and/or orbit, in one transaction. Each level is
+    a single bulk insert; new question keys are mapped from the old ones in
+    memory so answers can be inserted against them. The copy gets a fresh
+    slug and, if the participant already has a topic with that title, a
+    numbered title. The stored counters are copied rather than recounted.
+    """
+    about = about or topic.about
+    orbit = orbit or topic.orbit
+    with transaction.atomic():
+        # A participant is never a member of a topic about themselves, as in TopicForm
+        members = {
+            through: list(
+                through.objects.filter(topic=topic).exclude(participant=about).values_list('participant_id', flat=True)
+            )
+            for through in (Topic.studying_participants.through, Topic.bosses.through)
+        }
+        questions = list(topic.questions.order_by('order', 'created_at', 'pk'))
+
+        taken = set(Topic.objects.filter(about=about).values_list('title', flat=True))
+        clone = Topic(
+            about=about, orbit=orbit, title=numbered_title(title or topic.title, taken),
+            description=topic.description, is_active=topic.is_active,
+            question_count=len(questions),
+            studying_participants_count=len(members[Topic.studying_participants.through]),
+            bosses_count=len(members[Topic.bosses.through]),
+        )
+        clone.save()
+        for through, participant_ids in members.items():
+            through.objects.bulk_create([through(topic=clone, participant_id=pk) for pk in participant_ids])
+
+        copies = Question.objects.bulk_create([
+            Question(
+                topic=clone, question_text=question.question_text, is_active=question.is_active,
+                order=question.order, answer_count=question.answer_count,
+            )
+            for question in questions
+        ], batch_size=500)
+        new_question_ids = {question.pk: copy.pk for question, copy in zip(questions, copies)}
+
+        answers = Answer.objects.filter(question__topic=topic).order_by('question_id', 'order', 'created_at', 'pk')
+        Answer.objects.bulk_create([
+            Answer(
+                question_id=new_question_ids[answer.question_id], answer_text=answer.answer_text,
+                participant_id=answer.participant_id, is_correct=answer.is_correct, order=answer.order,
+            )
+            for answer in answers.iterator(chunk_size=2000)
+        ], batch_size=500)
+    return clone
@@ -0,0 +1,68 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from caching.events import publish
+
+from .models import Topic, Question, Answer
+
+
+class StoredCounter:
+    """
+    A counter column on ``model`` that stores how many ``child`` rows point at
+    it through ``fk``. Increments and decrements are single ``UPDATE``
+    statements; ``recount`` and ``drifted`` compare against the real count.
+    """
+
+    def __init__(self, model, field, child, fk):
+        self.model = model
+        self.field = field
+        self.child = child
+        self.fk = fk
+
+    def __str__(self):
+        return f"{self.model._meta.label}.{self.field}"
+
+    def actual(self):
+        """Expression for the real number of children of the outer row"""
+        children = (
+            self.child.objects.filter(**{self.fk: OuterRef('pk')})
+            .order_by().values(self.fk).annotate(n=Count('*')).values('n')
+        )
+        return Coalesce(Subquery(children, output_field=IntegerField()), Value(0))
+
+    def counts(self, pks):
+        """Return ``{pk: real count}`` for ``pks`` in one grouped query"""
+        rows = (
+            self.child.objects.filter(**{f"{self.fk}__in": pks})
+            .order_by().values_list(self.fk).annotate(n=Count('*'))
+        )
+        counts = dict.fromkeys(pks, 0)
+        counts.update(rows)
+        return counts
+
+    def adjust(self, pk, delta):
+        queryset = self.model.objects.filter(pk=pk)
+        if delta < 0:
+            queryset = queryset.filter(**{f"{self.field}__gte": -delta})
+        queryset.update(**{self.field: F(self.field) + delta})
+        publish(self.model, [pk])
+
+    def recount(self, pks):
+        """Set the counter of ``pks`` to the real count"""
+        pks = list(pks)
+        publish(self.model, pks)
+        return self.model.objects.filter(pk__in=pks).update(**{self.field: self.actual()})
+
+    def drifted(self):
+        """Rows whose stored counter differs from the real count, annotated with ``actual``"""
+        return self.model.objects.annotate(actual=self.actual()).exclude(**{self.field: F('actual')})
+
+
+question_count = StoredCounter(Topic, 'question_count', Question, 'topic')
+studying_participants_count = StoredCounter(
+    Topic, 'studying_participants_count', Topic.studying_participants.through, 'topic'
+)
+bosses_count = StoredCounter(Topic, 'bosses_count', Topic.bosses.through, 'topic')
+answer_count = StoredCounter(Question, 'answer_count', Answer, 'question')
+
+COUNTERS = [question_count, studying_participants_count, bosses_count, answer_count]
@@ -1,4 +1,6 @@
 from django import forms
+from orbit.models import Orbit
+from participant.models import Participant
 from .models import Topic, Question, Answer
 
 
@@ -87,6 +89,35 @@ class TopicForm(forms.ModelForm):
             })
 
 
+class TopicCloneForm(forms.Form):
+    about = forms.ModelChoiceField(
+        queryset=Participant.objects.all(),
+        label='Participant',
+        widget=forms.Select(attrs={'class': 'form-select', 'data-live-search': 'true'}),
+        help_text='The participant the copy is about.',
+    )
+    orbit = forms.ModelChoiceField(
+        queryset=Orbit.objects.order_by('order', 'name'),
+        widget=forms.Select(attrs={'class': 'form-select', 'data-live-search': 'true'}),
+    )
+    title = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to keep the title'}),
+        help_text='A number is appended if the participant already has a topic with this title.',
+    )
+
+    def __init__(self, *args, topic, **kwargs):
+        kwargs.setdefault('initial', {'about': topic.about_id, 'orbit': topic.orbit_id})
+        super().__init__(*args, **kwargs)
+
+    def clean_title(self):
+        title = self.cleaned_data['title'].strip()
+        if title and len(title) < 5:
+            raise forms.ValidationError("Title must be at least 5 characters long.")
+        return title
+
+
 class QuestionForm(forms.ModelForm):
     class Meta:
         model = Question
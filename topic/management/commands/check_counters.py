@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from topic.counters import COUNTERS
+
+
+class Command(BaseCommand):
+    help = 'Compare the stored question/answer/participant counters with the real counts and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Rewrite drifted counters from the real counts')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows repaired per transaction')
+        parser.add_argument('--show', type=int, default=10, help='Drifted rows to print per counter')
+
+    def handle(self, *args, **options):
+        total = 0
+        for counter in COUNTERS:
+            drifted = list(counter.drifted().values_list('pk', counter.field, 'actual'))
+            total += len(drifted)
+            style = self.style.WARNING if drifted else self.style.SUCCESS
+            self.stdout.write(style(f"{counter}: {len(drifted)} drifted"))
+            for pk, stored, actual in drifted[:options['show']]:
+                self.stdout.write(f"  pk={pk}: stored {stored}, actual {actual}")
+
+            if options['repair'] and drifted:
+                pks = [pk for pk, _, _ in drifted]
+                repaired = 0
+                for start in range(0, len(pks), options['batch_size']):
+                    with transaction.atomic():
+                        repaired += counter.recount(pks[start:start + options['batch_size']])
+                self.stdout.write(self.style.SUCCESS(f"  repaired {repaired}"))
+
+        if total and not options['repair']:
+            self.stdout.write('Run again with --repair to fix the drifted counters.')
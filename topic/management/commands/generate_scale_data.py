@@ -0,0 +1,274 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from orbit.models import Orbit
+from participant.models import Participant
+from topic.models import Topic, Question, Answer
+
+FIRST_NAMES = [
+    'Ada', 'Alan', 'Amara', 'Boris', 'Carmen', 'Chen', 'Dana', 'Diego', 'Elif', 'Emil', 'Fatima', 'Felix',
+    'Grace', 'Hugo', 'Ines', 'Ivan', 'Jana', 'Kenji', 'Lara', 'Leon', 'Maya', 'Mateo', 'Nadia', 'Nils',
+    'Olga', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Sofia', 'Tariq', 'Una', 'Viktor', 'Wanda', 'Yusuf',
+]
+LAST_NAMES = [
+    'Abbott', 'Berg', 'Costa', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jensen',
+    'Kowalski', 'Larsen', 'Moreau', 'Novak', "O'Brien", 'Petrov', 'Quist', 'Rossi', 'Silva', 'Tanaka',
+    'Urban', 'Varga', 'Weber', 'Xu', 'Young', 'Zeller',
+]
+SUBJECTS = [
+    'communication habits', 'work history', 'travel patterns', 'technical skills', 'social circle',
+    'daily routine', 'financial footprint', 'online presence', 'education', 'public statements',
+]
+POSITIONS = [value for value, _ in Participant.POSITION_CHOICES]
+ORBIT_STATUSES = ['active'] * 7 + ['inactive', 'archived', 'draft']
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ID_NAMESPACE = uuid.UUID('5d0c6f3e-8f1b-4c4a-9a57-0f4b2f8e6c21')
+
+
+def alpha(n):
+    """Encode a non-negative integer with letters only (names reject digits)"""
+    letters = ''
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(ord('a') + rem) + letters
+    return letters
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative weights giving rank ``i`` a share proportional to ``1 / (i + 1) ** exponent``"""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk inserts keep the generated ``auto_now``/``auto_now_add`` values"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic, production-sized dataset of orbits, participants, topics, questions and answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orbits', type=int, default=50)
+        parser.add_argument('--participants', type=int, default=5000)
+        parser.add_argument('--topics', type=int, default=10000)
+        parser.add_argument('--questions-per-topic', type=int, default=10)
+        parser.add_argument('--answers-per-question', type=int, default=4)
+        parser.add_argument('--studying-per-topic', type=int, default=5,
+                            help='Average number of studying participants per topic')
+        parser.add_argument('--bosses-per-topic', type=int, default=2,
+                            help='Average number of bosses per topic')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent for orbit/participant popularity (0 = uniform)')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread creation timestamps over this many days')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='scale',
+                            help='Prefix for generated nicknames, emails, orbit names and ids')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = slugify(options['prefix']).replace('-', '_') or 'scale'
+        self.days = max(options['days'], 1)
+        # Ids depend on the prefix as well as the seed, so a new prefix never reuses an earlier run's ids
+        self.id_namespace = uuid.uuid5(ID_NAMESPACE, f"{self.prefix}:{options['seed']}")
+        self.id_count = 0
+
+        if options['orbits'] < 1 or options['participants'] < 2:
+            raise CommandError('At least one orbit and two participants are required.')
+        if (Participant.objects.filter(nickname__startswith=f"{self.prefix}_").exists()
+                or Orbit.objects.filter(slug__startswith=slugify(f"{self.prefix} orbit ")).exists()):
+            raise CommandError(f'Data with prefix "{self.prefix}" already exists; use another --prefix.')
+
+        started = time.monotonic()
+        with explicit_timestamps(Orbit, Participant, Topic, Question, Answer), transaction.atomic():
+            orbits = self.create_orbits(options['orbits'])
+            participants = self.create_participants(options['participants'])
+            topic_ids = self.create_topics(orbits, participants, options)
+            self.create_questions_and_answers(topic_ids, participants, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated scale data in {time.monotonic() - started:.1f}s')
+        )
+
+    def uuid(self):
+        self.id_count += 1
+        return uuid.uuid5(self.id_namespace, str(self.id_count))
+
+    def timestamp(self, after=EPOCH):
+        span = (EPOCH + timedelta(days=self.days) - after).total_seconds()
+        return after + timedelta(seconds=self.rng.uniform(0, max(span, 1)))
+
+    def next_pk(self, model):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+        return (last or 0) + 1
+
+    def report(self, label, count):
+        self.stdout.write(f'  {label}: {count}')
+
+    def create_orbits(self, count):
+        orbits = []
+        for i in range(count):
+            created = self.timestamp()
+            name = f"{self.prefix} orbit {i:04d}"
+            orbits.append(Orbit(
+                id=self.uuid(), name=name, slug=slugify(name),
+                description=f"Generated orbit number {i}.", status=self.rng.choice(ORBIT_STATUSES),
+                order=i, color=f"#{self.rng.randrange(0x1000000):06X}",
+                created_at=created, updated_at=created,
+            ))
+        Orbit.objects.bulk_create(orbits, batch_size=self.batch_size)
+        self.report('orbits', count)
+        return orbits
+
+    def create_participants(self, count):
+        participants = []
+        # unique_full_name only covers active rows, but keep every name distinct, earlier runs' included
+        full_names = set(Participant.objects.values_list('firstname', 'lastname'))
+        for i in range(count):
+            firstname = self.rng.choice(FIRST_NAMES)
+            lastname = surname = self.rng.choice(LAST_NAMES)
+            suffix = i
+            while (firstname, lastname) in full_names:
+                lastname = f"{surname}-{alpha(suffix).title()}"
+                suffix += count
+            full_names.add((firstname, lastname))
+            created = self.timestamp()
+            participants.append(Participant(
+                id=self.uuid(), nickname=f"{self.prefix}_{i}", firstname=firstname, lastname=lastname,
+                position=self.rng.choice(POSITIONS),
+                email=f"{self.prefix}_{i}@example.com" if self.rng.random() < 0.8 else None,
+                is_active=self.rng.random() < 0.9, bio='' if i % 3 else f"Generated participant {i}.",
+                date_joined=created, last_updated=created,
+            ))
+        Participant.objects.bulk_create(participants, batch_size=self.batch_size)
+        self.report('participants', count)
+        return participants
+
+    def sample_distinct(self, population, cum_weights, k, exclude):
+        k = min(k, len(population) - 1)
+        chosen = {}
+        while len(chosen) < k:
+            for item in self.rng.choices(population, cum_weights=cum_weights, k=k - len(chosen)):
+                if item.pk != exclude:
+                    chosen[item.pk] = item
+        return list(chosen)
+
+    def create_topics(self, orbits, participants, options):
+        orbit_weights = zipf_cum_weights(len(orbits), options['skew'])
+        participant_weights = zipf_cum_weights(len(participants), options['skew'])
+        studying_through = Topic.studying_participants.through
+        bosses_through = Topic.bosses.through
+
+        topics, studying, bosses, topic_ids = [], [], [], []
+        pk = self.next_pk(Topic)
+        for i in range(options['topics']):
+            about = self.rng.choices(participants, cum_weights=participant_weights)[0]
+            orbit = self.rng.choices(orbits, cum_weights=orbit_weights)[0]
+            # The global index keeps both the slug and (about, title) unique
+            title = f"{self.rng.choice(SUBJECTS).capitalize()} #{i}"
+            created = self.timestamp(max(about.date_joined, orbit.created_at))
+            topics.append(Topic(
+                id=pk, about_id=about.pk, orbit_id=orbit.pk, title=title, slug=f"{self.prefix}-{slugify(title)}",
+                description=f"Generated topic {i} about {about.nickname}.",
+                is_active=self.rng.random() < 0.85, created_at=created, updated_at=created,
+                # bulk_create skips the counter signals, so store the counts up front
+                question_count=options['questions_per_topic'],
+            ))
+            topic_ids.append((pk, created))
+
+            for k, through, rows, counter in (
+                (options['studying_per_topic'], studying_through, studying, 'studying_participants_count'),
+                (options['bosses_per_topic'], bosses_through, bosses, 'bosses_count'),
+            ):
+                size = self.rng.randint(0, 2 * k) if k else 0
+                chosen = self.sample_distinct(participants, participant_weights, size, about.pk)
+                setattr(topics[-1], counter, len(chosen))
+                for participant_id in chosen:
+                    rows.append(through(topic_id=pk, participant_id=participant_id))
+            pk += 1
+
+            if len(topics) >= self.batch_size:
+                self.flush_topics(topics, studying, bosses)
+        self.flush_topics(topics, studying, bosses)
+
+        self.report('topics', options['topics'])
+        return topic_ids
+
+    def flush_topics(self, topics, studying, bosses):
+        Topic.objects.bulk_create(topics, batch_size=self.batch_size)
+        Topic.studying_participants.through.objects.bulk_create(studying, batch_size=self.batch_size)
+        Topic.bosses.through.objects.bulk_create(bosses, batch_size=self.batch_size)
+        topics.clear()
+        studying.clear()
+        bosses.clear()
+
+    def create_questions_and_answers(self, topic_ids, participants, options):
+        per_topic = options['questions_per_topic']
+        per_question = options['answers_per_question']
+        participant_ids = [participant.pk for participant in participants]
+        participant_weights = zipf_cum_weights(len(participant_ids), options['skew'])
+
+        questions, answers = [], []
+        question_pk = self.next_pk(Question)
+        answer_pk = self.next_pk(Answer)
+        question_total = answer_total = 0
+        for topic_id, topic_created in topic_ids:
+            for q in range(per_topic):
+                created = self.timestamp(topic_created)
+                questions.append(Question(
+                    id=question_pk, topic_id=topic_id, order=q, is_active=self.rng.random() < 0.95,
+                    answer_count=per_question,
+                    question_text=f"Question {q + 1} for topic {topic_id}: what do we know?",
+                    created_at=created, updated_at=created,
+                ))
+                correct = self.rng.randrange(per_question) if per_question else None
+                answerers = self.rng.choices(participant_ids, cum_weights=participant_weights, k=per_question)
+                for a, participant_id in enumerate(answerers):
+                    answered = self.timestamp(created)
+                    answers.append(Answer(
+                        id=answer_pk, question_id=question_pk, order=a, is_correct=a == correct,
+                        participant_id=participant_id if self.rng.random() < 0.9 else None,
+                        answer_text=f"Answer {a + 1} to question {question_pk}.",
+                        created_at=answered, updated_at=answered,
+                    ))
+                    answer_pk += 1
+                question_pk += 1
+
+            if len(answers) >= self.batch_size or len(questions) >= self.batch_size:
+                question_total += len(questions)
+                answer_total += len(answers)
+                self.flush_questions(questions, answers)
+        question_total += len(questions)
+        answer_total += len(answers)
+        self.flush_questions(questions, answers)
+
+        self.report('questions', question_total)
+        self.report('answers', answer_total)
+
+    def flush_questions(self, questions, answers):
+        Question.objects.bulk_create(questions, batch_size=self.batch_size)
+        Answer.objects.bulk_create(answers, batch_size=self.batch_size)
+        questions.clear()
+        answers.clear()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orbit.models import Orbit
+from topic.models import Topic
+from topic.moves import SOURCE_ACTIONS, merge_orbits, move_topics
+
+
+class Command(BaseCommand):
+    help = 'Move topics from one orbit into another in a single update, optionally merging the orbits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Slug of the orbit to move topics out of')
+        parser.add_argument('target', help='Slug of the orbit to move topics into')
+        parser.add_argument('--status', choices=['active', 'inactive'], help='Only move active or inactive topics')
+        parser.add_argument('--search', help='Only move topics whose title contains this text')
+        parser.add_argument('--then', choices=SOURCE_ACTIONS, default='keep',
+                            help='What to do with the source orbit once every topic has moved')
+
+    def handle(self, *args, **options):
+        orbits = Orbit.objects.in_bulk([options['source'], options['target']], field_name='slug')
+        for slug in (options['source'], options['target']):
+            if slug not in orbits:
+                raise CommandError(f"Unknown orbit: {slug}")
+        source, target = orbits[options['source']], orbits[options['target']]
+        if source == target:
+            raise CommandError('Source and target must be different orbits')
+
+        if not options['status'] and not options['search']:
+            moved = merge_orbits(source, target, options['then'])
+        elif options['then'] != 'keep':
+            raise CommandError('--then archive/delete needs every topic moved; drop --status and --search')
+        else:
+            topics = Topic.objects.filter(orbit=source)
+            if options['status']:
+                topics = topics.filter(is_active=options['status'] == 'active')
+            if options['search']:
+                topics = topics.filter(title__icontains=options['search'])
+            moved = move_topics(topics, target)
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} topics from {source.slug} to {target.slug}"))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topic', '0004_answer_participant_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='topic_answe_questio_ca8142_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='question',
+            name='topic_quest_topic_i_3b41c8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'order', 'created_at'], name='topic_answe_questio_b5f12e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['topic', 'order', 'created_at'], name='topic_quest_topic_i_1da421_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['orbit', '-created_at'], name='topic_topic_orbit_i_3c96b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['orbit', '-created_at'], name='topic_active_orbit_recent_idx'),
+        ),
+    ]
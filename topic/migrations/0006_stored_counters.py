@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topic', '0005_list_view_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Answers'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='bosses_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Bosses Count'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Questions'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='studying_participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Studying Count'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-question_count', '-created_at'], name='topic_topic_questio_0f209f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-studying_participants_count', '-created_at'], name='topic_topic_studyin_545717_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topic', '0006_stored_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='topic_answe_partici_3551da_idx',
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['participant', 'is_correct'], name='topic_answe_partici_dff2d6_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orbit', '0002_orbit_statistics_totals'),
+        ('topic', '0007_answer_participant_correct_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='topic',
+            name='orbit',
+            field=models.ForeignKey(db_index=False, help_text='The Orbit where the topic belongs', on_delete=django.db.models.deletion.CASCADE, related_name='topics', to='orbit.orbit', verbose_name='Orbit'),
+        ),
+    ]
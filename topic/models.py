@@ -1,13 +1,34 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 
+from caching.identity import IdentityMapped
+from caching.objects import CachedManagerMixin
 from orbit.models import Orbit
 from participant.models import Participant
 
 
-class Topic(models.Model):
+class StoredCountersMixin:
+    """
+    Model mixin: saves of an existing row leave out the ``stored_counters``
+    columns. Only ``topic.counters.StoredCounter`` writes them, and the
+    values held by an instance may be stale by the time it is saved.
+    """
+
+    stored_counters = ()
+
+    def save(self, *args, **kwargs):
+        if not (self._state.adding or args or kwargs.get('force_insert') or kwargs.get('update_fields') is not None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.stored_counters and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Topic(StoredCountersMixin, IdentityMapped, models.Model):
     about = models.ForeignKey(
         Participant,
         related_name='topics_about',
@@ -45,10 +66,12 @@ class Topic(models.Model):
         help_text=_("Detailed description of the topic")
     )
 
+    # Lookups by orbit are served by the (orbit, -created_at) index below
     orbit = models.ForeignKey(
         Orbit,
         related_name='topics',
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name=_("Orbit"),
         help_text=_("The Orbit where the topic belongs")
     )
@@ -71,6 +94,13 @@ class Topic(models.Model):
         help_text=_("URL-friendly version of the title (auto-generated)")
     )
 
+    # Stored counters, kept current by topic.signals (see topic.counters)
+    question_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Questions"))
+    studying_participants_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name=_("Studying Count")
+    )
+    bosses_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Bosses Count"))
+
     class Meta:
         verbose_name = _("Topic")
         verbose_name_plural = _("Topics")
@@ -79,6 +109,14 @@ class Topic(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['about', 'created_at']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['orbit', '-created_at']),
+            models.Index(
+                fields=['orbit', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='topic_active_orbit_recent_idx',
+            ),
+            models.Index(fields=['-question_count', '-created_at']),
+            models.Index(fields=['-studying_participants_count', '-created_at']),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -87,6 +125,13 @@ class Topic(models.Model):
             )
         ]
 
+    stored_counters = ('question_count', 'studying_participants_count', 'bosses_count')
+
+    class Manager(CachedManagerMixin, models.Manager):
+        cached_lookups = ('slug',)
+
+    objects = Manager()
+
     @classmethod
     def get_optimized_queryset(cls):
         return cls.objects.select_related(
@@ -125,21 +170,6 @@ class Topic(models.Model):
                 'description': _("Description must be at least 10 characters long.")
             })
 
-    @property
-    def studying_participants_count(self):
-        """Return the number of participants studying this topic"""
-        return self.studying_participants.count()
-
-    @property
-    def bosses_count(self):
-        """Return the number of boss participants for this topic"""
-        return self.bosses.count()
-
-    @property
-    def question_count(self):
-        """Return the number of questions in this topic"""
-        return self.questions.count()
-
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('topics:topic_detail', kwargs={'slug': self.slug})
@@ -156,7 +186,7 @@ class Topic(models.Model):
 
 
 
-class Question(models.Model):
+class Question(StoredCountersMixin, models.Model):
     question_text = models.TextField(
         verbose_name=_("Question Text"),
         help_text=_("Enter your question here")
@@ -186,12 +216,16 @@ class Question(models.Model):
         help_text=_("Order in which questions should be displayed")
     )
 
+    answer_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Answers"))
+
+    stored_counters = ('answer_count',)
+
     class Meta:
         verbose_name = _("Question")
         verbose_name_plural = _("Questions")
         ordering = ['order', 'created_at']
         indexes = [
-            models.Index(fields=['topic', 'created_at']),
+            models.Index(fields=['topic', 'order', 'created_at']),
             models.Index(fields=['is_active']),
         ]
 
@@ -205,10 +239,10 @@ class Question(models.Model):
                 'question_text': _("Question must be at least 10 characters long.")
             })
 
-    @property
-    def answer_count(self):
-        """Return the number of answers for this question"""
-        return self.answers.count()
+    def save(self, *args, **kwargs):
+        # The topic's question counter is updated by a post_save handler; keep both in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     @property
     def short_question_text(self):
@@ -262,9 +296,9 @@ class Answer(models.Model):
         verbose_name_plural = _("Answers")
         ordering = ['order', 'created_at']
         indexes = [
-            models.Index(fields=['question', 'created_at']),
+            models.Index(fields=['question', 'order', 'created_at']),
             models.Index(fields=['is_correct']),
-            models.Index(fields=['participant']),
+            models.Index(fields=['participant', 'is_correct']),
         ]
 
     def __str__(self):
@@ -296,7 +330,9 @@ class Answer(models.Model):
         return self.participant is None
 
     def save(self, *args, **kwargs):
-        # If marking this answer as correct, ensure only one correct answer per question
-        if self.is_correct:
-            Answer.objects.filter(question=self.question, is_correct=True).update(is_correct=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # If marking this answer as correct, ensure only one correct answer per question
+            if self.is_correct:
+                others = Answer.objects.filter(question=self.question, is_correct=True).exclude(pk=self.pk)
+                others.update(is_correct=False)
+            super().save(*args, **kwargs)
@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.utils import timezone
+
+from archive.models import ArchivedTopic
+from caching.events import publish
+from dashboard import rollups
+from maintenance.deletion import bulk_delete
+from orbit.models import Orbit, OrbitStatistics
+
+from .models import Topic
+
+SOURCE_ACTIONS = ('keep', 'archive', 'delete')
+
+
+def move_topics(queryset, orbit):
+    """
+    Move the topics of ``queryset`` into ``orbit`` with one ``UPDATE``.
+    Daily rollups are shifted to the new orbit and the stored statistics of
+    every orbit involved are recomputed in the same transaction, and the
+    moved topics are published as changed. Returns the number of topics moved.
+    """
+    with transaction.atomic():
+        topics = queryset.exclude(orbit=orbit)
+        topic_ids = list(topics.values_list('pk', flat=True))
+        if not topic_ids:
+            return 0
+        orbit_ids = set(Topic.objects.filter(pk__in=topic_ids).values_list('orbit_id', flat=True)) | {orbit.pk}
+        rollups.reassign_topics(topic_ids, orbit.pk)
+        moved = Topic.objects.filter(pk__in=topic_ids).update(orbit=orbit, updated_at=timezone.now())
+        publish(Topic, topic_ids)
+        OrbitStatistics.refresh(Orbit.objects.filter(pk__in=orbit_ids))
+    return moved
+
+
+def merge_orbits(source, target, source_action='keep'):
+    """
+    Move every topic of ``source`` into ``target``, archived ones included,
+    then keep, archive or delete the emptied ``source``. Returns the number
+    of live topics moved.
+    """
+    if source_action not in SOURCE_ACTIONS:
+        raise ValueError(f"source_action must be one of {', '.join(SOURCE_ACTIONS)}")
+    if source.pk == target.pk:
+        raise ValueError("Cannot merge an orbit into itself")
+    with transaction.atomic():
+        moved = move_topics(Topic.objects.filter(orbit=source), target)
+        ArchivedTopic.objects.filter(orbit=source).update(orbit=target)
+        if source_action == 'archive':
+            source.archive()
+        elif source_action == 'delete':
+            bulk_delete(Orbit.objects.filter(pk=source.pk))
+    return moved
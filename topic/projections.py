@@ -0,0 +1,76 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber, Substr
+from django.urls import reverse
+
+from .models import Topic
+
+# Enough of the description for the list's 25-word preview
+DESCRIPTION_PREVIEW_CHARS = 300
+
+# Members named on a card; the rest are summed up as "+N more"
+MEMBERS_SHOWN = 3
+
+# Stands in for the slug when the detail URL is reversed once per list
+PLACEHOLDER_SLUG = 'topic-slug-placeholder'
+
+
+class TopicRow:
+    """
+    What the topic list shows of one topic, with the display values already
+    worked out. ``__slots__`` keep a row to a fraction of a model instance,
+    and only the first few member nicknames are loaded instead of every
+    member as a full participant.
+    """
+    __slots__ = (
+        'pk', 'title', 'slug', 'is_active', 'status_label', 'orbit_name', 'about_full_name', 'about_nickname',
+        'description_preview', 'question_count', 'studying_participants_count', 'bosses_count', 'created_at',
+        'studying_nicknames', 'boss_nicknames', 'url',
+    )
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def first_member_nicknames(through, topics):
+    """
+    Map each topic pk to the nicknames of its first ``MEMBERS_SHOWN``
+    members in participant order, ranked by a window function so only the
+    shown rows leave the database.
+    """
+    rank = Window(
+        RowNumber(), partition_by=F('topic_id'),
+        order_by=[F('participant__lastname').asc(), F('participant__firstname').asc(), F('pk').asc()],
+    )
+    rows = (
+        through.objects.filter(topic__in=topics.values('pk'))
+        .annotate(rank=rank).filter(rank__lte=MEMBERS_SHOWN)
+        .values_list('topic_id', 'participant__nickname', 'rank')
+    )
+    nicknames = {}
+    for topic_id, nickname, position in sorted(rows, key=lambda row: (row[0], row[2])):
+        nicknames.setdefault(topic_id, []).append(nickname)
+    return nicknames
+
+
+def topic_rows(queryset):
+    """Evaluate a ``Topic`` queryset into a list of ``TopicRow`` in three queries"""
+    url = reverse('topics:topic_detail', kwargs={'slug': PLACEHOLDER_SLUG})
+    values = queryset.values_list(
+        'pk', 'title', 'slug', 'is_active', 'orbit__name', 'about__firstname', 'about__lastname', 'about__nickname',
+        'question_count', 'studying_participants_count', 'bosses_count', 'created_at',
+        Substr('description', 1, DESCRIPTION_PREVIEW_CHARS),
+    )
+    studying = first_member_nicknames(Topic.studying_participants.through, queryset)
+    bosses = first_member_nicknames(Topic.bosses.through, queryset)
+    return [
+        TopicRow(
+            pk=pk, title=title, slug=slug, is_active=is_active, status_label='Active' if is_active else 'Inactive',
+            orbit_name=orbit_name, about_full_name=f"{firstname} {lastname}".strip(), about_nickname=nickname,
+            description_preview=description, question_count=questions, studying_participants_count=studying_count,
+            bosses_count=bosses_count, created_at=created_at, studying_nicknames=studying.get(pk, []),
+            boss_nicknames=bosses.get(pk, []), url=url.replace(PLACEHOLDER_SLUG, slug),
+        )
+        for (pk, title, slug, is_active, orbit_name, firstname, lastname, nickname, questions, studying_count,
+             bosses_count, created_at, description) in values
+    ]
@@ -0,0 +1,44 @@
+from functools import wraps
+
+from django.shortcuts import get_object_or_404
+
+from caching.objects import get_cached_or_404
+
+from .models import Topic, Question, Answer
+
+
+def resolve_route(topic_slug, question_id=None, answer_id=None):
+    """
+    Return ``(topic, question, answer)`` for a nested topic URL, reading the
+    deepest object together with its parents in one joined query. The
+    parents are part of the lookup, so a question of another topic or an
+    answer of another question is a 404 just like a missing row. Objects
+    the URL does not name are None; a bare topic comes from the object cache.
+    """
+    if answer_id is not None:
+        answer = get_object_or_404(
+            Answer.objects.select_related('question__topic'),
+            id=answer_id, question_id=question_id, question__topic__slug=topic_slug,
+        )
+        return answer.question.topic, answer.question, answer
+    if question_id is not None:
+        question = get_object_or_404(
+            Question.objects.select_related('topic'), id=question_id, topic__slug=topic_slug,
+        )
+        return question.topic, question, None
+    return get_cached_or_404(Topic, slug=topic_slug), None, None
+
+
+def nested_route(view):
+    """
+    Resolve the ``topic_slug``, ``question_id`` and ``answer_id`` URL
+    arguments with ``resolve_route`` and call ``view`` with the objects as
+    ``topic``, ``question`` and ``answer`` instead.
+    """
+    @wraps(view)
+    def wrapper(request, topic_slug, question_id=None, answer_id=None):
+        topic, question, answer = resolve_route(topic_slug, question_id, answer_id)
+        objects = {'question': question, 'answer': answer}
+        kwargs = {name: obj for name, obj in objects.items() if obj is not None}
+        return view(request, topic, **kwargs)
+    return wrapper
@@ -0,0 +1,213 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from caching.events import publish
+from maintenance.signals import pre_bulk_delete, post_bulk_delete
+from orbit.models import OrbitStatistics
+from participant.models import Participant
+from participant.signals import pre_merge, post_merge
+
+from . import counters
+from .cloning import numbered_title
+from .models import Topic, Question, Answer
+
+# Child model -> (counter on its parent, attribute holding the parent pk)
+CHILD_COUNTERS = {
+    Question: (counters.question_count, 'topic_id'),
+    Answer: (counters.answer_count, 'question_id'),
+}
+
+M2M_COUNTERS = {
+    Topic.studying_participants.through: counters.studying_participants_count,
+    Topic.bosses.through: counters.bosses_count,
+}
+
+
+def drop_orbit_statistics(topics):
+    """
+    Drop the stored statistics of the orbits of ``topics``, a ``Topic``
+    queryset, so their totals fall back to live aggregates until the next
+    refresh.
+    """
+    OrbitStatistics.objects.filter(orbit__in=topics.values('orbit_id')).delete()
+
+
+def drop_counted_orbit_statistics(counter, parent_ids):
+    # Orbit totals sum the stored counters of topics and of their questions
+    lookup = 'pk__in' if counter.model is Topic else 'questions__in'
+    drop_orbit_statistics(Topic.objects.filter(**{lookup: parent_ids}))
+
+
+def _deleted_directly(origin, sender):
+    """
+    Questions and answers are only cascaded to from their parent, so a
+    delete that started elsewhere takes the parent row with it and there is
+    no counter left to update.
+    """
+    if isinstance(origin, QuerySet):
+        return origin.model is sender
+    return isinstance(origin, sender)
+
+
+@receiver(pre_save, sender=Question)
+@receiver(pre_save, sender=Answer)
+def remember_parent(sender, instance, raw, update_fields=None, **kwargs):
+    counter, attname = CHILD_COUNTERS[sender]
+    if raw or instance._state.adding or (update_fields is not None and counter.fk not in update_fields):
+        instance._counted_parent_id = None
+        return
+    instance._counted_parent_id = (
+        sender.objects.filter(pk=instance.pk).values_list(attname, flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Answer)
+def count_saved_child(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    counter, attname = CHILD_COUNTERS[sender]
+    parent_id = getattr(instance, attname)
+    if created:
+        counter.adjust(parent_id, 1)
+        drop_counted_orbit_statistics(counter, [parent_id])
+        return
+    previous = getattr(instance, '_counted_parent_id', None)
+    if previous is not None and previous != parent_id:
+        counter.adjust(previous, -1)
+        counter.adjust(parent_id, 1)
+        drop_counted_orbit_statistics(counter, [previous, parent_id])
+        return
+    # An edit moves no total, only the stored last activity of the orbit
+    lookup = 'pk' if counter.model is Topic else 'questions'
+    OrbitStatistics.objects.filter(
+        orbit__in=Topic.objects.filter(**{lookup: parent_id}).values('orbit_id'),
+        last_activity__lt=instance.updated_at,
+    ).update(last_activity=instance.updated_at)
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Answer)
+def count_deleted_child(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(origin, sender):
+        return
+    counter, attname = CHILD_COUNTERS[sender]
+    counter.adjust(getattr(instance, attname), -1)
+    drop_counted_orbit_statistics(counter, [getattr(instance, attname)])
+
+
+@receiver(m2m_changed, sender=Topic.studying_participants.through)
+@receiver(m2m_changed, sender=Topic.bosses.through)
+def count_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    counter = M2M_COUNTERS[sender]
+    if action == 'pre_clear' and reverse:
+        instance._cleared_topic_ids = list(
+            sender.objects.filter(participant_id=instance.pk).values_list('topic_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        topic_ids = [instance.pk]
+    elif action == 'post_clear':
+        topic_ids = instance.__dict__.pop('_cleared_topic_ids', [])
+    else:
+        topic_ids = pk_set
+    if topic_ids:
+        counter.recount(topic_ids)
+        drop_counted_orbit_statistics(counter, topic_ids)
+
+
+@receiver(pre_delete, sender=Participant)
+def remember_participant_topics(sender, instance, **kwargs):
+    # Deleting a participant removes its m2m rows without sending m2m_changed
+    instance._counted_topic_ids = {
+        counter: list(through.objects.filter(participant_id=instance.pk).values_list('topic_id', flat=True))
+        for through, counter in M2M_COUNTERS.items()
+    }
+
+
+@receiver(post_delete, sender=Participant)
+def recount_participant_topics(sender, instance, **kwargs):
+    for counter, topic_ids in instance.__dict__.pop('_counted_topic_ids', {}).items():
+        if topic_ids:
+            counter.recount(topic_ids)
+            drop_counted_orbit_statistics(counter, topic_ids)
+
+
+@receiver(pre_save, sender=Topic)
+def remember_orbit(sender, instance, raw, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and 'orbit' not in update_fields):
+        instance._stored_orbit_id = None
+        return
+    instance._stored_orbit_id = sender.objects.filter(pk=instance.pk).values_list('orbit_id', flat=True).first()
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def drop_topic_orbit_statistics(sender, instance, raw=False, **kwargs):
+    # A topic moved to another orbit leaves the totals of both behind
+    if not raw:
+        orbit_ids = {instance.orbit_id, instance.__dict__.pop('_stored_orbit_id', None)} - {None}
+        OrbitStatistics.objects.filter(orbit_id__in=orbit_ids).delete()
+
+
+@receiver(pre_bulk_delete, sender=Topic)
+def remember_bulk_deleted_orbits(sender, queryset, state, **kwargs):
+    state['orbit_ids'] = set(queryset.values_list('orbit_id', flat=True))
+
+
+@receiver(post_bulk_delete, sender=Topic)
+def drop_bulk_deleted_orbit_statistics(sender, state, **kwargs):
+    OrbitStatistics.objects.filter(orbit_id__in=state['orbit_ids']).delete()
+
+
+@receiver(pre_bulk_delete, sender=Question)
+@receiver(pre_bulk_delete, sender=Answer)
+@receiver(pre_bulk_delete, sender=Topic.studying_participants.through)
+@receiver(pre_bulk_delete, sender=Topic.bosses.through)
+def remember_bulk_counted_parents(sender, queryset, via, state, **kwargs):
+    # Rows cascaded to from the parent that holds their counter need no recount
+    if sender in CHILD_COUNTERS:
+        counter, attname = CHILD_COUNTERS[sender]
+        skip = via is not None
+    else:
+        counter, attname = M2M_COUNTERS[sender], 'topic_id'
+        skip = via is Topic
+    state['counted'] = (counter, [] if skip else list(queryset.values_list(attname, flat=True).distinct()))
+
+
+@receiver(post_bulk_delete, sender=Question)
+@receiver(post_bulk_delete, sender=Answer)
+@receiver(post_bulk_delete, sender=Topic.studying_participants.through)
+@receiver(post_bulk_delete, sender=Topic.bosses.through)
+def recount_bulk_counted_parents(sender, state, **kwargs):
+    counter, parent_ids = state['counted']
+    if parent_ids:
+        counter.recount(parent_ids)
+        drop_counted_orbit_statistics(counter, parent_ids)
+
+
+@receiver(pre_merge, sender=Participant)
+def retitle_clashing_topics(sender, survivor, duplicate_ids, **kwargs):
+    # Topics are unique per (about, title); a clash gets a numbered title instead of being lost
+    taken = set(Topic.objects.filter(about=survivor).values_list('title', flat=True))
+    retitled = []
+    for topic in Topic.objects.filter(about_id__in=duplicate_ids).only('title').order_by('created_at', 'pk'):
+        title = numbered_title(topic.title, taken)
+        taken.add(title)
+        if title != topic.title:
+            topic.title = title
+            retitled.append(topic)
+    Topic.objects.bulk_update(retitled, ['title'])
+    publish(Topic, [topic.pk for topic in retitled])
+
+
+@receiver(post_merge, sender=Participant)
+def recount_merged_memberships(sender, survivor, **kwargs):
+    # Memberships the survivor already had were dropped, so counts can only have shrunk
+    for through, counter in M2M_COUNTERS.items():
+        topic_ids = list(through.objects.filter(participant_id=survivor.pk).values_list('topic_id', flat=True))
+        counter.recount(topic_ids)
+        drop_counted_orbit_statistics(counter, topic_ids)
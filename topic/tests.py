@@ -1,3 +1,288 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import Http404
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from diagnostics.testing import login_master
+from master.models import Master
+from orbit.models import Orbit
+from participant.models import Participant
+
+from .cloning import clone_topic
+from .counters import COUNTERS
+from .models import Topic, Question, Answer
+from .projections import DESCRIPTION_PREVIEW_CHARS, topic_rows
+from .routes import resolve_route
+
+
+class StoredCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.about, cls.alice, cls.bob = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Counter')
+            for name in ('About', 'Alice', 'Bob')
+        ]
+        cls.orbit = Orbit.objects.create(name='Counter orbit')
+
+    def setUp(self):
+        self.topic = Topic.objects.create(
+            about=self.about, orbit=self.orbit, title='Counted topic', description='Counters are stored here.',
+        )
+
+    def assertCounts(self, topic, **expected):
+        topic.refresh_from_db()
+        self.assertEqual({field: getattr(topic, field) for field in expected}, expected)
+
+    def test_questions_and_answers(self):
+        question = Question.objects.create(topic=self.topic, question_text='How many answers are there?')
+        Answer.objects.create(question=question, answer_text='One answer')
+        Answer.objects.create(question=question, answer_text='Two answers')
+        self.assertCounts(self.topic, question_count=1)
+        self.assertCounts(question, answer_count=2)
+
+        question.answers.first().delete()
+        self.assertCounts(question, answer_count=1)
+
+        other = Topic.objects.create(
+            about=self.alice, orbit=self.orbit, title='Other topic', description='Questions move here.',
+        )
+        question.topic = other
+        question.save()
+        self.assertCounts(self.topic, question_count=0)
+        self.assertCounts(other, question_count=1)
+
+        question.delete()
+        self.assertCounts(other, question_count=0)
+
+    def test_m2m_changes_from_both_sides(self):
+        self.topic.studying_participants.add(self.alice, self.bob)
+        self.topic.bosses.add(self.alice)
+        self.assertCounts(self.topic, studying_participants_count=2, bosses_count=1)
+
+        self.topic.studying_participants.remove(self.bob, self.about)
+        self.assertCounts(self.topic, studying_participants_count=1)
+
+        self.alice.studying_topics.clear()
+        self.assertCounts(self.topic, studying_participants_count=0)
+
+        self.bob.boss_topics.add(self.topic)
+        self.assertCounts(self.topic, bosses_count=2)
+
+        self.alice.delete()
+        self.assertCounts(self.topic, bosses_count=1)
+
+    def test_saves_leave_counters_alone(self):
+        stale = Topic.objects.get(pk=self.topic.pk)
+        question = Question.objects.create(topic=self.topic, question_text='Is this count kept?')
+        self.topic.studying_participants.add(self.alice)
+        stale.deactivate()
+        stale_question = Question.objects.get(pk=question.pk)
+        Answer.objects.create(question=question, answer_text='Still counted')
+        stale_question.question_text = 'Is this count still kept?'
+        stale_question.save()
+        self.assertCounts(self.topic, question_count=1, studying_participants_count=1, is_active=False)
+        self.assertCounts(question, answer_count=1, question_text='Is this count still kept?')
+
+    def test_check_counters_repairs_drift(self):
+        Question.objects.create(topic=self.topic, question_text='Which counter drifted?')
+        Topic.objects.filter(pk=self.topic.pk).update(question_count=7)
+
+        out = StringIO()
+        call_command('check_counters', repair=True, stdout=out)
+        self.assertIn('topic.Topic.question_count: 1 drifted', out.getvalue())
+        self.assertCounts(self.topic, question_count=1)
+        self.assertFalse(any(counter.drifted().exists() for counter in COUNTERS))
+
+
+class TopicCloneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.about, cls.alice, cls.bob = [
+            Participant.objects.create(nickname=name.lower(), firstname=name, lastname='Cloner')
+            for name in ('About', 'Alice', 'Bob')
+        ]
+        cls.orbit, cls.other_orbit = Orbit.objects.create(name='Clone orbit'), Orbit.objects.create(name='Copy orbit')
+        cls.topic = Topic.objects.create(
+            about=cls.about, orbit=cls.orbit, title='Question set', description='A reusable question set.',
+        )
+        cls.topic.studying_participants.add(cls.alice, cls.bob)
+        cls.topic.bosses.add(cls.alice)
+        for i in reversed(range(30)):
+            question = Question.objects.create(topic=cls.topic, question_text=f"Question number {i}?", order=i)
+            for j in range(3):
+                Answer.objects.create(question=question, answer_text=f"Answer {i}.{j}", is_correct=j == 0, order=j)
+        Topic.objects.create(about=cls.alice, orbit=cls.orbit, title='Question set', description='Already taken.')
+
+    def tree(self, topic):
+        return [
+            (question.question_text, question.order, question.answer_count,
+             [(a.answer_text, a.is_correct, a.order) for a in question.answers.order_by('order')])
+            for question in topic.questions.order_by('order')
+        ]
+
+    def test_clone_copies_tree_in_constant_queries(self):
+        with self.assertNumQueries(17):
+            clone = clone_topic(self.topic, about=self.alice, orbit=self.other_orbit)
+        self.assertEqual((clone.title, clone.orbit), ('Question set (2)', self.other_orbit))
+        self.assertNotEqual(clone.slug, self.topic.slug)
+        self.assertEqual(self.tree(clone), self.tree(self.topic))
+
+        # Alice is now the subject, so she drops out of the memberships
+        self.assertEqual(list(clone.studying_participants.all()), [self.bob])
+        self.assertFalse(clone.bosses.exists())
+        clone.refresh_from_db()
+        self.assertEqual(
+            (clone.question_count, clone.studying_participants_count, clone.bosses_count), (30, 1, 0)
+        )
+        self.assertFalse(any(counter.drifted().exists() for counter in COUNTERS))
+
+    def test_clone_view(self):
+        login_master(self.client, Master.objects.create(username='cloner', password='cloner-pass'))
+        response = self.client.post(f'/topics/{self.topic.slug}/clone/', {
+            'about': self.bob.pk, 'orbit': self.orbit.pk, 'title': 'Copied set',
+        })
+        clone = Topic.objects.get(about=self.bob)
+        self.assertRedirects(response, clone.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual((clone.title, clone.question_count), ('Copied set', 30))
+
+
+class TopicRowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.about = Participant.objects.create(nickname='subject', firstname='Sam', lastname='Subject')
+        cls.members = [
+            Participant.objects.create(nickname=f"member{i}", firstname='Mia', lastname=f"Member{chr(69 - i)}")
+            for i in range(5)
+        ]
+        orbit = Orbit.objects.create(name='Row orbit')
+        cls.topic = Topic.objects.create(
+            about=cls.about, orbit=orbit, title='Projected topic', description='word ' * 200, is_active=False,
+        )
+        cls.topic.studying_participants.add(*cls.members)
+        cls.topic.bosses.add(cls.members[0])
+        Topic.objects.create(about=cls.about, orbit=orbit, title='Empty topic', description='Nobody studies it.')
+
+    def test_rows_carry_display_values(self):
+        with self.assertNumQueries(3):
+            rows = {row.title: row for row in topic_rows(Topic.objects.all())}
+        row = rows['Projected topic']
+        self.assertEqual(
+            (row.about_full_name, row.about_nickname, row.orbit_name), ('Sam Subject', 'subject', 'Row orbit')
+        )
+        self.assertEqual((row.status_label, row.url), ('Inactive', self.topic.get_absolute_url()))
+        self.assertEqual(row.studying_nicknames, ['member4', 'member3', 'member2'])
+        self.assertEqual((row.boss_nicknames, row.studying_participants_count), (['member0'], 5))
+        self.assertEqual(len(row.description_preview), DESCRIPTION_PREVIEW_CHARS)
+        self.assertEqual(rows['Empty topic'].studying_nicknames, [])
+        with self.assertRaises(AttributeError):
+            row.description = ''
+
+    def test_list_view_renders_rows(self):
+        cache.clear()
+        login_master(self.client, Master.objects.create(username='rows', password='rows-pass'))
+        response = self.client.get('/topics/')
+        self.assertContains(response, '+2 more')
+        self.assertContains(response, self.topic.get_absolute_url())
+
+
+class TopicListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.topic = Topic.objects.create(
+            about=Participant.objects.create(nickname='listed', firstname='Lis', lastname='Ted'),
+            orbit=Orbit.objects.create(name='Listed orbit'), title='Listed topic', description='Shown on the list.',
+        )
+
+    def list_queries(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/topics/')
+        self.assertContains(response, 'Listed topic')
+        return response, [query for query in context if '"topic_topic"' in query['sql']]
+
+    def test_each_master_sees_their_own_page(self):
+        self.assertRedirects(Client().get('/topics/'), '/login/', fetch_redirect_response=False)
+        login_master(self.client, Master.objects.create(username='alice_master', password='alice-pass'))
+        other = Client()
+        login_master(other, Master.objects.create(username='bob_master', password='bob-pass'))
+
+        response, queries = self.list_queries(self.client)
+        self.assertContains(response, 'alice_master')
+        self.assertTrue(queries)
+        # The listing rendered for alice is served to bob, inside bob's own page
+        response, queries = self.list_queries(other)
+        self.assertContains(response, 'bob_master')
+        self.assertNotContains(response, 'alice_master')
+        self.assertFalse(queries)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.topic.title = 'Listed topic, renamed'
+            self.topic.save()
+        response, queries = self.list_queries(self.client)
+        self.assertContains(response, 'Listed topic, renamed')
+        self.assertTrue(queries)
+
+
+class GenerateScaleDataTests(TestCase):
+    def generate(self, **options):
+        call_command(
+            'generate_scale_data', orbits=2, participants=40, topics=3, questions_per_topic=1,
+            answers_per_question=1, stdout=StringIO(), **options,
+        )
+
+    def test_runs_with_new_prefixes_add_to_the_data(self):
+        self.generate(prefix='first', seed=7)
+        self.generate(prefix='second', seed=7)
+        self.generate(prefix='third', seed=8)
+        self.assertEqual(Orbit.objects.count(), 6)
+        self.assertEqual(Participant.objects.count(), 120)
+        names = list(Participant.objects.values_list('firstname', 'lastname'))
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_reused_prefix_is_rejected(self):
+        self.generate(prefix='first', seed=7)
+        with self.assertRaisesMessage(CommandError, 'Data with prefix "first" already exists'):
+            self.generate(prefix='first', seed=8)
+
+
+class NestedRouteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        about = Participant.objects.create(nickname='routed', firstname='Rita', lastname='Route')
+        orbit = Orbit.objects.create(name='Route orbit')
+        cls.topic, cls.other = [
+            Topic.objects.create(about=about, orbit=orbit, title=title, description='Topic behind nested routes.')
+            for title in ('Routed topic', 'Other topic')
+        ]
+        cls.question = Question.objects.create(topic=cls.topic, question_text='Which route is this?')
+        cls.stray = Question.objects.create(topic=cls.other, question_text='Which topic is this in?')
+        cls.answer = Answer.objects.create(question=cls.question, answer_text='The nested one')
+
+    def test_chain_resolves_in_one_query(self):
+        with self.assertNumQueries(1):
+            topic, question, answer = resolve_route(self.topic.slug, self.question.id, self.answer.id)
+            self.assertEqual((topic, question, answer), (self.topic, self.question, self.answer))
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_route(self.topic.slug, self.question.id), (self.topic, self.question, None))
+
+    def test_mismatched_parents_are_not_found(self):
+        for args in (
+            (self.topic.slug, self.stray.id),
+            (self.other.slug, self.question.id, self.answer.id),
+            (self.topic.slug, self.stray.id, self.answer.id),
+            ('missing-topic',),
+        ):
+            with self.subTest(args=args), self.assertRaises(Http404):
+                resolve_route(*args)
+
+    def test_views_use_the_resolver(self):
+        login_master(self.client, Master.objects.create(username='router', password='router-pass'))
+        url = f'/topics/{self.topic.slug}/questions/{self.question.id}/answers/{self.answer.id}/edit/'
+        self.assertContains(self.client.get(url), 'The nested one')
+        self.assertEqual(self.client.get(f'/topics/{self.other.slug}/questions/{self.question.id}/').status_code, 404)
+        response = self.client.post(f'/topics/{self.topic.slug}/questions/{self.question.id}/delete/')
+        self.assertRedirects(response, self.topic.get_absolute_url(), fetch_redirect_response=False)
+        self.assertFalse(Question.objects.filter(pk=self.question.pk).exists())
@@ -9,6 +9,7 @@ urlpatterns = [
     path('<slug:slug>/', views.topic_detail, name='topic_detail'),
     path('<slug:slug>/edit/', views.topic_update, name='topic_update'),
     path('<slug:slug>/delete/', views.topic_delete, name='topic_delete'),
+    path('<slug:slug>/clone/', views.topic_clone, name='topic_clone'),
     path('<slug:slug>/activate/', views.topic_activate, name='topic_activate'),
     path('<slug:slug>/deactivate/', views.topic_deactivate, name='topic_deactivate'),
 
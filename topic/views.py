@@ -1,17 +1,27 @@
 from django.db import models
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
+from caching.objects import get_cached_or_404, prefetch_cached
+from maintenance.deletion import bulk_delete
 from master.views import master_required
 from orbit.models import Orbit
-from .models import Topic, Question, Answer
-from .forms import TopicForm, QuestionForm, AnswerForm
-from django.views.decorators.cache import cache_page
+from .caching import cached_topic_listing
+from .cloning import clone_topic
+from .models import Topic
+from .projections import topic_rows
+from .routes import nested_route
+from .forms import TopicForm, TopicCloneForm, QuestionForm, AnswerForm
+
+TOPIC_SORTS = {
+    'questions': ['-question_count', '-created_at'],
+    'studied': ['-studying_participants_count', '-created_at'],
+}
 
 
-@cache_page(60 * 15)
 @master_required
 def topic_list(request):
-    topics = Topic.get_optimized_queryset().all()
+    topics = Topic.objects.all()
 
     # Filter by orbit if provided
     orbit_filter = request.GET.get('orbit')
@@ -36,16 +46,26 @@ def topic_list(request):
             models.Q(about__lastname__icontains=search_query)
         )
 
+    # Sorting uses the stored counters, which are indexed together with created_at
+    sort = request.GET.get('sort')
+    if sort in TOPIC_SORTS:
+        topics = topics.order_by(*TOPIC_SORTS[sort])
+
     orbits = Orbit.objects.all()
 
-    context = {
-        'topics': topics,
-        'orbits': orbits,
-        'current_orbit': orbit_filter,
-        'current_status': status_filter,
-        'search_query': search_query,
-    }
-    return render(request, 'topics/topic_list.html', context)
+    # The listing is the same for every master and cached; the page around it is not
+    def render_listing():
+        context = {
+            'topics': topic_rows(topics),
+            'orbits': orbits,
+            'current_orbit': orbit_filter,
+            'current_status': status_filter,
+            'current_sort': sort if sort in TOPIC_SORTS else None,
+            'search_query': search_query,
+        }
+        return render_to_string('topics/topic_list_content.html', context)
+
+    return render(request, 'topics/topic_list.html', {'listing': cached_topic_listing(request, render_listing)})
 
 
 @master_required
@@ -87,9 +107,32 @@ def topic_update(request, slug):
     return render(request, 'topics/topic_form.html', context)
 
 
+@master_required
+def topic_clone(request, slug):
+    topic = get_object_or_404(Topic.objects.select_related('about', 'orbit'), slug=slug)
+
+    if request.method == 'POST':
+        form = TopicCloneForm(request.POST, topic=topic)
+        if form.is_valid():
+            clone = clone_topic(topic, **form.cleaned_data)
+            messages.success(request, f'Topic "{topic.title}" copied as "{clone.title}" with '
+                                      f'{clone.question_count} questions!')
+            return redirect('topics:topic_detail', slug=clone.slug)
+    else:
+        form = TopicCloneForm(topic=topic)
+
+    context = {
+        'form': form,
+        'topic': topic,
+        'title': f'Clone Topic: {topic.title}'
+    }
+    return render(request, 'topics/topic_clone.html', context)
+
+
 @master_required
 def topic_detail(request, slug):
-    topic = get_object_or_404(Topic, slug=slug)
+    topic = get_cached_or_404(Topic, slug=slug)
+    prefetch_cached([topic], 'about', 'orbit')
     questions = topic.questions.all().order_by('order')
 
     context = {
@@ -105,7 +148,7 @@ def topic_delete(request, slug):
 
     if request.method == 'POST':
         topic_title = topic.title
-        topic.delete()
+        bulk_delete(Topic.objects.filter(pk=topic.pk))
         messages.success(request, f'Topic "{topic_title}" deleted successfully!')
         return redirect('topics:topic_list')
 
@@ -132,8 +175,9 @@ def topic_deactivate(request, slug):
 
 
 @master_required
-def question_create(request, topic_slug):
-    topic = get_object_or_404(Topic, slug=topic_slug)
+@nested_route
+def question_create(request, topic):
+    prefetch_cached([topic], 'about')
 
     if request.method == 'POST':
         form = QuestionForm(request.POST)
@@ -142,7 +186,7 @@ def question_create(request, topic_slug):
             question.topic = topic
             question.save()
             messages.success(request, f'Question added successfully!')
-            return redirect('topics:topic_detail', slug=topic_slug)
+            return redirect('topics:topic_detail', slug=topic.slug)
     else:
         form = QuestionForm()
 
@@ -155,16 +199,16 @@ def question_create(request, topic_slug):
 
 
 @master_required
-def question_update(request, topic_slug, question_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
+@nested_route
+def question_update(request, topic, question):
+    prefetch_cached([topic], 'about')
 
     if request.method == 'POST':
         form = QuestionForm(request.POST, instance=question)
         if form.is_valid():
             form.save()
             messages.success(request, f'Question updated successfully!')
-            return redirect('topics:topic_detail', slug=topic_slug)
+            return redirect('topics:topic_detail', slug=topic.slug)
     else:
         form = QuestionForm(instance=question)
 
@@ -178,14 +222,12 @@ def question_update(request, topic_slug, question_id):
 
 
 @master_required
-def question_delete(request, topic_slug, question_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
-
+@nested_route
+def question_delete(request, topic, question):
     if request.method == 'POST':
         question.delete()
         messages.success(request, f'Question deleted successfully!')
-        return redirect('topics:topic_detail', slug=topic_slug)
+        return redirect('topics:topic_detail', slug=topic.slug)
 
     context = {
         'topic': topic,
@@ -195,9 +237,8 @@ def question_delete(request, topic_slug, question_id):
 
 
 @master_required
-def question_detail(request, topic_slug, question_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
+@nested_route
+def question_detail(request, topic, question):
     answers = question.answers.all().order_by('order')
 
     context = {
@@ -209,10 +250,8 @@ def question_detail(request, topic_slug, question_id):
 
 
 @master_required
-def answer_create(request, topic_slug, question_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
-
+@nested_route
+def answer_create(request, topic, question):
     if request.method == 'POST':
         form = AnswerForm(request.POST)
         if form.is_valid():
@@ -220,7 +259,7 @@ def answer_create(request, topic_slug, question_id):
             answer.question = question
             answer.save()
             messages.success(request, f'Answer added successfully!')
-            return redirect('topics:question_detail', topic_slug=topic_slug, question_id=question_id)
+            return redirect('topics:question_detail', topic_slug=topic.slug, question_id=question.id)
     else:
         form = AnswerForm()
 
@@ -234,17 +273,14 @@ def answer_create(request, topic_slug, question_id):
 
 
 @master_required
-def answer_update(request, topic_slug, question_id, answer_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
-    answer = get_object_or_404(Answer, id=answer_id, question=question)
-
+@nested_route
+def answer_update(request, topic, question, answer):
     if request.method == 'POST':
         form = AnswerForm(request.POST, instance=answer)
         if form.is_valid():
             form.save()
             messages.success(request, f'Answer updated successfully!')
-            return redirect('topics:question_detail', topic_slug=topic_slug, question_id=question_id)
+            return redirect('topics:question_detail', topic_slug=topic.slug, question_id=question.id)
     else:
         form = AnswerForm(instance=answer)
 
@@ -259,15 +295,12 @@ def answer_update(request, topic_slug, question_id, answer_id):
 
 
 @master_required
-def answer_delete(request, topic_slug, question_id, answer_id):
-    topic = get_object_or_404(Topic, slug=topic_slug)
-    question = get_object_or_404(Question, id=question_id, topic=topic)
-    answer = get_object_or_404(Answer, id=answer_id, question=question)
-
+@nested_route
+def answer_delete(request, topic, question, answer):
     if request.method == 'POST':
         answer.delete()
         messages.success(request, f'Answer deleted successfully!')
-        return redirect('topics:question_detail', topic_slug=topic_slug, question_id=question_id)
+        return redirect('topics:question_detail', topic_slug=topic.slug, question_id=question.id)
 
     context = {
         'topic': topic,